@@ -7,110 +7,929 @@ from __future__ import annotations
 This module defines the scaffold for parsing zipped ChatGPT exports into HTML files optimized for rhythm-aware shaping workflows. All functionality here is placeholder-only. Future prompts will gradually replace the print statements with real logic."""
 
 import traceback
+import hashlib
+import os
 import re
+import time
 from pathlib import Path
+import io
 import json
-import tempfile
 import zipfile
 from collections import Counter
 from glob import glob
 from os.path import join
 
 import html
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import IO, Callable, Iterable, Iterator
 import pytz
 
+from .export_metrics import ExportMetrics
+
+
+def iter_json_array(fh: IO[str], chunk_size: int = 1 << 16) -> Iterator[object]:
+    """Yield the elements of a top-level JSON array one at a time.
+
+    ``fh`` is read in chunks of ``chunk_size`` characters and each element is
+    decoded with :meth:`json.JSONDecoder.raw_decode` as soon as it is complete,
+    so only the element currently being decoded is held in memory. When an
+    element spans several chunks the read size doubles until it fits, keeping
+    the cost of retried decodes linear in the element size.
+
+    Raises ``ValueError`` if the stream is not a JSON array.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    # what the next token must be: "[", a value or "]" ("first"), a value
+    # ("value"), or the "," / "]" that follows a value ("sep")
+    expect = "["
+    read_size = chunk_size
+
+    def fill() -> None:
+        nonlocal buf, pos, eof
+        chunk = fh.read(read_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n":
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                raise ValueError("unexpected end of JSON array")
+            fill()
+            continue
+        if expect == "[":
+            if buf[pos] != "[":
+                raise ValueError("expected '[' at start of JSON array")
+            expect = "first"
+            pos += 1
+            continue
+        if expect == "sep":
+            if buf[pos] == "]":
+                return
+            if buf[pos] != ",":
+                raise ValueError("expected ',' or ']' after JSON array element")
+            expect = "value"
+            pos += 1
+            continue
+        if expect == "first" and buf[pos] == "]":
+            return
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            read_size *= 2
+            fill()
+            continue
+        if (
+            not eof
+            and not isinstance(obj, (dict, list))
+            and (end == len(buf) or buf[end] not in " \t\r\n,]")
+        ):
+            # a scalar may continue in the next chunk, e.g. "0." + "1"
+            read_size *= 2
+            fill()
+            continue
+        pos = end
+        expect = "sep"
+        read_size = chunk_size
+        yield obj
+
+class ExportArchive:
+    """Random access to the members of a ChatGPT export zip.
+
+    Nothing is extracted up front: ``conversations.json`` is read straight
+    from its zip member and attachments are copied out one at a time, only
+    when a scroll references them.
+
+    ## Parameters
+    zip_path : Path
+        Path to the exported `.zip` archive.
+    """
+
+    def __init__(self, zip_path: str | Path) -> None:
+        self.zip_path = Path(zip_path)
+        self.zipfile = zipfile.ZipFile(self.zip_path)
+        self._by_file_id: dict[str, str] | None = None
+
+    def conversations_member(self) -> zipfile.ZipInfo:
+        """Return the ``conversations.json`` member, preferring the top level."""
+        try:
+            return self.zipfile.getinfo("conversations.json")
+        except KeyError:
+            pass
+        for info in self.zipfile.infolist():
+            if info.filename.rsplit("/", 1)[-1] == "conversations.json":
+                return info
+        raise Exception("conversations.json not found")
+
+    def open(self, member: str | zipfile.ZipInfo) -> IO[bytes]:
+        """Open ``member`` for reading without extracting it."""
+        return self.zipfile.open(member)
+
+    def find_attachment(self, file_id: str) -> str | None:
+        """Return the member name for an attachment ``file_id``, if present.
+
+        Exports name attachment members after the file id (e.g.
+        ``file-AbC123-photo.png``); the id index is built on first lookup.
+        """
+        if self._by_file_id is None:
+            self._by_file_id = {}
+            for name in self.zipfile.namelist():
+                m = re.match(r"(file[-_][A-Za-z0-9]+)", name.rsplit("/", 1)[-1])
+                if m:
+                    self._by_file_id.setdefault(m.group(1), name)
+        return self._by_file_id.get(file_id)
+
+    def extract_attachment(self, file_id: str, dest_dir: str | Path) -> Path | None:
+        """Copy attachment ``file_id`` into ``dest_dir`` unless already there."""
+        name = self.find_attachment(file_id)
+        if name is None:
+            return None
+        dest = Path(dest_dir) / name.rsplit("/", 1)[-1]
+        if not dest.exists():
+            import shutil
+
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dest.with_name(f"{dest.name}.{os.getpid()}.tmp")
+            with self.zipfile.open(name) as src, tmp.open("wb") as dst:
+                shutil.copyfileobj(src, dst)
+            tmp.replace(dest)
+        return dest
+
+    def close(self) -> None:
+        self.zipfile.close()
+
+
+class AttachmentResolver:
+    """Picklable callable mapping an attachment file id to a scroll-relative href.
+
+    Attachments are copied from the export zip into ``output_dir/attachments``
+    the first time a scroll references them. Each process opens its own
+    :class:`ExportArchive`, so the resolver can be shipped to pool workers.
+    """
+
+    SUBDIR = "attachments"
+
+    def __init__(self, zip_path: str | Path, output_dir: str | Path) -> None:
+        self.zip_path = str(zip_path)
+        self.output_dir = str(output_dir)
+
+    def __call__(self, file_id: str) -> str | None:
+        archive = _process_archive(self.zip_path, os.getpid())
+        try:
+            dest = archive.extract_attachment(file_id, Path(self.output_dir) / self.SUBDIR)
+        except Exception as exc:
+            print(f"Failed to extract attachment {file_id}: {exc}")
+            return None
+        return f"{self.SUBDIR}/{dest.name}" if dest else None
+
+
+# open archives by (zip path, pid); ChatExportArchiver.run registers its own
+_ARCHIVES: dict[tuple[str, int], ExportArchive] = {}
+
+
+def _process_archive(zip_path: str, pid: int) -> ExportArchive:
+    """Return an :class:`ExportArchive` owned by process ``pid``.
+
+    Keyed by pid so forked workers never share the parent's file offset.
+    """
+    archive = _ARCHIVES.get((zip_path, pid))
+    if archive is None:
+        archive = _ARCHIVES[(zip_path, pid)] = ExportArchive(zip_path)
+    return archive
+
+
 class ChatExportArchiver:
     """Orchestrates the conversion of a ChatGPT `.zip` export into HTML files.
 
     This class defines the top-level control flow for transforming a ChatGPT
     conversation archive into a series of structured HTML documents. It accepts
     paths to the source `.zip` archive and the destination output directory.
-    Internally, it unpacks the archive, parses the `conversations.json` file, and
-    delegates parsing of each conversation thread to `ThreadParser`. Each resulting
-    HTML document is written to the output directory with sequential filenames.
+    Internally, it reads the `conversations.json` member straight from the
+    archive (nothing is extracted to disk), parses it, and delegates parsing
+    of each conversation thread to `ThreadParser`. Each resulting HTML
+    document is written to the output directory with sequential filenames.
 
     ## Parameters
     zip_path : Path
         Path to the exported `.zip` archive containing the conversations.
     output_dir : Path
         Path to the directory where HTML files will be saved.
+    stream : bool
+        Decode the ``conversations.json`` member element by element instead
+        of loading the whole member and parsing it at once.
+        Peak memory is then bounded by the largest single conversation.
+    workers : int
+        Number of worker processes used to parse and write scrolls. ``1``
+        keeps everything in the calling process.
+    incremental : bool
+        Keep an :class:`ExportManifest` in ``output_dir`` and only re-render
+        conversations that are new or changed since the previous run. Known
+        conversations keep their scroll filename across runs. A run whose
+        render options differ from the previous one re-renders everything.
+    sharded_index : bool
+        Write a month-sharded index (see :class:`KernelIndexPage`) instead of
+        one monolithic ``index.html``.
+    annotate : bool
+        Render each turn through :class:`TurnSummaryAnnotator` while writing,
+        producing annotated scrolls in a single pass.
+    search_index : bool
+        Feed every normalized message into a
+        :class:`~breathing_willow.history_search.HistorySearchIndex` stored as
+        ``search.sqlite`` in ``output_dir``.
+    message_store : bool
+        Also write every normalized message to the memory-mappable store in
+        :mod:`breathing_willow.message_store` (``messages.jsonl`` plus
+        ``messages.idx``).
+    tz : str
+        Timezone used for scroll dates and turn times. An unknown name raises
+        ``ValueError`` here, before anything is written.
+    show_times : bool
+        Write each turn's local time ahead of it in the scroll.
+    attachments : bool
+        Link attachments referenced by messages, copying each one out of the
+        zip into ``output_dir/attachments`` on first use.
+    verbose : bool
+        Print per-conversation progress. Normal runs only print failures and
+        a one-line summary.
 
     ## Attributes
     zip_path : Path
         The input path to the archive file.
     output_dir : Path
         The output directory for saving parsed HTML files.
+    stream : bool
+        Whether conversations are streamed from the archive.
+    workers : int
+        Size of the process pool used for rendering.
+    incremental : bool
+        Whether unchanged conversations are skipped via the manifest.
+    sharded_index : bool
+        Whether the index is split into per-month pages.
+    annotate : bool
+        Whether scrolls are written with turn summary annotations.
+    search_index : bool
+        Whether the full-text search index is updated during export.
+    message_store : bool
+        Whether the message store is written during export.
+    tz : str
+        Timezone name used when rendering times.
+    show_times : bool
+        Whether per-turn times are rendered.
+    attachments : bool
+        Whether referenced attachments are copied out and linked.
+    verbose : bool
+        Whether per-conversation progress is printed.
+    failures : list[tuple[int, str]]
+        ``(index, message)`` pairs for threads that failed during the last run.
+    records : dict[str, dict]
+        Per-scroll metadata (see :class:`KernelIndexPage`) keyed by filename,
+        collected while parsing and used to build the index without rereading
+        the scrolls.
+    metrics : ExportMetrics
+        Stage timings and counters of the last run, also written to
+        ``export-metrics.json`` in ``output_dir``.
 
     ## Methods
     run()
         Executes the unpacking, parsing, and HTML export pipeline.
     """
-    def __init__(self, zip_path: Path, output_dir: Path) -> None:
+    def __init__(
+        self,
+        zip_path: Path,
+        output_dir: Path,
+        stream: bool = False,
+        workers: int = 1,
+        incremental: bool = False,
+        sharded_index: bool = False,
+        annotate: bool = False,
+        search_index: bool = False,
+        message_store: bool = False,
+        tz: str = "America/Denver",
+        show_times: bool = False,
+        attachments: bool = False,
+        verbose: bool = False,
+    ) -> None:
+        try:
+            time_engine(tz)
+        except pytz.UnknownTimeZoneError:
+            raise ValueError(f"unknown timezone {tz!r}; expected an IANA name") from None
         self.zip_path = Path(zip_path)
         self.export_id = self.zip_path.stem
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        print(f"ChatExportArchiver initialized with {self.zip_path} -> {self.output_dir}")
+        self.stream = stream
+        self.workers = max(1, int(workers))
+        self.incremental = incremental
+        self.sharded_index = sharded_index
+        self.annotate = annotate
+        self.search_index = search_index
+        self.message_store = message_store
+        self.tz = tz
+        self.show_times = show_times
+        self.attachments = attachments
+        self.verbose = verbose
+        self._search = None
+        self._store = None
+        self.failures: list[tuple[int, str]] = []
+        self.records: dict[str, dict] = {}
+        self.metrics = ExportMetrics()
+        self._log(f"ChatExportArchiver initialized with {self.zip_path} -> {self.output_dir}")
+
+    def _log(self, message: str) -> None:
+        if self.verbose:
+            print(message)
 
     def run(self) -> None:
-        """Extract the archive and convert each conversation to HTML."""
-        print("Extracting archive...")
-        with tempfile.TemporaryDirectory() as tmpdir:
-            try:
-                with zipfile.ZipFile(self.zip_path) as zf:
-                    zf.extractall(tmpdir)
-            except Exception as exc:
-                print(f"Failed to extract {self.zip_path}: {exc}")
-                return
+        """Read the archive and convert each conversation to HTML."""
+        self.metrics = ExportMetrics()
+        try:
+            with self.metrics.span("extract"):
+                archive = ExportArchive(self.zip_path)
+        except Exception as exc:
+            print(f"Failed to open {self.zip_path}: {exc}")
+            return
 
-            conv_dir = Path(tmpdir)
-            convo_file = conv_dir / "conversations.json"
-            if not convo_file.is_file():
-                raise Exception("conversations.json not found")
+        if self.search_index:
+            from .history_search import HistorySearchIndex
 
-            try:
-                with convo_file.open("r", encoding="utf-8") as fh:
-                    conversations = json.load(fh)
-            except Exception as exc:
-                print(f"Failed to load {convo_file}: {exc}")
-                return
+            self._search = HistorySearchIndex(self.output_dir / HistorySearchIndex.FILENAME)
+        if self.message_store:
+            from .message_store import MessageStoreWriter
 
-            if not isinstance(conversations, list):
-                print(f"{convo_file} did not contain a list")
-                return
+            self._store = MessageStoreWriter(self.output_dir, keep_existing=self.incremental)
+        # serial attachment lookups reuse this archive instead of opening another
+        key = (str(self.zip_path), os.getpid())
+        _ARCHIVES[key] = archive
+        completed = False
+        try:
+            if self.stream:
+                completed = self._run_streaming(archive)
+            else:
+                completed = self._run_loaded(archive)
+        finally:
+            _ARCHIVES.pop(key, None)
+            archive.close()
+            with self.metrics.span("index"):
+                if self._search is not None:
+                    self._search.close()
+                    self._search = None
+                if self._store is not None:
+                    # a failed run keeps the previous store instead of an empty one
+                    if completed:
+                        self._store.close()
+                    else:
+                        self._store.discard()
+                    self._store = None
 
-            print(f"Found {len(conversations)} conversations...")
+        # after all scrolls are written, generate the root index
+        # this index is the archive trailhead for browsing
+        with self.metrics.span("index"):
+            KernelIndexPage(sharded=self.sharded_index).run(
+                self.output_dir, records=self.records.values()
+            )
+        self._report()
+
+    def _report(self) -> None:
+        """Write the metrics receipt and print the one-line run summary."""
+        metrics_path = self.output_dir / ExportMetrics.FILENAME
+        self.metrics.write(metrics_path)
+        counters = self.metrics.counters
+        line = (
+            f"Exported {counters.get('scrolls', 0)} scroll(s), "
+            f"{counters.get('bytes', 0) / 1e6:.1f} MB"
+        )
+        if counters.get("skipped"):
+            line += f", {counters['skipped']} unchanged"
+        if counters.get("failures"):
+            line += f", {counters['failures']} failed"
+        print(f"{line} in {self.metrics.summary()['total_seconds']:.1f}s ({metrics_path})")
+
+    def _run_streaming(self, archive: "ExportArchive") -> bool:
+        """Parse conversations one at a time directly from the zip member.
+
+        Returns ``False`` if the member could not be decoded to the end.
+        """
+        self._log("Streaming conversations.json from archive...")
+        with self.metrics.span("extract"):
+            member = archive.conversations_member()
+        with archive.open(member) as raw:
+            fh = io.TextIOWrapper(raw, encoding="utf-8")
+            try:
+                self._write_threads(self.metrics.timed("load", iter_json_array(fh)))
+            except ValueError as exc:
+                print(f"Failed to stream conversations.json: {exc}")
+                return False
+        return True
+
+    def _run_loaded(self, archive: "ExportArchive") -> bool:
+        """Load the whole ``conversations.json`` member, then convert it.
+
+        Returns ``False`` if the member could not be loaded as a list.
+        """
+        with self.metrics.span("extract"):
+            member = archive.conversations_member()
+        try:
+            with self.metrics.span("load"), archive.open(member) as raw:
+                conversations = json.load(io.TextIOWrapper(raw, encoding="utf-8"))
+        except Exception as exc:
+            print(f"Failed to load {member.filename}: {exc}")
+            return False
+
+        if not isinstance(conversations, list):
+            print(f"{member.filename} did not contain a list")
+            return False
+
+        self._log(f"Found {len(conversations)} conversations...")
+        self._write_threads(conversations)
+        return True
+
+    def _write_threads(self, threads: Iterable[object]) -> None:
+        """Parse each thread in ``threads`` and write it as a numbered scroll.
+
+        Scrolls are named ``NNN-conversation.html`` after the thread's position
+        in ``threads`` regardless of how many workers render them, or after
+        their manifest entry in incremental mode. Failures are collected in
+        :attr:`failures` and reported once at the end.
+        """
+        manifest = (
+            ExportManifest.load(self.output_dir, options=self._render_options)
+            if self.incremental
+            else None
+        )
+        if manifest is not None:
+            tasks: Iterable[tuple[int, object]] = manifest.plan(threads)
+        else:
+            tasks = enumerate(threads, 1)
+
+        if self.workers > 1:
+            failures = self._write_threads_parallel(tasks)
+        else:
+            failures = self._write_threads_serial(tasks)
+        self.failures = sorted(failures)
+        self.metrics.count("failures", len(self.failures))
+        if self.failures:
+            print(f"{len(self.failures)} conversation(s) failed:")
+            for idx, message in self.failures:
+                print(f"  {idx:03d}: {message}")
+
+        if manifest is not None:
+            manifest.commit(
+                failed={idx for idx, _ in self.failures}, records=self.records
+            )
+            manifest.save()
+            # unchanged scrolls were not parsed; their metadata lives in the manifest
+            self.records = {
+                e["filename"]: e for e in manifest.entries.values() if "filename" in e
+            }
+            self.metrics.count("skipped", manifest.skipped)
+            self._log(
+                f"{manifest.rendered} conversation(s) rendered, "
+                f"{manifest.skipped} unchanged"
+            )
 
-            for idx, thread in enumerate(conversations, 1):
-                print(f"Parsing conversation {idx}...")
+    @property
+    def _render_options(self) -> dict:
+        """Options that change what a scroll or its indexes contain."""
+        return {
+            "annotate": self.annotate,
+            "tz": self.tz,
+            "show_times": self.show_times,
+            "attachments": self.attachments,
+            "search_index": self.search_index,
+            "message_store": self.message_store,
+        }
+
+    @property
+    def _parser_options(self) -> dict:
+        """Keyword arguments handed to every :class:`ThreadParser`."""
+        return {
+            "export_id": self.export_id,
+            "annotator": TurnSummaryAnnotator() if self.annotate else None,
+            "tz": self.tz,
+            "show_times": self.show_times,
+            "attachments": (
+                AttachmentResolver(self.zip_path, self.output_dir)
+                if self.attachments
+                else None
+            ),
+            "verbose": self.verbose,
+        }
+
+    @property
+    def _keep_messages(self) -> bool:
+        """Whether renderers must hand normalized messages back to the parent."""
+        return self._search is not None or self._store is not None
+
+    def _scroll_done(
+        self, record: dict, messages: list[dict] | None, timings: dict[str, float]
+    ) -> None:
+        """Collect the outputs and timings of one successfully written scroll."""
+        self.records[record["filename"]] = record
+        for stage, seconds in timings.items():
+            self.metrics.add_span(stage, seconds)
+        self.metrics.count("scrolls")
+        self.metrics.count("turns", record["turns"])
+        self.metrics.count("bytes", record["bytes"])
+        if self._search is None and self._store is None:
+            return
+        with self.metrics.span("index"):
+            if self._search is not None:
+                self._search.replace_scroll(
+                    record["filename"], messages or [], record["date"]
+                )
+            if self._store is not None:
+                self._store.add_scroll(
+                    record["filename"], messages or [], record.get("conversation_id")
+                )
+
+    def _write_threads_serial(
+        self, tasks: Iterable[tuple[int, object]]
+    ) -> list[tuple[int, str]]:
+        failures: list[tuple[int, str]] = []
+        for idx, thread in tasks:
+            self._log(f"Parsing conversation {idx}...")
+            _, error, record, messages, timings = _render_thread(
+                idx, thread, str(self.output_dir), self._parser_options, self._keep_messages
+            )
+            if error:
+                failures.append((idx, error))
+            else:
+                self._scroll_done(record, messages, timings)
+                self._log(f"Writing to {self.output_dir / _scroll_name(idx)}")
+        return failures
+
+    def _write_threads_parallel(
+        self, tasks: Iterable[tuple[int, object]]
+    ) -> list[tuple[int, str]]:
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+        failures: list[tuple[int, str]] = []
+        # bound the number of threads in flight so streamed input stays streamed
+        max_pending = self.workers * 4
+        self._log(f"Rendering conversations with {self.workers} workers...")
+
+        def collect(done) -> None:
+            for fut in done:
+                idx = futures.pop(fut)
                 try:
-                    html_text = ThreadParser(thread, export_id=self.export_id).parse()
+                    _, error, record, messages, timings = fut.result()
                 except Exception as exc:
-                    print(f"Failed to parse conversation {idx}: {exc}")
+                    error, record, messages, timings = f"worker failed: {exc}", None, None, {}
+                if error:
+                    failures.append((idx, error))
+                else:
+                    self._scroll_done(record, messages, timings)
+
+        futures: dict = {}
+        with ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_silence_worker
+        ) as pool:
+            for idx, thread in tasks:
+                fut = pool.submit(
+                    _render_thread,
+                    idx,
+                    thread,
+                    str(self.output_dir),
+                    self._parser_options,
+                    self._keep_messages,
+                )
+                futures[fut] = idx
+                if len(futures) >= max_pending:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    collect(done)
+            done, _ = wait(futures)
+            collect(done)
+        return failures
+
+
+class ExportManifest:
+    """Persistent map of conversation id to rendered scroll.
+
+    The manifest lives as ``manifest.json`` next to the scrolls and records,
+    for every conversation id, the content hash, the export's ``update_time``
+    and the scroll filename. :meth:`plan` filters a stream of threads down to
+    the ones that are new or changed, reusing the recorded filename for known
+    conversations and numbering new ones after the highest known scroll.
+    Entries are only updated by :meth:`commit` once their scroll was written.
+
+    The render ``options`` of the run that wrote the scrolls are stored next
+    to ``version``. When they differ from the current run's (say annotations
+    or the search index were just turned on), every entry counts as changed
+    so no unchanged scroll is left rendered or indexed the old way.
+    """
+
+    FILENAME = "manifest.json"
+
+    def __init__(
+        self,
+        path: Path,
+        entries: dict[str, dict] | None = None,
+        options: dict | None = None,
+        previous_options: dict | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.entries: dict[str, dict] = entries or {}
+        self.options = options or {}
+        # entries written under other options must all be rendered again
+        self.options_changed = bool(self.entries) and previous_options != self.options
+        self.pending: dict[int, tuple[str, dict]] = {}
+        self._pending_ids: set[str] = set()
+        self.skipped = 0
+        self.rendered = 0
+
+    @classmethod
+    def load(cls, output_dir: str | Path, options: dict | None = None) -> "ExportManifest":
+        """Return the manifest stored in ``output_dir`` (empty if missing).
+
+        ``options`` are the render options of the current run.
+        """
+        path = Path(output_dir) / cls.FILENAME
+        entries: dict[str, dict] = {}
+        previous = None
+        if path.is_file():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                entries = dict(data.get("conversations", {}))
+                previous = data.get("options")
+            except Exception as exc:
+                print(f"Failed to load {path}, starting a fresh manifest: {exc}")
+        return cls(path, entries, options, previous)
+
+    def save(self) -> None:
+        """Atomically write the manifest back to disk."""
+        data = {"version": 1, "options": self.options, "conversations": self.entries}
+        tmp_path = self.path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+    def plan(self, threads: Iterable[object]) -> Iterator[tuple[int, object]]:
+        """Yield ``(index, thread)`` for threads that need rendering."""
+        next_idx = max(
+            (_scroll_index(e.get("filename", "")) for e in self.entries.values()),
+            default=0,
+        ) + 1
+        for thread in threads:
+            digest = None
+            conv_id = _conversation_id(thread)
+            if conv_id is None:
+                digest = _thread_hash(thread)
+                conv_id = digest
+            update_time = thread.get("update_time") if isinstance(thread, dict) else None
+            if conv_id in self._pending_ids:
+                # a repeated id in one export: the first copy keeps the scroll,
+                # so a second index is never handed out and orphaned
+                self.skipped += 1
+                continue
+
+            entry = self.entries.get(conv_id)
+            if (
+                entry
+                and not self.options_changed
+                and (self.path.parent / entry.get("filename", "")).is_file()
+            ):
+                if update_time is not None and entry.get("update_time") == update_time:
+                    self.skipped += 1
+                    continue
+                digest = digest or _thread_hash(thread)
+                if entry.get("hash") == digest:
+                    entry["update_time"] = update_time
+                    self.skipped += 1
                     continue
+                idx = _scroll_index(entry["filename"])
+            elif entry and _scroll_index(entry.get("filename", "")):
+                idx = _scroll_index(entry["filename"])
+            else:
+                idx = next_idx
+                next_idx += 1
+
+            self._pending_ids.add(conv_id)
+            self.pending[idx] = (
+                conv_id,
+                {
+                    "hash": digest or _thread_hash(thread),
+                    "update_time": update_time,
+                    "filename": _scroll_name(idx),
+                },
+            )
+            yield idx, thread
+
+    def commit(
+        self, failed: set[int] | None = None, records: dict[str, dict] | None = None
+    ) -> None:
+        """Record pending entries whose scroll index is not in ``failed``.
+
+        Scroll metadata from ``records`` (keyed by filename) is stored on each
+        entry so later runs can index unchanged scrolls without reading them.
+        """
+        failed = failed or set()
+        records = records or {}
+        for idx, (conv_id, entry) in self.pending.items():
+            if idx in failed:
+                if self.options_changed and conv_id in self.entries:
+                    # its scroll still has the old options; retry next run
+                    self.entries[conv_id].update(hash=None, update_time=None)
+                continue
+            entry.update(records.get(entry["filename"], {}))
+            self.entries[conv_id] = entry
+            self.rendered += 1
+        self.pending = {}
+        self._pending_ids = set()
 
-                dest_name = f"{idx:03d}-conversation.html"
-                dest_path = self.output_dir / dest_name
-                try:
-                    dest_path.write_text(html_text, encoding="utf-8")
-                    print(f"Writing to {dest_path}")
-                except Exception as exc:
-                    print(f"Failed to write {dest_path}: {exc}")
 
-        # after all scrolls are written, generate the root index
-        # this index is the archive trailhead for browsing
-        KernelIndexPage().run(self.output_dir)
+def _conversation_id(thread: object) -> str | None:
+    """Return the export's id for ``thread`` if it carries one."""
+    if isinstance(thread, dict):
+        for key in ("id", "conversation_id"):
+            val = thread.get(key)
+            if isinstance(val, str) and val:
+                return val
+    return None
+
+
+def _thread_hash(thread: object) -> str:
+    """Return a stable content hash for a raw thread."""
+    payload = json.dumps(thread, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _scroll_index(filename: str) -> int:
+    """Return the numeric prefix of a scroll filename, or ``0``."""
+    m = re.match(r"(\d+)-conversation\.html$", filename)
+    return int(m.group(1)) if m else 0
+
+
+def _silence_worker() -> None:
+    """Discard per-thread chatter from pool workers; the parent reports."""
+    import os
+    import sys
+
+    sys.stdout = open(os.devnull, "w")
+
+
+def _scroll_name(idx: int) -> str:
+    """Return the scroll filename for the ``idx``-th conversation."""
+    return f"{idx:03d}-conversation.html"
+
+
+def _render_thread(
+    idx: int,
+    thread: object,
+    output_dir: str,
+    parser_options: dict,
+    keep_messages: bool = False,
+) -> tuple[int, str | None, dict | None, list[dict] | None, dict[str, float]]:
+    """Parse ``thread`` and write it to ``output_dir``.
+
+    ``parser_options`` are keyword arguments for :class:`ThreadParser`.
+    Runs in worker processes, so it takes only picklable arguments and
+    reports failures as ``(idx, message, None, None, {})`` instead of
+    raising. On success the third item is the scroll's index record, the
+    fourth the normalized messages when ``keep_messages`` is set and the
+    fifth the seconds spent normalizing, rendering and writing.
+    """
+    parser = ThreadParser(thread, **parser_options)
+    dest_path = Path(output_dir) / _scroll_name(idx)
+    # write beside the destination and rename, so a failed parse never
+    # leaves a truncated scroll behind
+    tmp_path = dest_path.with_name(dest_path.name + ".tmp")
+    start = time.perf_counter()
+    try:
+        with tmp_path.open("w", encoding="utf-8", buffering=1 << 16) as fh:
+            parser.parse_to(fh)
+        tmp_path.replace(dest_path)
+        size = dest_path.stat().st_size
+    except OSError as exc:
+        tmp_path.unlink(missing_ok=True)
+        return idx, f"write to {dest_path} failed: {exc}", None, None, {}
+    except Exception as exc:
+        tmp_path.unlink(missing_ok=True)
+        return idx, f"parse failed: {exc}", None, None, {}
+    timings = dict(parser.timings)
+    # whatever parse_to did not account for is opening, flushing and renaming
+    timings["write"] = max(0.0, time.perf_counter() - start - sum(timings.values()))
+    record = dict(
+        parser.metadata,
+        filename=dest_path.name,
+        bytes=size,
+        conversation_id=_conversation_id(thread),
+    )
+    return idx, None, record, parser.messages if keep_messages else None, timings
+
+
+class TimeEngine:
+    """Convert epoch timestamps into one timezone, in batches.
+
+    The tzinfo is looked up once per engine, and :func:`time_engine` shares one
+    engine per timezone per process. :meth:`localize` converts a whole batch of
+    timestamps at once: the UTC offset is resolved once per UTC hour and
+    reused for every timestamp in that hour, with a full tz conversion only
+    for an hour that contains a DST transition.
+
+    ## Parameters
+    tz : str
+        IANA timezone name, e.g. ``"America/Denver"``.
+    """
+
+    def __init__(self, tz: str = "America/Denver") -> None:
+        self.tz_name = tz
+        self.tzinfo = pytz.timezone(tz)
+        self._hour_offsets: dict[int, object] = {}
+
+    def _offset_at(self, ts: float):
+        return datetime.fromtimestamp(ts, tz=pytz.utc).astimezone(self.tzinfo).utcoffset()
+
+    def _hour_zone(self, hour: int):
+        """Return a fixed-offset tzinfo for UTC ``hour``, or ``None`` if it straddles a transition."""
+        zone = self._hour_offsets.get(hour, False)
+        if zone is False:
+            first = self._offset_at(hour * 3600)
+            last = self._offset_at(hour * 3600 + 3599.999999)
+            zone = timezone(first) if first == last else None
+            self._hour_offsets[hour] = zone
+        return zone
+
+    def localize(self, timestamps: Iterable[float | None]) -> list[datetime | None]:
+        """Return local datetimes for ``timestamps``; ``None`` entries stay ``None``."""
+        out: list[datetime | None] = []
+        for ts in timestamps:
+            if ts is None:
+                out.append(None)
+                continue
+            zone = self._hour_zone(int(ts // 3600))
+            if zone is None:
+                out.append(datetime.fromtimestamp(ts, tz=pytz.utc).astimezone(self.tzinfo))
+            else:
+                out.append(datetime.fromtimestamp(ts, tz=zone))
+        return out
+
+
+@lru_cache(maxsize=None)
+def time_engine(tz: str = "America/Denver") -> TimeEngine:
+    """Return the process-wide :class:`TimeEngine` for ``tz``."""
+    return TimeEngine(tz)
 
 
 class ThreadParser:
-    """Parses individual conversation files into structured HTML with user/agent turns."""
+    """Parses individual conversation files into structured HTML with user/agent turns.
+
+    When a thread carries a ``mapping`` tree and a ``current_node``, only the
+    active branch (the path from the root to ``current_node``) is rendered by
+    default, so regenerated siblings are left out. Pass ``active_branch=False``
+    to render every node in depth-first order instead.
+
+    An optional ``annotator`` (a :class:`TurnSummaryAnnotator`) renders each
+    turn with its summary block straight from the normalized message, so
+    annotated scrolls are written once instead of being re-parsed afterwards.
+
+    Times are rendered in ``tz`` (default ``America/Denver``). Every
+    normalized message with a ``create_time`` gets a local ISO ``time``, and
+    ``show_times=True`` writes it as a ``<div class="turn-time">`` line ahead
+    of the turn.
+
+    Asset-pointer parts of a message are collected as ``attachments`` file ids
+    rather than rendered as text. Given an ``attachments`` resolver (file id to
+    href, e.g. :class:`AttachmentResolver`), each one is linked after its turn.
+
+    Progress chatter is printed only with ``verbose=True``.
+
+    After :meth:`parse`, :attr:`messages` holds the normalized message dicts
+    and :attr:`metadata` the scroll's ``date``, a ``snippet`` of the first user
+    prompt and the number of rendered ``turns``; :attr:`timings` holds the
+    seconds spent normalizing and rendering.
+    """
 
-    def __init__(self, raw_thread: dict | str, export_id: str) -> None:
+    def __init__(
+        self,
+        raw_thread: dict | str,
+        export_id: str,
+        active_branch: bool = True,
+        annotator: "TurnSummaryAnnotator | None" = None,
+        tz: str = "America/Denver",
+        show_times: bool = False,
+        attachments: Callable[[str], str | None] | None = None,
+        verbose: bool = False,
+    ) -> None:
         """Store raw thread data for later parsing."""
         self.raw_thread = raw_thread
         self.export_id = export_id
-        print("ThreadParser initialized")
+        self.active_branch = active_branch
+        self.annotator = annotator
+        self.tz = tz
+        self.show_times = show_times
+        self.attachments = attachments
+        self.messages: list[dict] = []
+        self.metadata: dict = {}
+        self.timings: dict[str, float] = {}
+        self.verbose = verbose
 
     def _load_thread(self) -> dict | list:
         """Return thread as Python object, loading JSON if needed."""
@@ -119,131 +938,248 @@ class ThreadParser:
         try:
             return json.loads(self.raw_thread)
         except Exception as exc:  # pragma: no cover - safety net
-            print(f"Failed to load thread JSON: {exc}")
+            if self.verbose:
+                print(f"Failed to load thread JSON: {exc}")
             return {}
 
     def _compute_times(self, thread: dict | list, messages: list[dict]) -> tuple[str, str, str]:
-        """Return start datetime, end datetime, and date string."""
+        """Return start datetime, end datetime, and date string.
+
+        Also sets each message's local ``time`` in the same batched pass.
+        """
+        engine = time_engine(self.tz)
         ts_list: list[float] = []
         if isinstance(thread, dict):
             for key in ("create_time", "createTime", "timestamp"):
                 val = thread.get(key)
                 if isinstance(val, (int, float)):
                     ts_list.append(float(val))
+
+        msg_ts: list[float | None] = []
         for msg in messages:
-            for key in ("create_time", "timestamp"):
-                val = msg.get(key)
-                if isinstance(val, (int, float)):
-                    ts_list.append(float(val))
+            val = msg.get("create_time", msg.get("timestamp"))
+            msg_ts.append(float(val) if isinstance(val, (int, float)) else None)
+        for msg, dt in zip(messages, engine.localize(msg_ts)):
+            if dt is not None:
+                msg["time"] = dt.isoformat()
+        ts_list.extend(ts for ts in msg_ts if ts is not None)
+
         if not ts_list:
             from datetime import date
             today = date.today().isoformat()
             return "", "", today
-        start_ts = min(ts_list)
-        end_ts = max(ts_list)
-        denver = pytz.timezone("America/Denver")
-        start_dt = datetime.fromtimestamp(start_ts, tz=pytz.utc).astimezone(denver)
-        end_dt = datetime.fromtimestamp(end_ts, tz=pytz.utc).astimezone(denver)
+        start_dt, end_dt = engine.localize([min(ts_list), max(ts_list)])
         return start_dt.isoformat(), end_dt.isoformat(), start_dt.date().isoformat()
 
+    @staticmethod
+    def _message_entry(msg: object) -> dict | None:
+        """Return ``{"author", "content"}`` for a raw message, or ``None`` if empty.
+
+        The message's numeric ``create_time`` (or ``timestamp``, as
+        messages-style exports name it) is carried over as ``create_time``.
+        """
+        if not isinstance(msg, dict):
+            return None
+        author = msg.get("author")
+        if isinstance(author, dict):
+            author = author.get("role")
+        content = msg.get("content")
+        files: list[str] = []
+        if isinstance(content, dict):
+            parts = content.get("parts", [])
+            if isinstance(parts, list) and parts:
+                texts = []
+                for p in parts:
+                    pointer = p.get("asset_pointer") if isinstance(p, dict) else None
+                    if isinstance(pointer, str):
+                        # e.g. "file-service://file-AbC123" -> "file-AbC123"
+                        files.append(pointer.rsplit("/", 1)[-1])
+                    elif p:
+                        texts.append(str(p).strip())
+                content_text = "\n".join(texts)
+            else:
+                content_text = content.get("text", "").strip()
+        else:
+            content_text = content or ""
+        if not content_text.strip() and not files:
+            return None
+        entry = {"author": author, "content": content_text.strip()}
+        if files:
+            entry["attachments"] = files
+        for key in ("create_time", "timestamp"):
+            create_time = msg.get(key)
+            if isinstance(create_time, (int, float)):
+                entry["create_time"] = create_time
+                break
+        return entry
+
+    def _walk_mapping(self, thread: dict) -> list[dict]:
+        """Return the messages of a ``mapping`` tree in conversation order.
+
+        Uses explicit stacks rather than recursion so arbitrarily deep threads
+        stay within the interpreter's recursion limit.
+        """
+        mapping = thread["mapping"]
+        current = thread.get("current_node")
+        path = self._active_path(mapping, current) if self.active_branch else None
+        node_ids: Iterable[str] = reversed(path) if path else self._preorder(mapping)
+
+        ordered: list[dict] = []
+        for node_id in node_ids:
+            entry = self._message_entry(mapping[node_id].get("message"))
+            if entry:
+                ordered.append(entry)
+        return ordered
+
+    @staticmethod
+    def _active_path(mapping: dict, current: object) -> list[str] | None:
+        """Return node ids from ``current`` up to the tree root, leaf first.
+
+        Missing ``parent`` pointers are recovered from the ``children`` lists.
+        Returns ``None`` when ``current`` is unknown or its chain never reaches
+        the root, so the caller can render the whole tree instead.
+        """
+        if current not in mapping:
+            return None
+        child_parent = {
+            child: nid
+            for nid, node in mapping.items()
+            if isinstance(node, dict)
+            for child in node.get("children") or ()
+        }
+        path: list[str] = []
+        seen: set[str] = set()
+        node_id = current
+        while node_id in mapping and node_id not in seen:
+            seen.add(node_id)
+            path.append(node_id)
+            node = mapping[node_id]
+            parent = node.get("parent") if isinstance(node, dict) else None
+            node_id = parent if parent in mapping else child_parent.get(node_id)
+        # a cycle or a dangling parent id stops short of the root
+        root = next(ThreadParser._preorder(mapping), None)
+        return path if path[-1] == root else None
+
+    @staticmethod
+    def _preorder(mapping: dict) -> Iterator[str]:
+        """Yield node ids of ``mapping`` depth-first, children in listed order."""
+        if "client-created-root" in mapping:
+            roots = ["client-created-root"]
+        else:
+            roots = [
+                nid for nid, node in mapping.items()
+                if isinstance(node, dict) and node.get("parent") not in mapping
+            ]
+        seen: set[str] = set()
+        stack = list(reversed(roots))
+        while stack:
+            node_id = stack.pop()
+            node = mapping.get(node_id)
+            if not node or node_id in seen:
+                continue
+            seen.add(node_id)
+            yield node_id
+            stack.extend(reversed(node.get("children", [])))
+
     def _normalize_messages(self, thread: dict | list) -> list[dict]:
         """Return ordered list of messages by walking the conversation tree."""
         if isinstance(thread, list):
             messages = thread
         elif isinstance(thread, dict):
             if "mapping" in thread:
-                mapping = thread["mapping"]
-                root_id = "client-created-root"
-                ordered: list[dict] = []
-
-                def walk(node_id: str) -> None:
-                    node = mapping.get(node_id)
-                    if not node:
-                        return
-                    msg = node.get("message")
-                    if msg and isinstance(msg, dict):
-                        author = msg.get("author")
-                        if isinstance(author, dict):
-                            author = author.get("role")
-                        content = msg.get("content")
-                        if isinstance(content, dict):
-                            parts = content.get("parts", [])
-                            if isinstance(parts, list) and parts:
-                                content_text = "\n".join(str(p).strip() for p in parts if p)
-                            else:
-                                content_text = content.get("text", "").strip()
-                        else:
-                            content_text = content or ""
-                        if content_text.strip():
-                            ordered.append({"author": author, "content": content_text.strip()})
-                    for child_id in node.get("children", []):
-                        walk(child_id)
-
-                walk(root_id)
-                return ordered
+                return self._walk_mapping(thread)
             elif "messages" in thread and isinstance(thread["messages"], list):
                 messages = thread["messages"]
             else:
-                print("Unsupported or missing mapping structure.")
+                if self.verbose:
+                    print("Unsupported or missing mapping structure.")
                 return []
         else:
-            print("Unsupported or missing mapping structure.")
+            if self.verbose:
+                print("Unsupported or missing mapping structure.")
             return []
 
         ordered = []
         for msg in messages:
-            if not isinstance(msg, dict):
-                continue
-            author = msg.get("author")
-            if isinstance(author, dict):
-                author = author.get("role")
-            content = msg.get("content")
-            if isinstance(content, dict):
-                parts = content.get("parts", [])
-                if isinstance(parts, list) and parts:
-                    content_text = "\n".join(str(p).strip() for p in parts if p)
-                else:
-                    content_text = content.get("text", "").strip()
-            else:
-                content_text = content or ""
-            if content_text.strip():
-                ordered.append({"author": author, "content": content_text.strip()})
+            entry = self._message_entry(msg)
+            if entry:
+                ordered.append(entry)
         return ordered
 
     def parse(self) -> str:
         """Convert raw thread into HTML text."""
-        print("Parsing thread...")
+        buf = io.StringIO()
+        self.parse_to(buf)
+        return buf.getvalue()
+
+    def parse_to(self, stream: IO[str]) -> None:
+        """Write the thread as HTML to ``stream``, one line per turn.
+
+        Each turn is escaped and written as soon as it is rendered, so only one
+        turn's markup is held in memory at a time. Open file handles should be
+        buffered; :class:`ChatExportArchiver` uses 64 KiB buffers.
+        """
+        if self.verbose:
+            print("Parsing thread...")
+        t0 = time.perf_counter()
         thread_obj = self._load_thread()
         messages = self._normalize_messages(thread_obj)
+        self.messages = messages
 
         start, end, date_str = self._compute_times(thread_obj, messages)
+        t1 = time.perf_counter()
         arc = thread_obj.get("arc", "") if isinstance(thread_obj, dict) else ""
 
-        lines: list[str] = []
-        lines.append('<div class="meta">')
-        lines.append(f'<div class="export-id">{html.escape(self.export_id)}</div>')
+        write = stream.write
+        write('<div class="meta">\n')
+        write(f'<div class="export-id">{html.escape(self.export_id)}</div>\n')
         if start:
-            lines.append(f'<div class="start">{start}</div>')
+            write(f'<div class="start">{start}</div>\n')
         if end:
-            lines.append(f'<div class="end">{end}</div>')
-        lines.append(f'<div class="date">{date_str}</div>')
-        lines.append('<div class="participants"><span>zero</span><span>tide</span></div>')
+            write(f'<div class="end">{end}</div>\n')
+        write(f'<div class="date">{date_str}</div>\n')
+        write('<div class="participants"><span>zero</span><span>tide</span></div>\n')
         if arc:
-            lines.append(f'<div class="arc">{html.escape(str(arc))}</div>')
-        lines.append('</div>')
+            write(f'<div class="arc">{html.escape(str(arc))}</div>\n')
+        write('</div>\n')
 
-        for msg in messages:
+        snippet = ""
+        turns = 0
+        for idx, msg in enumerate(messages, 1):
             role = msg.get("author")
+            if role not in {"user", "assistant"}:
+                if self.verbose:
+                    print(f"Skipping unknown author: {role}")
+                continue
+            if role == "user" and not snippet:
+                snippet = " ".join(msg.get("content", "").split()[:20])
+            turns += 1
+            if self.show_times and msg.get("time"):
+                write(f'<div class="turn-time">{msg["time"]}</div>\n')
+            if self.annotator is not None:
+                for block in self.annotator.render_turn(idx, msg):
+                    write(block + "\n")
+                self._write_attachments(write, msg)
+                continue
             content = html.escape(msg.get("content", "")).replace("\n", "<br>\n")
             if role == "user":
-                lines.append(f'<div class="user-turn"><h2>zero:</h2>{content}</div>')
-            elif role == "assistant":
-                lines.append(f'<div class="assistant-turn"><h2>tide:</h2>{content}</div>')
+                write(f'<div class="user-turn"><h2>zero:</h2>{content}</div>\n')
             else:
-                print(f"Skipping unknown author: {role}")
+                write(f'<div class="assistant-turn"><h2>tide:</h2>{content}</div>\n')
+            self._write_attachments(write, msg)
+
+        self.metadata = {"date": date_str, "snippet": snippet, "turns": turns}
+        self.timings = {"normalize": t1 - t0, "render": time.perf_counter() - t1}
 
-        html_text = "\n".join(lines).rstrip() + "\n"
-        return html_text
+    def _write_attachments(self, write: Callable[[str], object], msg: dict) -> None:
+        """Link the attachments of ``msg`` that the resolver can provide."""
+        if self.attachments is None:
+            return
+        for file_id in msg.get("attachments", ()):
+            href = self.attachments(file_id)
+            if href:
+                name = html.escape(href.rsplit("/", 1)[-1])
+                write(f'<div class="attachment"><a href="{html.escape(href)}">{name}</a></div>\n')
 
 
 class KernelIndexPage:
@@ -260,7 +1196,9 @@ class KernelIndexPage:
     Requirements:
     - Use only standard Python libraries (e.g., os, re, html, datetime).
     - Sort scrolls chronologically based on filename prefix (e.g. "003").
-    - Extract the date string and first user prompt by reading from each file.
+    - Take the date string and first user prompt from the metadata records
+      collected during export; read a scroll from disk only when no record
+      covers it.
     - Group scroll links by date (if possible), and maintain clean visual rhythm.
     - Output must be valid HTML viewable in any basic browser or Markdown preview.
     - Avoid JavaScript or external CSS. Minimal inline CSS is permitted.
@@ -269,54 +1207,119 @@ class KernelIndexPage:
     immediately orients the user. The visual layout should echo clarity: a quiet 
     trailhead where each scroll announces its tone with a glance. Return nothing;
     simply write the index file to disk.
+
+    A record is a dict with ``filename``, ``date`` and ``snippet`` keys, plus
+    the informational ``turns`` and ``bytes`` counts, as produced by
+    :class:`ChatExportArchiver` while it writes each scroll.
+
+    With ``sharded=True`` the scrolls are split into one page per month,
+    ``index-YYYY-MM.html``, and ``index.html`` becomes a small root page that
+    links to each month. A digest of every shard's entries is kept in
+    ``index-shards.json`` and a month page is only rewritten when its digest
+    changes, so adding a day of conversations touches a single shard. A
+    later unsharded run removes the month pages and ``index-shards.json``.
     """
 
-    def run(self, directory: str | Path) -> None:
-        """Scan ``directory`` and write an ``index.html`` summarizing its scrolls."""
+    SHARD_STATE = "index-shards.json"
+
+    def __init__(self, sharded: bool = False) -> None:
+        self.sharded = sharded
+
+    def run(self, directory: str | Path, records: Iterable[dict] | None = None) -> None:
+        """Write an ``index.html`` summarizing the scrolls in ``directory``.
+
+        ``records`` supplies per-scroll metadata; scrolls without a record are
+        scanned from disk as a fallback.
+        """
         from os import listdir
-        from pathlib import Path
-        import html
-        import re
 
         dir_path = Path(directory)
+        by_name = {r["filename"]: r for r in records or () if "date" in r}
         files = []
         for name in listdir(dir_path):
             m = re.match(r"(\d+)-conversation\.html$", name)
             if not m:
                 continue
-            try:
-                num = int(m.group(1))
-            except ValueError:
-                num = 0
-            files.append((num, dir_path / name))
+            files.append((int(m.group(1)), name))
         files.sort(key=lambda x: x[0])
 
         entries: list[tuple[str, str, str]] = []
-        for _, fpath in files:
-            try:
-                text = fpath.read_text(encoding="utf-8")
-            except Exception:
+        for _, name in files:
+            record = by_name.get(name) or self._scan_scroll(dir_path / name)
+            if record is None:
                 continue
-            date_match = re.search(r'<div class="date">([^<]+)</div>', text)
-            date_str = date_match.group(1) if date_match else ""
-            user_match = re.search(
-                r'<div class="user-turn">.*?<h2>zero:</h2>(.*?)</div>',
-                text,
-                re.DOTALL,
+            entries.append((record["date"], name, html.escape(record["snippet"])))
+
+        if self.sharded:
+            self._write_shards(dir_path, entries)
+        else:
+            page = self._render_page("Archive Index", entries)
+            (dir_path / "index.html").write_text(page, encoding="utf-8")
+            self._remove_shards(dir_path)
+
+    def _remove_shards(self, dir_path: Path) -> None:
+        """Delete month pages and shard state left by an earlier sharded run."""
+        from os import listdir
+
+        for name in listdir(dir_path):
+            if re.match(r"index-(\d{4}-\d{2}|undated)\.html$", name):
+                (dir_path / name).unlink(missing_ok=True)
+        (dir_path / self.SHARD_STATE).unlink(missing_ok=True)
+
+    def _write_shards(self, dir_path: Path, entries: list[tuple[str, str, str]]) -> None:
+        """Write one page per month plus a root page linking to them."""
+        shards: dict[str, list[tuple[str, str, str]]] = {}
+        for entry in entries:
+            month = entry[0][:7] if re.match(r"\d{4}-\d{2}", entry[0]) else "undated"
+            shards.setdefault(month, []).append(entry)
+
+        state_path = dir_path / self.SHARD_STATE
+        try:
+            state = json.loads(state_path.read_text(encoding="utf-8"))
+        except Exception:
+            state = {}
+
+        new_state: dict[str, str] = {}
+        for month, shard_entries in shards.items():
+            page_name = f"index-{month}.html"
+            digest = hashlib.sha256(
+                json.dumps(shard_entries).encode("utf-8")
+            ).hexdigest()
+            new_state[month] = digest
+            if state.get(month) == digest and (dir_path / page_name).is_file():
+                continue
+            page = self._render_page(f"Archive Index \u2014 {month}", shard_entries)
+            (dir_path / page_name).write_text(page, encoding="utf-8")
+
+        for month in set(state) - set(new_state):
+            (dir_path / f"index-{month}.html").unlink(missing_ok=True)
+
+        root_lines = self._page_head("Archive Index")
+        root_lines.append("<ul>")
+        for month in sorted(shards):
+            page_name = f"index-{month}.html"
+            count = len(shards[month])
+            root_lines.append(
+                f'<li><a href="{html.escape(page_name)}">{html.escape(month)}</a>'
+                f" – {count} scroll{'s' if count != 1 else ''}</li>"
             )
-            snippet_raw = user_match.group(1) if user_match else ""
-            snippet_text = re.sub(r"<[^>]+>", " ", snippet_raw)
-            snippet_words = snippet_text.split()
-            snippet = " ".join(snippet_words[:20])
-            entries.append((date_str, fpath.name, html.escape(snippet)))
-
-        index_lines: list[str] = []
-        index_lines.append("<html><head><meta charset='utf-8'>")
-        index_lines.append(
-            "<style>body{font-family:sans-serif;} h2{margin-top:1em;} ul{list-style:none;padding:0;} li{margin:0.2em 0;}</style>"
-        )
-        index_lines.append("</head><body>")
-        index_lines.append("<h1>Archive Index</h1>")
+        root_lines.append("</ul>")
+        root_lines.append("</body></html>")
+        (dir_path / "index.html").write_text("\n".join(root_lines), encoding="utf-8")
+        state_path.write_text(json.dumps(new_state, indent=2, sort_keys=True), encoding="utf-8")
+
+    @staticmethod
+    def _page_head(title: str) -> list[str]:
+        return [
+            "<html><head><meta charset='utf-8'>",
+            "<style>body{font-family:sans-serif;} h2{margin-top:1em;} ul{list-style:none;padding:0;} li{margin:0.2em 0;}</style>",
+            "</head><body>",
+            f"<h1>{html.escape(title)}</h1>",
+        ]
+
+    def _render_page(self, title: str, entries: list[tuple[str, str, str]]) -> str:
+        """Return an index page listing ``entries`` grouped by date."""
+        index_lines = self._page_head(title)
 
         current_date = None
         for date_str, fname, snippet in entries:
@@ -332,8 +1335,26 @@ class KernelIndexPage:
             index_lines.append("</ul>")
 
         index_lines.append("</body></html>")
+        return "\n".join(index_lines)
 
-        (dir_path / "index.html").write_text("\n".join(index_lines), encoding="utf-8")
+    @staticmethod
+    def _scan_scroll(fpath: Path) -> dict | None:
+        """Recover a scroll's index record by reading its HTML."""
+        try:
+            text = fpath.read_text(encoding="utf-8")
+        except Exception:
+            return None
+        date_match = re.search(r'<div class="date">([^<]+)</div>', text)
+        date_str = date_match.group(1) if date_match else ""
+        user_match = re.search(
+            r'<div class="user-turn">.*?<h2>zero:</h2>(.*?)</div>',
+            text,
+            re.DOTALL,
+        )
+        snippet_raw = user_match.group(1) if user_match else ""
+        snippet_text = html.unescape(re.sub(r"<[^>]+>", " ", snippet_raw))
+        snippet = " ".join(snippet_text.split()[:20])
+        return {"filename": fpath.name, "date": date_str, "snippet": snippet}
 
 
 class ScrollTableOfContents:
@@ -428,65 +1449,117 @@ class TurnSummaryAnnotator:
     can catch the rhythm, content, and structure at a glance.
     """
 
-    def run(self, messages: list[dict]) -> list[str]:
-        """Return HTML blocks for ``messages`` with summary annotations."""
-        import html
-        import re
-        from collections import Counter
-
-        try:  # attempt to load nltk stopwords
-            import nltk
-            stop_words = set(nltk.corpus.stopwords.words("english"))
-        except Exception:
-            # call ``breathing_willow.setup_nltk()`` to download these corpora
-            stop_words = {
-                "the",
-                "and",
-                "to",
-                "of",
-                "a",
-                "in",
-                "that",
-                "it",
-                "is",
-                "for",
-                "on",
-                "with",
-                "as",
-                "this",
-                "by",
-                "an",
-                "be",
-            }
+    @property
+    def stop_words(self) -> frozenset[str]:
+        """Stopwords used to filter summary tokens (shared module cache)."""
+        return summary_stop_words()
 
+    def run(self, messages: list[dict]) -> list[str]:
+        """Return HTML blocks for ``messages`` with summary annotations.
+
+        Summaries for the whole batch are computed in one
+        :func:`summarize_terms` pass before any HTML is rendered.
+        """
+        turns = [
+            (idx, msg)
+            for idx, msg in enumerate(messages, 1)
+            if msg.get("author") in {"user", "assistant"}
+        ]
+        summaries = summarize_terms(msg.get("content", "") for _, msg in turns)
         blocks: list[str] = []
-        for idx, msg in enumerate(messages, 1):
-            role = msg.get("author")
-            if role not in {"user", "assistant"}:
-                continue
-            prefix = "zero" if role == "user" else "tide"
-            content = msg.get("content", "")
-            esc_content = html.escape(content).replace("\n", "<br>\n")
-            blocks.append(f'<div class="{role}-turn" id="turn-{idx:03d}"><h2>{prefix}:</h2>{esc_content}</div>')
-
-            words = [w.lower() for w in re.findall(r"[A-Za-z']+", content)]
-            filtered = [w for w in words if w not in stop_words]
-            common = [w for w, _ in Counter(filtered).most_common(5)]
-            summary = " ".join(common)
-            magnifier = "\U0001f50d"  # 🔍
-            annot = (
-                f'<div class="turn-summary" style="font-size:smaller;color:#666;">'
-                f'{magnifier} Summary: {html.escape(summary)} — [{len(content)} chars]'
-                "</div>"
-            )
-            blocks.append(annot)
-
+        for (idx, msg), summary in zip(turns, summaries):
+            blocks.extend(self.render_turn(idx, msg, summary))
         return blocks
 
+    def render_turn(self, idx: int, msg: dict, summary: str | None = None) -> list[str]:
+        """Return the turn block and its summary block for message ``idx``.
+
+        Messages that are not from ``user`` or ``assistant`` yield no blocks.
+        ``summary`` may be passed in when it was already computed in a batch.
+        """
+        role = msg.get("author")
+        if role not in {"user", "assistant"}:
+            return []
+        prefix = "zero" if role == "user" else "tide"
+        content = msg.get("content", "")
+        esc_content = html.escape(content).replace("\n", "<br>\n")
+        turn = f'<div class="{role}-turn" id="turn-{idx:03d}"><h2>{prefix}:</h2>{esc_content}</div>'
+
+        if summary is None:
+            summary = summarize_terms([content])[0]
+        magnifier = "\U0001f50d"  # 🔍
+        annot = (
+            f'<div class="turn-summary" style="font-size:smaller;color:#666;">'
+            f'{magnifier} Summary: {html.escape(summary)} — [{len(content)} chars]'
+            "</div>"
+        )
+        return [turn, annot]
+
+
+_SUMMARY_WORD_RE = re.compile(r"[A-Za-z']+")
+
+_FALLBACK_STOP_WORDS = frozenset(
+    {
+        "the",
+        "and",
+        "to",
+        "of",
+        "a",
+        "in",
+        "that",
+        "it",
+        "is",
+        "for",
+        "on",
+        "with",
+        "as",
+        "this",
+        "by",
+        "an",
+        "be",
+    }
+)
+
+
+@lru_cache(maxsize=None)
+def summary_stop_words() -> frozenset[str]:
+    """Return the stopwords for turn summaries, loaded once per process."""
+    try:  # attempt to load nltk stopwords
+        import nltk
+        return frozenset(nltk.corpus.stopwords.words("english"))
+    except Exception:
+        # call ``breathing_willow.setup_nltk()`` to download these corpora
+        return _FALLBACK_STOP_WORDS
+
+
+def summarize_terms(contents: Iterable[str], top_n: int = 5) -> list[str]:
+    """Return the ``top_n`` most frequent non-stopword terms of each text.
+
+    Terms are lowercased runs of letters and apostrophes; ties keep first
+    occurrence order. Stopwords are removed from the distinct terms of each
+    text rather than from every token.
+    """
+    stop_words = summary_stop_words()
+    findall = _SUMMARY_WORD_RE.findall
+    summaries: list[str] = []
+    for content in contents:
+        if content.isascii():
+            counts = Counter(findall(content.lower()))
+        else:
+            # lowercasing non-ASCII text first can change what the pattern matches
+            counts = Counter(w.lower() for w in findall(content))
+        for word in stop_words & counts.keys():
+            del counts[word]
+        summaries.append(" ".join(w for w, _ in counts.most_common(top_n)))
+    return summaries
+
 
 def annotate_scrolls_in_dir(output_dir: Path) -> None:
     """Annotate each conversation scroll in ``output_dir`` with turn summaries.
 
+    Prefer ``ChatExportArchiver(annotate=True)`` for new exports: it annotates
+    from the normalized messages while writing, avoiding this HTML round-trip.
+
     This function searches ``output_dir`` for HTML files matching
     ``*-conversation.html``. For each file it extracts the ordered list of user
     and assistant turns, runs :class:`TurnSummaryAnnotator` to generate
@@ -0,0 +1,98 @@
+"""Per-stage timings and counters for the export pipeline.
+
+:class:`ExportMetrics` collects named spans (accumulated seconds and call
+counts) and integer counters while :class:`~breathing_willow.export_kernel.
+ChatExportArchiver` runs. At the end of a run the archiver writes them as
+``export-metrics.json`` in the output directory, a receipt of where the time
+went::
+
+    {
+      "total_seconds": 12.3,
+      "spans": {"load": {"seconds": 1.2, "calls": 5001}, ...},
+      "counters": {"scrolls": 4998, "turns": 61234, "bytes": 81234567, ...}
+    }
+
+Spans measured inside worker processes are summed across workers, so with
+``workers > 1`` they can add up to more than ``total_seconds``.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+class ExportMetrics:
+    """Accumulate spans and counters for one export run.
+
+    ## Methods
+    span(name)
+        Context manager adding the elapsed time of its block to ``name``.
+    add_span(name, seconds, calls=1)
+        Record time measured elsewhere, e.g. in a worker process.
+    timed(name, iterable)
+        Yield from ``iterable``, charging the time spent producing items.
+    count(name, n=1)
+        Increment counter ``name``.
+    summary()
+        Return the metrics as a JSON-ready dict.
+    write(path)
+        Atomically write :meth:`summary` to ``path``.
+    """
+
+    FILENAME = "export-metrics.json"
+
+    def __init__(self) -> None:
+        self.spans: dict[str, dict[str, float]] = {}
+        self.counters: dict[str, int] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, time.perf_counter() - start)
+
+    def add_span(self, name: str, seconds: float, calls: int = 1) -> None:
+        entry = self.spans.setdefault(name, {"seconds": 0.0, "calls": 0})
+        entry["seconds"] += seconds
+        entry["calls"] += calls
+
+    def timed(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        """Yield items of ``iterable``; time spent in ``next()`` goes to ``name``."""
+        it = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                self.add_span(name, time.perf_counter() - start)
+                return
+            self.add_span(name, time.perf_counter() - start)
+            yield item
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self) -> dict:
+        return {
+            "total_seconds": round(time.perf_counter() - self._started, 6),
+            "spans": {
+                name: {"seconds": round(s["seconds"], 6), "calls": s["calls"]}
+                for name, s in self.spans.items()
+            },
+            "counters": dict(self.counters),
+        }
+
+    def write(self, path: str | Path) -> None:
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(self.summary(), indent=2), encoding="utf-8")
+        tmp.replace(path)
@@ -0,0 +1,94 @@
+"""Level-of-detail reduction of the willow graph for rendering.
+
+Large graphs overwhelm the browser: pyvis writes every node and edge into the
+page and the physics simulation has to settle all of them before anything is
+readable. :func:`level_of_detail` builds a smaller graph to draw instead:
+
+* when there are more than ``max_nodes`` nodes, communities (Louvain, by edge
+  weight) collapse into one super-node each, labelled with their most common
+  summary terms and sized by membership, with parallel edges merged;
+* every node keeps only its ``top_k`` heaviest edges;
+* positions come from ``networkx.spring_layout`` so the page can be drawn with
+  physics disabled.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+
+
+def collapse_communities(graph, max_nodes: int = 500, seed: int = 42):
+    """Return ``graph`` with communities merged into super-nodes.
+
+    Graphs of at most ``max_nodes`` nodes are returned unchanged. Single-node
+    communities keep their original id and attributes.
+    """
+    import networkx as nx
+
+    if graph.number_of_nodes() <= max_nodes:
+        return graph
+    communities = nx.community.louvain_communities(graph, weight="weight", seed=seed)
+    owner = {}
+    collapsed = nx.Graph()
+    for i, members in enumerate(sorted(communities, key=lambda c: (-len(c), min(c)))):
+        if len(members) == 1:
+            (nid,) = members
+            owner[nid] = nid
+            collapsed.add_node(nid, **graph.nodes[nid], size=1)
+            continue
+        cid = f"cluster-{i}"
+        terms = Counter(t for nid in members for t in set(graph.nodes[nid].get("tokens", [])))
+        top = [t for t, _ in terms.most_common(5)]
+        collapsed.add_node(
+            cid,
+            summary=f"{len(members)} docs: " + " ".join(top),
+            path=", ".join(sorted(graph.nodes[nid].get("path", "") for nid in members)[:10]),
+            size=len(members),
+        )
+        for nid in members:
+            owner[nid] = cid
+    for a, b, data in graph.edges(data=True):
+        ca, cb = owner[a], owner[b]
+        if ca == cb:
+            continue
+        weight = data.get("weight", 1)
+        if collapsed.has_edge(ca, cb):
+            collapsed[ca][cb]["weight"] += weight
+        else:
+            collapsed.add_edge(ca, cb, weight=weight)
+    return collapsed
+
+
+def prune_top_k(graph, k: int = 5):
+    """Return a copy of ``graph`` keeping each node's ``k`` heaviest edges.
+
+    An edge survives if it is among the top ``k`` of either endpoint, so no
+    node that had edges is left isolated.
+    """
+    keep = set()
+    for nid in graph:
+        heaviest = sorted(
+            graph[nid].items(), key=lambda kv: (-kv[1].get("weight", 1), str(kv[0]))
+        )[:k]
+        keep.update(frozenset((nid, other)) for other, _ in heaviest)
+    pruned = graph.__class__()
+    pruned.add_nodes_from(graph.nodes(data=True))
+    pruned.add_edges_from(
+        (a, b, data) for a, b, data in graph.edges(data=True) if frozenset((a, b)) in keep
+    )
+    return pruned
+
+
+def level_of_detail(graph, top_k: int = 5, max_nodes: int = 500, scale: float = 1000.0):
+    """Return ``(reduced_graph, positions)`` ready for a physics-free render.
+
+    ``positions`` maps node ids to ``(x, y)`` pixel coordinates from a seeded
+    spring layout of the reduced graph.
+    """
+    import networkx as nx
+
+    reduced = prune_top_k(collapse_communities(graph, max_nodes), top_k)
+    if not len(reduced):
+        return reduced, {}
+    pos = nx.spring_layout(reduced, weight="weight", seed=42, scale=scale)
+    return reduced, {nid: (float(x), float(y)) for nid, (x, y) in pos.items()}
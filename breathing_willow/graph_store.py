@@ -0,0 +1,302 @@
+"""SQLite storage for the willow growth graph.
+
+:class:`GraphStore` keeps the graph that :class:`~breathing_willow.willow_viz.
+WillowGrowth` otherwise saves as node-link JSON in one SQLite file:
+
+``vocab``
+    every summary token once, with an integer id
+``nodes``
+    one row per document; tokens are stored as a packed array of vocab ids,
+    clusters and any extra attributes as JSON
+``edges``
+    one row per undirected edge with its weight
+``postings``
+    the token id to node inverted index used to find overlap neighbours
+
+Nothing is read up front. Appending a document touches only its own rows and
+the posting lists of its tokens, and :meth:`GraphStore.to_networkx` builds
+the full in-memory graph only for callers that need it.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import sys
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Iterator
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vocab (
+    id INTEGER PRIMARY KEY,
+    token TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    id TEXT PRIMARY KEY,
+    path TEXT,
+    summary TEXT,
+    clusters TEXT,
+    tokens BLOB,
+    attrs TEXT
+);
+CREATE TABLE IF NOT EXISTS edges (
+    a TEXT NOT NULL,
+    b TEXT NOT NULL,
+    weight INTEGER NOT NULL,
+    PRIMARY KEY (a, b)
+);
+CREATE INDEX IF NOT EXISTS edges_b ON edges(b);
+CREATE TABLE IF NOT EXISTS postings (
+    token INTEGER NOT NULL,
+    node TEXT NOT NULL,
+    PRIMARY KEY (token, node)
+) WITHOUT ROWID;
+"""
+
+# keep IN (...) lists well under SQLite's bound-parameter limit
+_CHUNK = 500
+
+
+def _chunks(items: list, size: int = _CHUNK) -> Iterator[list]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _pack(ids: Iterable[int]) -> bytes:
+    arr = array("I", ids)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _unpack(blob: bytes | None) -> array:
+    arr = array("I")
+    if blob:
+        arr.frombytes(blob)
+        if sys.byteorder != "little":
+            arr.byteswap()
+    return arr
+
+
+class GraphStore:
+    """Lazily read SQLite store of willow graph nodes, edges and postings.
+
+    ## Parameters
+    db_path : Path
+        Location of the SQLite database. Created on first use.
+
+    ## Methods
+    add_node(node_id, tokens, **attrs)
+        Insert or replace a node and index its tokens.
+    update_node(node_id, **attrs)
+        Merge ``attrs`` into an existing node.
+    add_edge(a, b, weight)
+        Insert or update an undirected edge.
+    overlaps(tokens)
+        Count shared distinct tokens per node from the posting lists.
+    node_tokens(node_ids)
+        Read the tokens of just the given nodes.
+    to_networkx()
+        Materialize the whole graph as a ``networkx.Graph``.
+    write_graph(graph)
+        Replace the stored graph with ``graph``.
+    commit() / close()
+        Persist pending writes; close the connection.
+    """
+
+    SUFFIXES = (".sqlite", ".db")
+    _COLUMNS = ("path", "summary", "clusters", "tokens")
+
+    def __init__(self, db_path: str | Path) -> None:
+        self.db_path = Path(db_path)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "GraphStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+
+    def __contains__(self, node_id: object) -> bool:
+        row = self.conn.execute("SELECT 1 FROM nodes WHERE id = ?", (node_id,)).fetchone()
+        return row is not None
+
+    def _token_ids(self, tokens: Iterable[str]) -> dict[str, int]:
+        """Return vocab ids for ``tokens``, adding unseen ones."""
+        distinct = list(dict.fromkeys(tokens))
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO vocab(token) VALUES (?)", ((t,) for t in distinct)
+        )
+        ids: dict[str, int] = {}
+        for chunk in _chunks(distinct):
+            marks = ",".join("?" * len(chunk))
+            ids.update(
+                self.conn.execute(
+                    f"SELECT token, id FROM vocab WHERE token IN ({marks})", chunk
+                )
+            )
+        return ids
+
+    def add_node(self, node_id: str, tokens: list[str], **attrs) -> None:
+        """Insert or replace ``node_id`` with its ``tokens`` and attributes."""
+        ids = self._token_ids(tokens)
+        extra = {k: v for k, v in attrs.items() if k not in self._COLUMNS}
+        self.conn.execute("DELETE FROM postings WHERE node = ?", (node_id,))
+        # upsert rather than replace so a node keeps its insertion order
+        self.conn.execute(
+            "INSERT INTO nodes(id, path, summary, clusters, tokens, attrs) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+            "path = excluded.path, summary = excluded.summary, "
+            "clusters = excluded.clusters, tokens = excluded.tokens, "
+            "attrs = excluded.attrs",
+            (
+                node_id,
+                attrs.get("path"),
+                attrs.get("summary"),
+                json.dumps(attrs.get("clusters", [])),
+                _pack(ids[t] for t in tokens),
+                json.dumps(extra) if extra else None,
+            ),
+        )
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO postings(token, node) VALUES (?, ?)",
+            ((tid, node_id) for tid in set(ids.values())),
+        )
+
+    def update_node(self, node_id: str, **attrs) -> None:
+        """Merge ``attrs`` (other than tokens) into an existing node."""
+        row = self.conn.execute(
+            "SELECT attrs FROM nodes WHERE id = ?", (node_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(node_id)
+        extra = json.loads(row[0]) if row[0] else {}
+        for key, value in attrs.items():
+            if key in ("path", "summary"):
+                self.conn.execute(
+                    f"UPDATE nodes SET {key} = ? WHERE id = ?", (value, node_id)
+                )
+            elif key == "clusters":
+                self.conn.execute(
+                    "UPDATE nodes SET clusters = ? WHERE id = ?", (json.dumps(value), node_id)
+                )
+            elif key != "tokens":
+                extra[key] = value
+        self.conn.execute(
+            "UPDATE nodes SET attrs = ? WHERE id = ?",
+            (json.dumps(extra) if extra else None, node_id),
+        )
+
+    def add_edge(self, a: str, b: str, weight: int) -> None:
+        if b < a:
+            a, b = b, a
+        self.conn.execute(
+            "INSERT INTO edges(a, b, weight) VALUES (?, ?, ?) "
+            "ON CONFLICT(a, b) DO UPDATE SET weight = excluded.weight",
+            (a, b, weight),
+        )
+
+    def has_edge(self, a: str, b: str) -> bool:
+        if b < a:
+            a, b = b, a
+        row = self.conn.execute("SELECT 1 FROM edges WHERE a = ? AND b = ?", (a, b)).fetchone()
+        return row is not None
+
+    def overlaps(self, tokens: Iterable[str]) -> Counter:
+        """Return ``{node_id: number of distinct tokens shared with tokens}``."""
+        distinct = list(set(tokens))
+        counts: Counter = Counter()
+        for chunk in _chunks(distinct):
+            marks = ",".join("?" * len(chunk))
+            counts.update(
+                dict(
+                    self.conn.execute(
+                        f"SELECT p.node, COUNT(*) FROM postings p "
+                        f"JOIN vocab v ON v.id = p.token "
+                        f"WHERE v.token IN ({marks}) GROUP BY p.node",
+                        chunk,
+                    )
+                )
+            )
+        return counts
+
+    def _vocab(self) -> list[str | None]:
+        """Return the vocabulary as a list indexed by token id."""
+        size = self.conn.execute("SELECT MAX(id) FROM vocab").fetchone()[0] or 0
+        tokens: list[str | None] = [None] * (size + 1)
+        for tid, token in self.conn.execute("SELECT id, token FROM vocab"):
+            tokens[tid] = token
+        return tokens
+
+    def node_tokens(self, node_ids: Iterable[str]) -> dict[str, list[str]]:
+        """Return ``{node_id: tokens}`` for the stored nodes among ``node_ids``."""
+        ids = list(node_ids)
+        packed: dict[str, bytes] = {}
+        for chunk in _chunks(ids):
+            marks = ",".join("?" * len(chunk))
+            packed.update(
+                self.conn.execute(f"SELECT id, tokens FROM nodes WHERE id IN ({marks})", chunk)
+            )
+        wanted = {tid for blob in packed.values() for tid in _unpack(blob)}
+        vocab: dict[int, str] = {}
+        for chunk in _chunks(list(wanted)):
+            marks = ",".join("?" * len(chunk))
+            vocab.update(
+                self.conn.execute(f"SELECT id, token FROM vocab WHERE id IN ({marks})", chunk)
+            )
+        return {nid: [vocab[tid] for tid in _unpack(blob)] for nid, blob in packed.items()}
+
+    def nodes(self, offset: int = 0) -> Iterator[tuple[str, dict]]:
+        """Yield ``(node_id, attrs)`` in insertion order, skipping ``offset`` nodes."""
+        vocab = self._vocab()
+        rows = self.conn.execute(
+            "SELECT id, path, summary, clusters, tokens, attrs FROM nodes "
+            "ORDER BY rowid LIMIT -1 OFFSET ?",
+            (offset,),
+        )
+        for node_id, path, summary, clusters, tokens, extra in rows:
+            data = json.loads(extra) if extra else {}
+            data.update(
+                path=path,
+                summary=summary,
+                clusters=json.loads(clusters) if clusters else [],
+                tokens=[vocab[tid] for tid in _unpack(tokens)],
+            )
+            yield node_id, data
+
+    def edges(self) -> Iterator[tuple[str, str, int]]:
+        yield from self.conn.execute("SELECT a, b, weight FROM edges ORDER BY rowid")
+
+    def to_networkx(self):
+        """Return the stored graph as a ``networkx.Graph``."""
+        import networkx as nx
+
+        graph = nx.Graph()
+        graph.add_nodes_from(self.nodes())
+        graph.add_weighted_edges_from(self.edges())
+        return graph
+
+    def write_graph(self, graph) -> None:
+        """Replace the stored nodes and edges with those of ``graph``."""
+        with self.conn:
+            for table in ("nodes", "edges", "postings"):
+                self.conn.execute(f"DELETE FROM {table}")
+            for node_id, data in graph.nodes(data=True):
+                data = dict(data)
+                tokens = data.pop("tokens", [])
+                self.add_node(node_id, tokens, **data)
+            for a, b, data in graph.edges(data=True):
+                self.add_edge(a, b, data.get("weight", 1))
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
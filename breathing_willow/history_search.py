@@ -0,0 +1,112 @@
+"""Full-text search over exported ChatGPT scrolls.
+
+:class:`HistorySearchIndex` keeps an SQLite database next to the scrolls with
+one row per normalized message and an FTS5 index over the message text. The
+export kernel feeds it while writing scrolls, so searching never has to touch
+the HTML. Only the standard library ``sqlite3`` module is required, built with
+FTS5 (the default for CPython's bundled SQLite).
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Iterable
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL,
+    turn INTEGER NOT NULL,
+    role TEXT,
+    date TEXT,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS turns_filename ON turns(filename);
+CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5(
+    text, content='turns', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS turns_ai AFTER INSERT ON turns BEGIN
+    INSERT INTO turns_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS turns_ad AFTER DELETE ON turns BEGIN
+    INSERT INTO turns_fts(turns_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+class HistorySearchIndex:
+    """SQLite FTS5 index of every exported turn.
+
+    ## Parameters
+    db_path : Path
+        Location of the SQLite database. Created on first use.
+
+    ## Methods
+    replace_scroll(filename, messages, date="")
+        Drop any rows for ``filename`` and index ``messages`` in its place.
+    search(query, limit=20)
+        Return turn hits ranked by BM25.
+    close()
+        Commit pending writes and close the connection.
+    """
+
+    FILENAME = "search.sqlite"
+
+    def __init__(self, db_path: str | Path) -> None:
+        self.db_path = Path(db_path)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "HistorySearchIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def replace_scroll(
+        self, filename: str, messages: Iterable[dict], date: str = ""
+    ) -> None:
+        """Index ``messages`` as the turns of scroll ``filename``.
+
+        Turns are numbered from 1 in message order, matching the
+        ``turn-NNN`` anchors used by annotated scrolls.
+        """
+        self.conn.execute("DELETE FROM turns WHERE filename = ?", (filename,))
+        self.conn.executemany(
+            "INSERT INTO turns(filename, turn, role, date, text) VALUES (?, ?, ?, ?, ?)",
+            (
+                (filename, idx, msg.get("author"), date, msg.get("content", ""))
+                for idx, msg in enumerate(messages, 1)
+            ),
+        )
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        """Return up to ``limit`` turns matching the FTS5 ``query``, best first."""
+        rows = self.conn.execute(
+            """
+            SELECT t.filename, t.turn, t.role, t.date,
+                   snippet(turns_fts, 0, '[', ']', '…', 12),
+                   bm25(turns_fts)
+            FROM turns_fts JOIN turns t ON t.id = turns_fts.rowid
+            WHERE turns_fts MATCH ?
+            ORDER BY bm25(turns_fts)
+            LIMIT ?
+            """,
+            (query, limit),
+        ).fetchall()
+        return [
+            {
+                "filename": filename,
+                "turn": turn,
+                "role": role,
+                "date": date,
+                "snippet": snippet,
+                "score": -score,
+            }
+            for filename, turn, role, date, snippet, score in rows
+        ]
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,162 @@
+"""Compact message store written alongside exported scrolls.
+
+The export kernel writes every normalized message as one JSON line in
+``messages.jsonl`` and the byte offset of each line into ``messages.idx``, a
+flat array of little-endian unsigned 64-bit integers. Analytics can
+memory-map both files with :class:`MessageStore` and scan or randomly access
+millions of turns without parsing any HTML.
+
+Each row holds ``conversation_id``, ``filename``, ``turn`` (1-based position
+in the conversation), ``role``, ``timestamp`` (epoch seconds or ``None``) and
+``text``.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator
+
+DATA_NAME = "messages.jsonl"
+INDEX_NAME = "messages.idx"
+
+
+class MessageStoreWriter:
+    """Build a message store in ``directory``.
+
+    Rows are written to temporary files and moved into place by :meth:`close`,
+    so readers never observe a half-written store; :meth:`discard` drops them
+    and leaves the previous store untouched. With ``keep_existing`` the
+    rows of scrolls that were not rewritten in this run are carried over from
+    the previous store, which keeps incremental exports complete. A store
+    first requested on an existing archive changes the render options in its
+    manifest, so that run rewrites every scroll rather than relying on this.
+    """
+
+    def __init__(self, directory: str | Path, keep_existing: bool = False) -> None:
+        self.directory = Path(directory)
+        self.keep_existing = keep_existing
+        self.data_path = self.directory / DATA_NAME
+        self.index_path = self.directory / INDEX_NAME
+        self._tmp_data = self.data_path.with_name(DATA_NAME + ".tmp")
+        self._fh = self._tmp_data.open("wb")
+        self._offsets = array("Q")
+        self._written: set[str] = set()
+
+    def __enter__(self) -> "MessageStoreWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def add_scroll(
+        self,
+        filename: str,
+        messages: Iterable[dict],
+        conversation_id: str | None = None,
+    ) -> None:
+        """Append the rows for one scroll's normalized ``messages``."""
+        self._written.add(filename)
+        for turn, msg in enumerate(messages, 1):
+            row = {
+                "conversation_id": conversation_id,
+                "filename": filename,
+                "turn": turn,
+                "role": msg.get("author"),
+                "timestamp": msg.get("create_time"),
+                "text": msg.get("content", ""),
+            }
+            self._write_line(json.dumps(row, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    def _write_line(self, line: bytes) -> None:
+        self._offsets.append(self._fh.tell())
+        self._fh.write(line)
+
+    def discard(self) -> None:
+        """Drop the rows written so far without publishing them."""
+        if self._fh.closed:
+            return
+        self._fh.close()
+        self._tmp_data.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Carry over untouched rows if requested and publish the store."""
+        if self._fh.closed:
+            return
+        if self.keep_existing and self.data_path.is_file():
+            with MessageStore(self.directory) as previous:
+                for line in previous.iter_lines():
+                    filename = json.loads(line)["filename"]
+                    if filename not in self._written:
+                        self._write_line(line)
+        self._fh.close()
+
+        offsets = self._offsets
+        if sys.byteorder != "little":
+            offsets = array("Q", offsets)
+            offsets.byteswap()
+        tmp_index = self.index_path.with_name(INDEX_NAME + ".tmp")
+        tmp_index.write_bytes(offsets.tobytes())
+        self._tmp_data.replace(self.data_path)
+        tmp_index.replace(self.index_path)
+
+
+class MessageStore:
+    """Read-only, memory-mapped view of a message store.
+
+    ``len(store)`` is the number of rows, ``store[i]`` decodes row ``i`` and
+    iterating yields every row in file order.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self._data_fh = (self.directory / DATA_NAME).open("rb")
+        size = (self.directory / DATA_NAME).stat().st_size
+        self._data = (
+            mmap.mmap(self._data_fh.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        )
+        self._offsets = array("Q")
+        self._offsets.frombytes((self.directory / INDEX_NAME).read_bytes())
+        if sys.byteorder != "little":
+            self._offsets.byteswap()
+
+    def __enter__(self) -> "MessageStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def _line(self, i: int) -> bytes:
+        start = self._offsets[i]
+        end = self._offsets[i + 1] if i + 1 < len(self._offsets) else len(self._data)
+        return self._data[start:end]
+
+    def __getitem__(self, i: int) -> dict:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return json.loads(self._line(i))
+
+    def iter_lines(self) -> Iterator[bytes]:
+        """Yield the raw JSON line of every row."""
+        for i in range(len(self)):
+            yield self._line(i)
+
+    def __iter__(self) -> Iterator[dict]:
+        for line in self.iter_lines():
+            yield json.loads(line)
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data_fh.close()
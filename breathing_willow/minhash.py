@@ -0,0 +1,165 @@
+"""MinHash signatures and LSH buckets for near-duplicate willow nodes.
+
+:class:`MinHashLSH` stores a MinHash signature per graph node and bands them
+into locality-sensitive hash buckets, so nodes whose token sets are similar
+can be found by looking up a handful of buckets instead of comparing against
+every node. Signatures persist beside the graph as an append-only JSON-lines
+file (``<graph stem>.minhash.jsonl``); the buckets are rebuilt from them on
+load for the requested ``threshold``, so the threshold can change between
+runs without rehashing any documents.
+
+Band count and width are chosen so that a pair exactly at ``threshold``
+becomes a candidate with probability ``recall``; more similar pairs are found
+more reliably, less similar ones increasingly rarely. Lowering ``recall`` or
+raising ``threshold`` trades missed neighbours for fewer candidates.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Iterable
+
+_PRIME = (1 << 61) - 1
+
+
+def _band_shape(jaccard: float, num_perm: int, recall: float) -> tuple[int, int]:
+    """Return the widest ``(bands, rows)`` that still reaches ``recall``.
+
+    A pair with similarity ``jaccard`` shares at least one bucket with
+    probability ``1 - (1 - jaccard ** rows) ** bands``; wider bands give
+    fewer, more similar candidates, so pick the widest that keeps that
+    probability at or above ``recall``.
+    """
+    for rows in range(num_perm, 1, -1):
+        bands = num_perm // rows
+        if 1 - (1 - jaccard ** rows) ** bands >= recall:
+            return bands, rows
+    return num_perm, 1
+
+
+class MinHashLSH:
+    """MinHash signatures of node tokens with banded LSH lookup.
+
+    ## Parameters
+    path : Path
+        Location of the signature file. Read on construction if it exists.
+    threshold : float
+        Token similarity, ``overlap / max(len)``, the banding is tuned for.
+    recall : float
+        Probability that a node exactly at ``threshold`` is a candidate.
+    num_perm : int
+        Signature length. Longer signatures sharpen the threshold.
+
+    ## Methods
+    signature(tokens)
+        Return the MinHash signature of a token collection.
+    add(node_id, tokens)
+        Sign a new node, bucket it and append it to the file.
+    candidates(tokens)
+        Ids of nodes sharing at least one bucket with ``tokens``.
+    rebuild(nodes)
+        Replace everything with ``(node_id, tokens)`` pairs.
+    """
+
+    SUFFIX = ".minhash.jsonl"
+
+    def __init__(
+        self,
+        path: str | Path,
+        threshold: float = 0.3,
+        recall: float = 0.9,
+        num_perm: int = 64,
+        seed: int = 1,
+    ) -> None:
+        import numpy as np
+
+        self.path = Path(path)
+        self.threshold = threshold
+        self.recall = recall
+        self.num_perm = num_perm
+        # overlap / max(len) >= t implies Jaccard >= t / (2 - t)
+        self.bands, self.rows = _band_shape(threshold / (2 - threshold), num_perm, recall)
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.uint64)
+        self.buckets: dict[tuple[int, bytes], set[str]] = {}
+        self.nodes: set[str] = set()
+        if self.path.is_file():
+            self._load()
+
+    @classmethod
+    def for_graph(
+        cls, graph_path: str | Path, threshold: float = 0.3, recall: float = 0.9
+    ) -> "MinHashLSH":
+        """Return the signatures stored beside ``graph_path``."""
+        graph_path = Path(graph_path)
+        return cls(graph_path.with_name(graph_path.stem + cls.SUFFIX), threshold, recall)
+
+    def signature(self, tokens: Iterable[str]):
+        import numpy as np
+
+        hashes = np.array(
+            [
+                int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=4).digest(), "little")
+                for t in set(tokens)
+            ],
+            dtype=np.uint64,
+        )
+        if not len(hashes):
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        # a < 2**31 and hashes < 2**32, so a * x + b stays below 2**64
+        permuted = (np.outer(hashes, self._a) + self._b) % np.uint64(_PRIME)
+        return permuted.min(axis=0)
+
+    def _band_keys(self, sig) -> list[tuple[int, bytes]]:
+        r = self.rows
+        return [(i, sig[i * r:(i + 1) * r].tobytes()) for i in range(self.bands)]
+
+    def _insert(self, node_id: str, sig) -> None:
+        self.nodes.add(node_id)
+        for key in self._band_keys(sig):
+            self.buckets.setdefault(key, set()).add(node_id)
+
+    def _load(self) -> None:
+        import numpy as np
+
+        with self.path.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # a torn final append; the caller rebuilds
+                    continue
+                sig = np.array(entry["sig"], dtype=np.uint64)
+                if len(sig) != self.num_perm:
+                    # written with another signature length; force a rebuild
+                    self.nodes.add("")
+                    continue
+                self._insert(entry["id"], sig)
+
+    def add(self, node_id: str, tokens: Iterable[str]) -> None:
+        if node_id in self.nodes:
+            return
+        sig = self.signature(tokens)
+        self._insert(node_id, sig)
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps({"id": node_id, "sig": sig.tolist()}) + "\n")
+
+    def candidates(self, tokens: Iterable[str]) -> set[str]:
+        found: set[str] = set()
+        for key in self._band_keys(self.signature(tokens)):
+            found |= self.buckets.get(key, set())
+        return found
+
+    def rebuild(self, nodes: Iterable[tuple[str, Iterable[str]]]) -> None:
+        self.buckets = {}
+        self.nodes = set()
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            for node_id, tokens in nodes:
+                sig = self.signature(tokens)
+                self._insert(node_id, sig)
+                fh.write(json.dumps({"id": node_id, "sig": sig.tolist()}) + "\n")
+        tmp.replace(self.path)
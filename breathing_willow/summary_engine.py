@@ -0,0 +1,178 @@
+"""Incremental TF-IDF summarization for willow graph documents.
+
+:class:`SummaryEngine` replaces fitting a fresh ``TfidfVectorizer`` and
+``KMeans`` on every document. It keeps corpus-wide document frequencies that
+grow by one document per summary, so term weights reflect everything
+ingested so far rather than one document in isolation, and clusters each
+document's sentences with a small deterministic spherical k-means in NumPy.
+
+The statistics persist beside the graph as ``<graph stem>.idf.json``
+(``{"n_docs": ..., "df": {term: count}}``).
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+_TOKEN_RE = re.compile(r"(?u)\b\w\w+\b")
+_SENTENCE_RE = re.compile(r"[.!?]+")
+
+
+@lru_cache(maxsize=1)
+def _stop_words() -> frozenset[str]:
+    """Return the same English stop list ``TfidfVectorizer`` uses."""
+    try:
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+    except Exception:  # pragma: no cover - optional dependency
+        from .willow_viz import STOP_WORDS
+
+        return frozenset(STOP_WORDS)
+    return ENGLISH_STOP_WORDS
+
+
+def analyze(text: str, stop_words: frozenset[str] | None = None) -> list[list[str]]:
+    """Split ``text`` into sentences of lowercase, stop-word-free terms.
+
+    Sentences are split on ``.``, ``!`` and ``?`` and terms follow
+    ``TfidfVectorizer``'s default token pattern. Empty sentences are kept so
+    their positions match the text.
+    """
+    stop_words = _stop_words() if stop_words is None else stop_words
+    sentences = [s.strip() for s in _SENTENCE_RE.split(text) if s.strip()]
+    return [
+        [t for t in _TOKEN_RE.findall(s.lower()) if t not in stop_words]
+        for s in sentences
+    ]
+
+
+class SummaryEngine:
+    """Summarize documents against running corpus statistics.
+
+    ## Parameters
+    path : Path, optional
+        Where the document frequencies are persisted. Loaded if present.
+
+    ## Methods
+    summarize(sentences, top_n=5, max_clusters=5, update=True)
+        Fold one analyzed document into the statistics and return its
+        summary, clusters and summary words.
+    idf(term)
+        Smoothed inverse document frequency of ``term``.
+    save()
+        Write the statistics to :attr:`path`.
+    """
+
+    SUFFIX = ".idf.json"
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.path = Path(path) if path is not None else None
+        self.n_docs = 0
+        self.df: Counter = Counter()
+        self.dirty = False
+        if self.path is not None and self.path.is_file():
+            data = json.loads(self.path.read_text())
+            self.n_docs = data["n_docs"]
+            self.df = Counter(data["df"])
+
+    @classmethod
+    def for_graph(cls, graph_path: str | Path) -> "SummaryEngine":
+        """Return the engine whose statistics live beside ``graph_path``."""
+        graph_path = Path(graph_path)
+        return cls(graph_path.with_name(graph_path.stem + cls.SUFFIX))
+
+    def idf(self, term: str) -> float:
+        # the smoothed formula TfidfVectorizer uses, over the running corpus
+        return math.log((1 + self.n_docs) / (1 + self.df.get(term, 0))) + 1
+
+    def summarize(
+        self,
+        sentences: list[list[str]],
+        top_n: int = 5,
+        max_clusters: int = 5,
+        update: bool = True,
+    ) -> tuple[str, list[list[str]], list[str]]:
+        """Return ``(summary, clusters, summary_words)`` for one document.
+
+        ``sentences`` come from :func:`analyze`. The document is first added
+        to the corpus statistics (skip this with ``update=False`` for a
+        document already counted), then its sentences are weighted by TF-IDF,
+        grouped into up to ``max_clusters`` clusters and each cluster is
+        described by up to ``top_n`` of the heaviest terms of its centroid.
+        """
+        if not sentences:
+            return "", [], []
+        terms = sorted({t for s in sentences for t in s})
+        if update:
+            self.n_docs += 1
+            self.df.update(terms)
+            self.dirty = True
+        if not terms:
+            return "", [], []
+
+        import numpy as np
+
+        col = {t: i for i, t in enumerate(terms)}
+        flat = [row * len(terms) + col[t] for row, s in enumerate(sentences) for t in s]
+        X = np.bincount(flat, minlength=len(sentences) * len(terms)).astype(float)
+        X = X.reshape(len(sentences), len(terms))
+        df = np.array([self.df.get(t, 0) for t in terms], dtype=float)
+        X *= np.log((1 + self.n_docs) / (1 + df)) + 1
+        norms = np.linalg.norm(X, axis=1, keepdims=True)
+        X /= np.where(norms == 0, 1, norms)
+
+        centers = _spherical_kmeans(X, min(max_clusters, len(sentences)))
+        clusters = []
+        for center in centers:
+            top = np.argsort(-center, kind="stable")[:top_n]
+            clusters.append([terms[i] for i in top if center[i] > 0])
+        summary_words = [w for c in clusters for w in c]
+        return " ".join(summary_words[:50]), clusters, summary_words
+
+    def save(self) -> None:
+        if self.path is None or not self.dirty:
+            return
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"n_docs": self.n_docs, "df": self.df}))
+        tmp.replace(self.path)
+        self.dirty = False
+
+
+def _spherical_kmeans(X, k: int, max_iter: int = 20):
+    """Return ``k`` centroids of the unit rows of ``X``.
+
+    Seeds deterministically with farthest-point selection starting from the
+    first non-empty row, then runs cosine Lloyd iterations until assignments
+    stop changing. Centroids are left unnormalized means, like ``KMeans``.
+    """
+    import numpy as np
+
+    empty = ~X.any(axis=1)
+    first = int(np.argmin(empty))
+    seeds = [first]
+    sims = X @ X[first]
+    # never seed from a sentence that has no terms left
+    sims[empty] = np.inf
+    for _ in range(1, k):
+        nxt = int(np.argmin(sims))
+        seeds.append(nxt)
+        sims = np.maximum(sims, X @ X[nxt])
+    centers = X[seeds].copy()
+
+    labels = None
+    for _ in range(max_iter):
+        new_labels = np.argmax(X @ centers.T, axis=1)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        onehot = np.zeros((k, len(X)))
+        onehot[labels, np.arange(len(X))] = 1
+        sizes = onehot.sum(axis=1)
+        filled = sizes > 0
+        # an emptied cluster keeps its previous centroid
+        centers[filled] = (onehot[filled] @ X) / sizes[filled, None]
+    return centers
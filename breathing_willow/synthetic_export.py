@@ -0,0 +1,129 @@
+"""Synthetic ChatGPT exports for exercising and benchmarking the export kernel.
+
+:func:`write_synthetic_export` produces a zip shaped like a real ChatGPT data
+export: a ``conversations.json`` array of threads, each with a ``mapping``
+tree, ``current_node``, ids and timestamps. Thread count, depth of the active
+branch, how often turns were regenerated (branchiness) and message size are
+all configurable, and the output is deterministic for a given ``seed``.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import zipfile
+from pathlib import Path
+
+_WORDS = (
+    "willow river breath tide shaping rhythm archive scroll thread graph field "
+    "signal pulse loop kernel export prompt agent flow token summary cluster "
+    "node edge leaf branch root seed water light stone quiet orient surface "
+    "the and to of a in that it is for on with as this by an be"
+).split()
+
+
+def _text(rng: random.Random, n_words: int) -> str:
+    n = max(1, int(rng.gauss(n_words, n_words / 3)))
+    words = rng.choices(_WORDS, k=n)
+    # break long messages into paragraphs so renderers see newlines
+    for i in range(40, n, 40):
+        words[i] += "\n"
+    return " ".join(words).capitalize() + "."
+
+
+def make_thread(
+    rng: random.Random,
+    conv_id: str,
+    depth: int = 20,
+    branchiness: float = 0.1,
+    message_words: int = 80,
+    start_time: float = 1_700_000_000.0,
+) -> dict:
+    """Return one synthetic thread.
+
+    The active branch holds ``depth`` alternating user/assistant messages.
+    At each assistant turn, with probability ``branchiness``, an abandoned
+    regeneration is added as a sibling that is not on the active branch.
+    """
+    mapping: dict[str, dict] = {
+        "client-created-root": {
+            "id": "client-created-root",
+            "message": None,
+            "parent": None,
+            "children": [],
+        }
+    }
+    parent = "client-created-root"
+    ts = start_time
+    for i in range(depth):
+        role = "user" if i % 2 == 0 else "assistant"
+        ts += rng.uniform(5, 600)
+        if role == "assistant" and rng.random() < branchiness:
+            sib = f"{conv_id}-r{i}"
+            mapping[sib] = {
+                "id": sib,
+                "parent": parent,
+                "children": [],
+                "message": {
+                    "author": {"role": role},
+                    "create_time": ts,
+                    "content": {"content_type": "text", "parts": [_text(rng, message_words)]},
+                },
+            }
+            mapping[parent]["children"].append(sib)
+        nid = f"{conv_id}-n{i}"
+        mapping[nid] = {
+            "id": nid,
+            "parent": parent,
+            "children": [],
+            "message": {
+                "author": {"role": role},
+                "create_time": ts,
+                "content": {"content_type": "text", "parts": [_text(rng, message_words)]},
+            },
+        }
+        mapping[parent]["children"].append(nid)
+        parent = nid
+    return {
+        "id": conv_id,
+        "title": f"synthetic {conv_id}",
+        "create_time": start_time,
+        "update_time": ts,
+        "mapping": mapping,
+        "current_node": parent,
+    }
+
+
+def write_synthetic_export(
+    zip_path: str | Path,
+    threads: int = 100,
+    depth: int = 20,
+    branchiness: float = 0.1,
+    message_words: int = 80,
+    seed: int = 0,
+) -> Path:
+    """Write a synthetic export zip to ``zip_path`` and return its path.
+
+    Threads are serialized one at a time into the zip member, so generating a
+    very large export never holds more than one thread in memory.
+    """
+    rng = random.Random(seed)
+    zip_path = Path(zip_path)
+    start = 1_700_000_000.0
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        with zf.open("conversations.json", "w", force_zip64=True) as fh:
+            fh.write(b"[")
+            for i in range(threads):
+                thread = make_thread(
+                    rng,
+                    f"conv-{i:06d}",
+                    depth=depth,
+                    branchiness=branchiness,
+                    message_words=message_words,
+                    start_time=start + i * 3600 * 7,
+                )
+                if i:
+                    fh.write(b",")
+                fh.write(json.dumps(thread).encode("utf-8"))
+            fh.write(b"]")
+    return zip_path
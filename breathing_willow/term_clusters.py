@@ -0,0 +1,127 @@
+"""Online term clusters for the willow growth graph.
+
+:class:`TermClusters` folds graph nodes into a fixed number of clusters one
+at a time and keeps the centroids between runs, so ``willow update-net`` only
+has to place the nodes added since the previous run instead of re-vectorizing
+and re-clustering the whole graph. Existing clusters keep their identity and
+order; new nodes only nudge them, which keeps shaping-log entries stable.
+
+Each node is a unit TF-IDF vector over its summary tokens. A node joins the
+centroid with the highest cosine similarity, and that centroid moves toward it
+with a ``1 / count`` learning rate, the per-centre update ``MiniBatchKMeans``
+applies in ``partial_fit``. Until ``k`` clusters exist, each new distinct node
+seeds one. Centroids are sparse ``term -> weight`` maps, trimmed to their
+heaviest terms, and persist as ``<graph stem>.clusters.json``.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Iterable
+
+# centroid terms kept after each update; far more than the 5 ever reported
+_MAX_TERMS = 200
+
+
+def _unit_vector(tokens: Iterable[str], idf: Callable[[str], float]) -> dict[str, float]:
+    weights = {t: c * idf(t) for t, c in Counter(tokens).items()}
+    norm = math.sqrt(sum(w * w for w in weights.values()))
+    return {t: w / norm for t, w in weights.items()} if norm else {}
+
+
+class TermClusters:
+    """Persisted online clusters of node token vectors.
+
+    ## Parameters
+    path : Path
+        Location of the cluster state. Loaded if present.
+    k : int
+        Number of clusters to maintain.
+
+    ## Attributes
+    folded : int
+        How many graph nodes, in insertion order, have been folded in.
+
+    ## Methods
+    fold(tokens, idf)
+        Assign one node's tokens to a cluster and update its centroid.
+    top_terms(n=5)
+        Return the ``n`` heaviest terms of every cluster.
+    reset()
+        Forget every cluster and start over.
+    save()
+        Write the state to :attr:`path`.
+    """
+
+    SUFFIX = ".clusters.json"
+
+    def __init__(self, path: str | Path, k: int = 5) -> None:
+        self.path = Path(path)
+        self.k = k
+        self.folded = 0
+        self.centroids: list[dict] = []
+        if self.path.is_file():
+            data = json.loads(self.path.read_text())
+            if data.get("k") == k:
+                self.folded = data["folded"]
+                self.centroids = data["centroids"]
+
+    @classmethod
+    def for_graph(cls, graph_path: str | Path, k: int = 5) -> "TermClusters":
+        """Return the clusters stored beside ``graph_path``."""
+        graph_path = Path(graph_path)
+        return cls(graph_path.with_name(graph_path.stem + cls.SUFFIX), k)
+
+    def fold(self, tokens: Iterable[str], idf: Callable[[str], float]) -> int | None:
+        """Fold one node into the clusters and return its cluster index.
+
+        Nodes without tokens are counted as folded but join no cluster.
+        """
+        self.folded += 1
+        vec = _unit_vector(tokens, idf)
+        if not vec:
+            return None
+
+        best, best_sim = None, -1.0
+        for i, centroid in enumerate(self.centroids):
+            weights = centroid["weights"]
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            sim = sum(w * weights.get(t, 0.0) for t, w in vec.items()) / norm
+            if sim > best_sim:
+                best, best_sim = i, sim
+
+        if len(self.centroids) < self.k and (best is None or best_sim < 1.0 - 1e-9):
+            self.centroids.append({"count": 1, "weights": vec})
+            return len(self.centroids) - 1
+
+        centroid = self.centroids[best]
+        centroid["count"] += 1
+        rate = 1.0 / centroid["count"]
+        weights = centroid["weights"]
+        for t in weights:
+            weights[t] *= 1.0 - rate
+        for t, w in vec.items():
+            weights[t] = weights.get(t, 0.0) + rate * w
+        if len(weights) > _MAX_TERMS:
+            keep = sorted(weights.items(), key=lambda kv: (-kv[1], kv[0]))[:_MAX_TERMS]
+            centroid["weights"] = dict(keep)
+        return best
+
+    def reset(self) -> None:
+        self.folded = 0
+        self.centroids = []
+
+    def top_terms(self, n: int = 5) -> list[list[str]]:
+        return [
+            [t for t, _ in sorted(c["weights"].items(), key=lambda kv: (-kv[1], kv[0]))[:n]]
+            for c in self.centroids
+        ]
+
+    def save(self) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        state = {"k": self.k, "folded": self.folded, "centroids": self.centroids}
+        tmp.write_text(json.dumps(state))
+        tmp.replace(self.path)
@@ -0,0 +1,96 @@
+"""Persistent token to node inverted index for the willow growth graph.
+
+:class:`TokenIndex` maps every summary token to the ids of the graph nodes
+that contain it, so a new document's neighbours come from posting-list
+lookups instead of a scan over every node. The index lives beside the graph
+as an append-only JSON-lines file (``willow_growth_v5.tokens.jsonl`` for
+``willow_growth_v5.json``), one ``{"id": ..., "tokens": [...]}`` line per
+node, so adding a node costs one short append however large the graph is.
+"""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Iterable
+
+
+class TokenIndex:
+    """Inverted index of node tokens, persisted as JSON lines.
+
+    ## Parameters
+    path : Path
+        Location of the sidecar file. Read on construction if it exists.
+
+    ## Methods
+    add(node_id, tokens)
+        Index a new node and append it to the sidecar.
+    overlaps(tokens)
+        Count shared distinct tokens per node.
+    rebuild(nodes)
+        Replace the index with ``(node_id, tokens)`` pairs and rewrite the file.
+    """
+
+    SUFFIX = ".tokens.jsonl"
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.postings: dict[str, set[str]] = {}
+        self.nodes: set[str] = set()
+        if self.path.is_file():
+            self._load()
+
+    @classmethod
+    def for_graph(cls, graph_path: str | Path) -> "TokenIndex":
+        """Return the index stored beside ``graph_path``."""
+        graph_path = Path(graph_path)
+        return cls(graph_path.with_name(graph_path.stem + cls.SUFFIX))
+
+    def _load(self) -> None:
+        with self.path.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # a torn final append; the caller sees the node missing
+                    # from ``nodes`` and rebuilds
+                    continue
+                self._insert(entry["id"], entry["tokens"])
+
+    def _insert(self, node_id: str, tokens: Iterable[str]) -> None:
+        self.nodes.add(node_id)
+        for token in tokens:
+            self.postings.setdefault(token, set()).add(node_id)
+
+    def add(self, node_id: str, tokens: Iterable[str]) -> None:
+        """Index ``node_id`` under its distinct ``tokens``.
+
+        Node ids are content hashes, so a node that is already indexed keeps
+        its postings.
+        """
+        if node_id in self.nodes:
+            return
+        distinct = sorted(set(tokens))
+        self._insert(node_id, distinct)
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps({"id": node_id, "tokens": distinct}) + "\n")
+
+    def overlaps(self, tokens: Iterable[str]) -> Counter:
+        """Return ``{node_id: number of distinct tokens shared with tokens}``."""
+        counts: Counter = Counter()
+        for token in set(tokens):
+            counts.update(self.postings.get(token, ()))
+        return counts
+
+    def rebuild(self, nodes: Iterable[tuple[str, Iterable[str]]]) -> None:
+        """Index ``(node_id, tokens)`` pairs from scratch and rewrite the file."""
+        self.postings = {}
+        self.nodes = set()
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            for node_id, tokens in nodes:
+                distinct = sorted(set(tokens))
+                self._insert(node_id, distinct)
+                fh.write(json.dumps({"id": node_id, "tokens": distinct}) + "\n")
+        tmp.replace(self.path)
@@ -0,0 +1,176 @@
+"""Dense node vectors and matrix-multiply neighbours for the willow graph.
+
+:class:`VectorIndex` keeps one unit-length ``float32`` vector per graph node
+in a single contiguous matrix, so the similarity of a block of nodes against
+the whole graph is one matrix product instead of a Python loop over node
+pairs. The matrix lives beside the graph as raw little-endian ``float32`` rows
+(``<graph stem>.vectors.f32``) with the node ids one per line in
+``<graph stem>.vectors.ids``; both are append-only, and the matrix is read
+back with a single ``numpy.fromfile``.
+
+Vectors are TF-IDF weights of a node's summary tokens, hashed into ``dim``
+signed buckets (the feature-hashing trick) so their size stays fixed however
+large the vocabulary grows, and weighted with the running corpus IDF of
+:class:`~breathing_willow.summary_engine.SummaryEngine` at the time the node
+is added.
+"""
+
+from __future__ import annotations
+
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Iterable
+
+# query rows per neighbour-search block; each block scores them against every node
+_BLOCK = 1024
+
+
+def hashed_tfidf(tokens: Iterable[str], idf: Callable[[str], float], dim: int):
+    """Return the unit TF-IDF vector of ``tokens`` hashed into ``dim`` buckets."""
+    import numpy as np
+
+    vec = np.zeros(dim, dtype=np.float32)
+    for token, count in Counter(tokens).items():
+        h = zlib.crc32(token.encode("utf-8"))
+        # the top bit picks the sign so collisions cancel out on average
+        vec[h % dim] += (-1.0 if h & 0x80000000 else 1.0) * count * idf(token)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+class VectorIndex:
+    """Contiguous matrix of node vectors, persisted as raw ``float32`` rows.
+
+    ## Parameters
+    path : Path
+        Location of the matrix file; ids go to the same path with an
+        ``.ids`` suffix. Both are read on construction if present.
+    dim : int
+        Vector length.
+
+    ## Attributes
+    ids : list[str]
+        Node id of every row, in insertion order.
+    matrix : numpy.ndarray
+        ``(len(ids), dim)`` view of the stored vectors.
+
+    ## Methods
+    add(node_ids, vectors)
+        Append rows for new nodes.
+    neighbours(rows, k, min_similarity, earlier_only=False)
+        Top-``k`` most similar rows for each of ``rows``.
+    rebuild(node_ids, vectors)
+        Replace everything and rewrite both files.
+    """
+
+    SUFFIX = ".vectors.f32"
+
+    def __init__(self, path: str | Path, dim: int = 256) -> None:
+        import numpy as np
+
+        self.path = Path(path)
+        self.ids_path = self.path.with_suffix(".ids")
+        self.dim = dim
+        self.ids: list[str] = []
+        self._buf = np.zeros((0, dim), dtype="<f4")
+        if self.path.is_file() and self.ids_path.is_file():
+            ids = self.ids_path.read_text().split()
+            data = np.fromfile(self.path, dtype="<f4")
+            # a torn append or another dim leaves the files out of step;
+            # the caller sees the ids differ from the graph and rebuilds
+            if len(data) == len(ids) * dim:
+                self.ids = ids
+                self._buf = data.reshape(len(ids), dim)
+        self.rows = {nid: i for i, nid in enumerate(self.ids)}
+
+    @classmethod
+    def for_graph(cls, graph_path: str | Path, dim: int = 256) -> "VectorIndex":
+        """Return the vectors stored beside ``graph_path``."""
+        graph_path = Path(graph_path)
+        return cls(graph_path.with_name(graph_path.stem + cls.SUFFIX), dim)
+
+    @property
+    def matrix(self):
+        return self._buf[: len(self.ids)]
+
+    def _append(self, vectors) -> None:
+        import numpy as np
+
+        n = len(self.ids) + len(vectors)
+        if n > len(self._buf):
+            # grow geometrically so sequential appends stay amortized O(1)
+            grown = np.zeros((max(n, 2 * len(self._buf), 64), self.dim), dtype="<f4")
+            grown[: len(self.ids)] = self.matrix
+            self._buf = grown
+        self._buf[len(self.ids):n] = vectors
+
+    def add(self, node_ids: list[str], vectors) -> None:
+        """Append ``vectors`` (one row per id); already stored ids are skipped."""
+        import numpy as np
+
+        vectors = np.asarray(vectors, dtype="<f4").reshape(-1, self.dim)
+        keep = [i for i, nid in enumerate(node_ids) if nid not in self.rows]
+        if not keep:
+            return
+        vectors = vectors[keep]
+        node_ids = [node_ids[i] for i in keep]
+        self._append(vectors)
+        for nid in node_ids:
+            self.rows[nid] = len(self.ids)
+            self.ids.append(nid)
+        with self.path.open("ab") as fh:
+            fh.write(vectors.tobytes())
+        with self.ids_path.open("a", encoding="utf-8") as fh:
+            fh.write("".join(f"{nid}\n" for nid in node_ids))
+
+    def neighbours(
+        self,
+        rows: Iterable[int],
+        k: int = 10,
+        min_similarity: float = 0.0,
+        earlier_only: bool = False,
+    ) -> dict[int, list[tuple[int, float]]]:
+        """Return ``{row: [(other_row, cosine), ...]}``, most similar first.
+
+        Each row gets its ``k`` nearest other rows with similarity of at least
+        ``min_similarity``. With ``earlier_only`` a row only considers rows
+        stored before it, matching what linking nodes one at a time would see.
+        Scores are computed ``_BLOCK`` query rows at a time.
+        """
+        import numpy as np
+
+        rows = list(rows)
+        matrix = self.matrix
+        found: dict[int, list[tuple[int, float]]] = {}
+        for start in range(0, len(rows), _BLOCK):
+            block = np.asarray(rows[start:start + _BLOCK])
+            scores = matrix[block] @ matrix.T
+            scores[np.arange(len(block)), block] = -np.inf
+            if earlier_only:
+                scores[np.arange(len(matrix))[None, :] >= block[:, None]] = -np.inf
+            top = min(k, len(matrix))
+            if top == 0:
+                break
+            part = np.argpartition(scores, -top, axis=1)[:, -top:]
+            part_scores = np.take_along_axis(scores, part, axis=1)
+            order = np.argsort(-part_scores, axis=1, kind="stable")
+            part = np.take_along_axis(part, order, axis=1)
+            part_scores = np.take_along_axis(part_scores, order, axis=1)
+            for row, others, sims in zip(block.tolist(), part.tolist(), part_scores.tolist()):
+                found[row] = [(o, s) for o, s in zip(others, sims) if s >= min_similarity]
+        return found
+
+    def rebuild(self, node_ids: list[str], vectors) -> None:
+        import numpy as np
+
+        vectors = np.asarray(vectors, dtype="<f4").reshape(-1, self.dim)
+        self.ids = list(node_ids)
+        self.rows = {nid: i for i, nid in enumerate(self.ids)}
+        self._buf = vectors.copy()
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_bytes(vectors.tobytes())
+        tmp.replace(self.path)
+        tmp = self.ids_path.with_name(self.ids_path.name + ".tmp")
+        tmp.write_text("".join(f"{nid}\n" for nid in self.ids))
+        tmp.replace(self.ids_path)
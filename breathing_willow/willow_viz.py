@@ -3,90 +3,307 @@
 import hashlib
 import json
 import re
+from itertools import islice
 from pathlib import Path
 
-try:
-    import gensim  # type: ignore
-    from gensim import corpora  # type: ignore
-    from gensim.models import TfidfModel  # type: ignore
-except Exception:  # pragma: no cover - optional dependency
-    gensim = None  # type: ignore
-
-    class _DummyDictionary(dict):
-        def __init__(self, texts=None):
-            self.token2id = {}
-            if texts:
-                for tokens in texts:
-                    for t in tokens:
-                        if t not in self.token2id:
-                            self.token2id[t] = len(self.token2id)
-
-        def doc2bow(self, tokens):
-            counts = {}
-            for t in tokens:
-                if t in self.token2id:
-                    idx = self.token2id[t]
-                    counts[idx] = counts.get(idx, 0) + 1
-            return list(counts.items())
-
-    class _DummyTFIDF:
-        def __init__(self, corpus=None):
-            pass
-
-    corpora = type("corpora", (), {"Dictionary": _DummyDictionary})
-    TfidfModel = _DummyTFIDF  # type: ignore
-
-try:
-    import networkx as nx  # type: ignore
-except Exception:  # pragma: no cover - optional dependency
-    nx = None  # type: ignore
-
-try:
-    from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore
-    from sklearn.cluster import KMeans  # type: ignore
-except Exception:  # pragma: no cover - optional dependency
-    TfidfVectorizer = None  # type: ignore
-    KMeans = None  # type: ignore
-
-try:
-    import nltk
-    from nltk.tokenize import word_tokenize
-    from nltk.corpus import stopwords as nltk_stopwords
-    STOP_WORDS = set(nltk_stopwords.words('english'))
-except Exception:  # missing nltk or corpus
-    # call ``breathing_willow.setup_nltk()`` to download these corpora
-    word_tokenize = None
-    STOP_WORDS = {
-        'a', 'an', 'the', 'and', 'or', 'but', 'if', 'while', 'of', 'at', 'by',
-        'for', 'with', 'about', 'against', 'between', 'into', 'through', 'during',
-        'before', 'after', 'to', 'from', 'in', 'out', 'on', 'off', 'over', 'under',
-        'again', 'further', 'then', 'once', 'here', 'there', 'all', 'any', 'both',
-        'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not',
-        'only', 'own', 'same', 'so', 'than', 'too', 'very', 'can', 'will', 'just'
-    }
+from .graph_store import GraphStore
+from .minhash import MinHashLSH
+from .summary_engine import SummaryEngine, analyze
+from .term_clusters import TermClusters
+from .token_index import TokenIndex
+from .vector_index import VectorIndex, hashed_tfidf
+
+# gensim, networkx, scikit-learn and nltk take seconds to import, so they are
+# resolved on first use: ``_lazy(name)`` inside this module, module attribute
+# access (``willow_viz.nx``) outside it. A name assigned before first use, such
+# as ``willow_viz.word_tokenize = None`` in tests, is kept.
+
+
+def _load_gensim():
+    try:
+        import gensim  # type: ignore
+        from gensim import corpora  # type: ignore
+        from gensim.models import TfidfModel  # type: ignore
+    except Exception:  # pragma: no cover - optional dependency
+        gensim = None  # type: ignore
+
+        class _DummyDictionary(dict):
+            def __init__(self, texts=None):
+                self.token2id = {}
+                if texts:
+                    for tokens in texts:
+                        for t in tokens:
+                            if t not in self.token2id:
+                                self.token2id[t] = len(self.token2id)
+
+            def doc2bow(self, tokens):
+                counts = {}
+                for t in tokens:
+                    if t in self.token2id:
+                        idx = self.token2id[t]
+                        counts[idx] = counts.get(idx, 0) + 1
+                return list(counts.items())
+
+        class _DummyTFIDF:
+            def __init__(self, corpus=None):
+                pass
+
+        corpora = type("corpora", (), {"Dictionary": _DummyDictionary})
+        TfidfModel = _DummyTFIDF  # type: ignore
+    return {"gensim": gensim, "corpora": corpora, "TfidfModel": TfidfModel}
+
+
+def _load_networkx():
+    try:
+        import networkx as nx  # type: ignore
+    except Exception:  # pragma: no cover - optional dependency
+        nx = None  # type: ignore
+    return {"nx": nx}
+
+
+def _load_sklearn():
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore
+        from sklearn.cluster import KMeans  # type: ignore
+    except Exception:  # pragma: no cover - optional dependency
+        TfidfVectorizer = None  # type: ignore
+        KMeans = None  # type: ignore
+    return {"TfidfVectorizer": TfidfVectorizer, "KMeans": KMeans}
+
+
+def _load_nltk():
+    try:
+        from nltk.tokenize import word_tokenize
+        from nltk.corpus import stopwords as nltk_stopwords
+        STOP_WORDS = set(nltk_stopwords.words('english'))
+    except Exception:  # missing nltk or corpus
+        # call ``breathing_willow.setup_nltk()`` to download these corpora
+        word_tokenize = None
+        STOP_WORDS = {
+            'a', 'an', 'the', 'and', 'or', 'but', 'if', 'while', 'of', 'at', 'by',
+            'for', 'with', 'about', 'against', 'between', 'into', 'through', 'during',
+            'before', 'after', 'to', 'from', 'in', 'out', 'on', 'off', 'over', 'under',
+            'again', 'further', 'then', 'once', 'here', 'there', 'all', 'any', 'both',
+            'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not',
+            'only', 'own', 'same', 'so', 'than', 'too', 'very', 'can', 'will', 'just'
+        }
+    return {"word_tokenize": word_tokenize, "STOP_WORDS": STOP_WORDS}
+
+
+_LOADERS = {
+    "gensim": _load_gensim,
+    "corpora": _load_gensim,
+    "TfidfModel": _load_gensim,
+    "nx": _load_networkx,
+    "TfidfVectorizer": _load_sklearn,
+    "KMeans": _load_sklearn,
+    "word_tokenize": _load_nltk,
+    "STOP_WORDS": _load_nltk,
+}
+
+
+def _lazy(name):
+    """Return optional backend ``name``, importing its package on first use."""
+    namespace = globals()
+    if name not in namespace:
+        for key, value in _LOADERS[name]().items():
+            namespace.setdefault(key, value)
+    return namespace[name]
+
+
+def __getattr__(name):
+    if name in _LOADERS:
+        return _lazy(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _analyze_path(path):
+    """Read and analyze one document; runs in batch worker processes."""
+    text = Path(path).read_text()
+    uid = hashlib.sha256(text.encode('utf-8')).hexdigest()[:8]
+    return uid, analyze(text)
+
 
 class WillowGrowth:
-    def __init__(self, graph_path='willow_growth_v5.json'):
+    """Document graph grown one summary node per ingested document.
+
+    A ``graph_path`` ending in ``.sqlite`` or ``.db`` selects the
+    :class:`~breathing_willow.graph_store.GraphStore` backend: nothing is read
+    on construction, new documents are written straight to the store and
+    :attr:`graph` is only materialized when first accessed (rendering,
+    clustering). Any other path is node-link JSON, loaded eagerly and
+    rewritten by :meth:`save_graph`.
+
+    With ``lsh_threshold`` set, MinHash signatures of every node are kept in a
+    :class:`~breathing_willow.minhash.MinHashLSH` sidecar. New documents are
+    then linked only to LSH candidates whose token similarity reaches the
+    threshold, and :meth:`expand_node` only compares against candidates,
+    instead of every node sharing a token or every node in the graph.
+    ``lsh_recall`` is the chance a node exactly at the threshold is found.
+
+    With ``vector_dim`` set, every node also gets a hashed TF-IDF vector in a
+    :class:`~breathing_willow.vector_index.VectorIndex` matrix and new nodes
+    are linked to their ``vector_k`` most cosine-similar earlier nodes (at
+    least ``vector_min_similarity``) by matrix multiplication; edge weights
+    are then similarities rather than token counts. This takes precedence
+    over LSH and token-overlap linking.
+    """
+
+    def __init__(
+        self,
+        graph_path='willow_growth_v5.json',
+        lsh_threshold=None,
+        lsh_recall=0.9,
+        vector_dim=None,
+        vector_k=10,
+        vector_min_similarity=0.2,
+    ):
         self.graph_path = Path(graph_path)
-        if self.graph_path.exists():
-            self.load_graph()
+        self.store = None
+        self._graph = None
+        if self.graph_path.suffix in GraphStore.SUFFIXES:
+            self.store = GraphStore(self.graph_path)
+            # the store keeps its own posting lists
+            self.token_index = self.store
         else:
-            self.graph = nx.Graph()
+            if self.graph_path.exists():
+                self.load_graph()
+            else:
+                self.graph = _lazy("nx").Graph()
+            self.token_index = TokenIndex.for_graph(self.graph_path)
+            if self.token_index.nodes != set(self.graph.nodes):
+                # missing, stale or torn sidecar: rebuild it from the graph
+                self.token_index.rebuild(
+                    (nid, data.get('tokens', []))
+                    for nid, data in self.graph.nodes(data=True)
+                )
+        self.summarizer = SummaryEngine.for_graph(self.graph_path)
+        self.lsh = None
+        if lsh_threshold is not None:
+            self.lsh = MinHashLSH.for_graph(
+                self.graph_path, lsh_threshold, lsh_recall
+            )
+            if self.store is not None:
+                stale = len(self.lsh.nodes) != len(self.store)
+            else:
+                stale = self.lsh.nodes != set(self.graph.nodes)
+            if stale:
+                self.lsh.rebuild(
+                    (nid, data.get('tokens', [])) for nid, data in self._nodes_since(0)
+                )
+        self.vectors = None
+        self.vector_k = vector_k
+        self.vector_min_similarity = vector_min_similarity
+        if vector_dim is not None:
+            self.vectors = VectorIndex.for_graph(self.graph_path, vector_dim)
+            if self.store is not None:
+                stale = len(self.vectors.ids) != len(self.store)
+            else:
+                stale = self.vectors.ids != list(self.graph.nodes)
+            if stale:
+                ids, vecs = [], []
+                for nid, data in self._nodes_since(0):
+                    ids.append(nid)
+                    vecs.append(self._vector(data.get('tokens', [])))
+                self.vectors.rebuild(ids, vecs)
         self.tfidf_model = None
         self.dictionary = None
 
+    @property
+    def graph(self):
+        if self._graph is None and self.store is not None:
+            self._graph = self.store.to_networkx()
+        return self._graph
+
+    @graph.setter
+    def graph(self, value):
+        self._graph = value
+
     def load_graph(self):
+        if self.store is not None:
+            self.graph = self.store.to_networkx()
+            return
         data = json.loads(self.graph_path.read_text())
-        self.graph = nx.node_link_graph(data)
+        self.graph = _lazy("nx").node_link_graph(data)
 
     def save_graph(self):
-        data = nx.node_link_data(self.graph)
+        self.summarizer.save()
+        if self.store is not None:
+            # nodes and edges were written through; make them durable
+            self.store.commit()
+            return
+        data = _lazy("nx").node_link_data(self.graph)
         self.graph_path.write_text(json.dumps(data, indent=2))
 
+    def _has_node(self, uid):
+        if self._graph is None and self.store is not None:
+            return uid in self.store
+        return uid in self.graph
+
+    def _nodes_since(self, offset):
+        """Yield ``(node_id, attrs)`` for nodes after the first ``offset``."""
+        if self._graph is None and self.store is not None:
+            return self.store.nodes(offset)
+        return islice(self.graph.nodes(data=True), offset, None)
+
+    def _node_count(self):
+        if self._graph is None and self.store is not None:
+            return len(self.store)
+        return self.graph.number_of_nodes()
+
+    def _add_edge(self, a, b, weight):
+        if self.store is not None:
+            self.store.add_edge(a, b, weight)
+        if self._graph is not None:
+            self._graph.add_edge(a, b, weight=weight)
+
+    def _has_edge(self, a, b):
+        if self._graph is None and self.store is not None:
+            return self.store.has_edge(a, b)
+        return self.graph.has_edge(a, b)
+
+    def _node_tokens(self, node_ids):
+        """Return ``{node_id: tokens}`` without materializing a stored graph."""
+        if self._graph is None and self.store is not None:
+            return self.store.node_tokens(node_ids)
+        nodes = self.graph.nodes
+        return {nid: nodes[nid].get('tokens', []) for nid in node_ids if nid in nodes}
+
+    def _vector(self, tokens):
+        return hashed_tfidf(tokens, self.summarizer.idf, self.vectors.dim)
+
+    def _link_vectors(self, uids):
+        """Link each of ``uids`` to its nearest earlier nodes by cosine similarity."""
+        rows = [self.vectors.rows[uid] for uid in uids]
+        found = self.vectors.neighbours(
+            rows, self.vector_k, self.vector_min_similarity, earlier_only=True
+        )
+        ids = self.vectors.ids
+        for row in rows:
+            for other, sim in found[row]:
+                self._add_edge(ids[row], ids[other], round(sim, 4))
+
+    def _similar(self, uid, tokens, threshold):
+        """Return ``{node_id: overlap}`` of LSH candidates at ``threshold``."""
+        tokens = set(tokens)
+        candidates = self.lsh.candidates(tokens)
+        candidates.discard(uid)
+        similar = {}
+        for nid, other in self._node_tokens(candidates).items():
+            other = set(other)
+            if not other:
+                continue
+            overlap = len(tokens & other)
+            if overlap / max(len(tokens), len(other)) >= threshold:
+                similar[nid] = overlap
+        return similar
+
     def _hash_content(self, text):
         return hashlib.sha256(text.encode('utf-8')).hexdigest()
 
     def tokenize(self, text):
+        word_tokenize = _lazy("word_tokenize")
+        STOP_WORDS = _lazy("STOP_WORDS")
         if word_tokenize:
             tokens = [w.lower() for w in word_tokenize(text) if w.isalpha()]
         else:
@@ -96,80 +313,124 @@ class WillowGrowth:
     def train_tfidf(self, texts):
         """Train TF-IDF on provided texts."""
         tokenized = [self.tokenize(t) for t in texts]
-        self.dictionary = corpora.Dictionary(tokenized)
+        self.dictionary = _lazy("corpora").Dictionary(tokenized)
         corpus = [self.dictionary.doc2bow(t) for t in tokenized]
-        self.tfidf_model = TfidfModel(corpus)
+        self.tfidf_model = _lazy("TfidfModel")(corpus)
         return corpus
 
-    def _summary_from_text(self, text: str) -> tuple[str, list[list[str]], list[str]]:
-        """Return a ~25 word summary, clusters and tokens for a document."""
-        sentences = [s.strip() for s in re.split(r"[.!?]+", text) if s.strip()]
-        if not sentences:
-            return "", [], []
-        if TfidfVectorizer is None or KMeans is None:
-            tokens = self.tokenize(text)
-            summary = " ".join(tokens[:25])
-            return summary, [], tokens
+    def _summary_from_text(
+        self, text: str, update: bool = True
+    ) -> tuple[str, list[list[str]], list[str]]:
+        """Return a ~25 word summary, clusters and tokens for a document.
 
-        n_clusters = min(5, len(sentences))
-        vectorizer = TfidfVectorizer(stop_words="english")
-        X = vectorizer.fit_transform(sentences)
-        km = KMeans(n_clusters=n_clusters, n_init="auto", random_state=42)
-        km.fit(X)
-        terms = vectorizer.get_feature_names_out()
-        clusters: list[list[str]] = []
-        for i in range(n_clusters):
-            center = km.cluster_centers_[i]
-            top_idx = center.argsort()[-5:][::-1]
-            clusters.append([terms[idx] for idx in top_idx])
-        summary_words: list[str] = []
-        for c in clusters:
-            summary_words.extend(c)
-        summary = " ".join(summary_words[:50])
-        return summary, clusters, summary_words
+        The document's terms are added to the running corpus statistics in
+        :attr:`summarizer` unless ``update`` is false.
+        """
+        return self.summarizer.summarize(analyze(text), update=update)
 
     def submit_document(self, doc_path):
         """Ingest a document as a single summary node."""
         text = Path(doc_path).read_text()
         uid = self._hash_content(text)[:8]
-        if not self.dictionary:
-            self.train_tfidf([text])
 
-        summary, clusters, tokens = self._summary_from_text(text)
+        summary, clusters, tokens = self._summary_from_text(
+            text, update=not self._has_node(uid)
+        )
         if not tokens:
             print(f"⚠️ Document {doc_path} has no tokens — skipping.")
             return
 
-        self.graph.add_node(
-            uid,
-            path=str(doc_path),
-            summary=summary,
-            clusters=clusters,
-            tokens=tokens,
-        )
+        self._add_summary_node(uid, doc_path, summary, clusters, tokens)
+        if self.vectors is not None:
+            self._link_vectors([uid])
+        self.save_graph()
+        print(f"🔄 {doc_path} → {uid} — {len(tokens)} summary tokens.")
 
-        for nid, data in self.graph.nodes(data=True):
-            if nid == uid:
+    def submit_batch(self, paths, workers=1):
+        """Ingest many documents, saving the graph once at the end.
+
+        Documents are read and analyzed across ``workers`` processes, then
+        summarized, added and linked in ``paths`` order, so the resulting
+        graph matches calling :meth:`submit_document` on each path in turn.
+        Returns the ids of the nodes added.
+        """
+        paths = [str(p) for p in paths]
+        if workers > 1 and len(paths) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            chunksize = max(1, len(paths) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_analyze_path, paths, chunksize=chunksize))
+        else:
+            results = [_analyze_path(p) for p in paths]
+
+        added = []
+        for doc_path, (uid, sentences) in zip(paths, results):
+            summary, clusters, tokens = self.summarizer.summarize(
+                sentences, update=not self._has_node(uid)
+            )
+            if not tokens:
+                print(f"⚠️ Document {doc_path} has no tokens — skipping.")
                 continue
-            common = set(tokens) & set(data.get('tokens', []))
-            if common:
-                self.graph.add_edge(uid, nid, weight=len(common))
+            self._add_summary_node(uid, doc_path, summary, clusters, tokens)
+            added.append(uid)
+        if added:
+            if self.vectors is not None:
+                # one blocked matrix product links the whole batch
+                self._link_vectors(added)
+            self.save_graph()
+        print(f"🔄 {len(added)} of {len(paths)} documents ingested.")
+        return added
+
+    def _add_summary_node(self, uid, doc_path, summary, clusters, tokens):
+        """Add a summary node and link it to every node sharing a token.
+
+        With LSH enabled, only to candidates similar at its threshold. In
+        vector mode the node is only given its vector here; callers link it
+        with :meth:`_link_vectors`.
+        """
+        if self.vectors is not None:
+            overlaps = {}
+            self.vectors.add([uid], [self._vector(tokens)])
+        elif self.lsh is not None:
+            overlaps = self._similar(uid, tokens, self.lsh.threshold)
+            self.lsh.add(uid, tokens)
+        else:
+            # neighbours come from the inverted index: only nodes sharing a token
+            overlaps = self.token_index.overlaps(tokens)
+        attrs = dict(path=str(doc_path), summary=summary, clusters=clusters)
+        if self.store is not None:
+            self.store.add_node(uid, tokens, **attrs)
+        else:
+            self.token_index.add(uid, tokens)
+        if self._graph is not None:
+            self._graph.add_node(uid, **attrs, tokens=tokens)
 
-        self.save_graph()
-        print(f"🔄 {doc_path} → {uid} — {len(tokens)} summary tokens.")
+        for nid in sorted(overlaps):
+            if nid != uid:
+                self._add_edge(uid, nid, overlaps[nid])
 
     def shape_node(self, uid, sentence="", paragraph=""):
-        if uid not in self.graph:
+        if not self._has_node(uid):
             print(f"⚠️ Node {uid} not found.")
             return
-        self.graph.nodes[uid]["sentence"] = sentence
-        self.graph.nodes[uid]["paragraph"] = paragraph
-        self.graph.nodes[uid]["shaped"] = True
+        attrs = {"sentence": sentence, "paragraph": paragraph, "shaped": True}
+        if self.store is not None:
+            self.store.update_node(uid, **attrs)
+        if self._graph is not None:
+            self._graph.nodes[uid].update(attrs)
         self.save_graph()
         print(f"✏️ Node {uid} shaped.")
 
-    def visualize(self, output='willow_net.html'):
-        """Render the document graph."""
+    def visualize(self, output='willow_net.html', lod=False, top_k=5, max_nodes=500):
+        """Render the document graph.
+
+        With ``lod`` the page shows a level-of-detail view from
+        :func:`~breathing_willow.graph_lod.level_of_detail`: past
+        ``max_nodes`` nodes communities collapse into super-nodes, each node
+        keeps its ``top_k`` heaviest edges, and positions are precomputed so
+        physics stays off and the page opens without settling.
+        """
         try:
             from pyvis.network import Network
             net = Network(
@@ -198,7 +459,7 @@ class WillowGrowth:
                     "width": 1
                   },
                   "physics": {
-                    "enabled": true,
+                    "enabled": %s,
                     "barnesHut": {
                       "gravitationalConstant": -1200,
                       "springLength": 200,
@@ -207,17 +468,29 @@ class WillowGrowth:
                     }
                   }
                 }
-            """)
+            """ % ("false" if lod else "true"))
+
+            graph, positions = self.graph, {}
+            if lod:
+                from .graph_lod import level_of_detail
 
-            for nid, data in self.graph.nodes(data=True):
+                graph, positions = level_of_detail(graph, top_k=top_k, max_nodes=max_nodes)
+
+            for nid, data in graph.nodes(data=True):
                 label = (data.get('summary') or '')[:100]
                 title = data.get('path', '')
-                net.add_node(nid, label=label, title=title)
-
-            for a, b, edata in self.graph.edges(data=True):
+                options = {}
+                if nid in positions:
+                    x, y = positions[nid]
+                    options = dict(x=x, y=y, physics=False)
+                    # super-nodes grow with the documents they stand for
+                    options['size'] = 10 + 3 * (data.get('size', 1) - 1) ** 0.5
+                net.add_node(nid, label=label, title=title, **options)
+
+            for a, b, edata in graph.edges(data=True):
                 net.add_edge(a, b, value=edata.get('weight', 1))
 
-            if len(self.graph.nodes) == 0:
+            if len(graph.nodes) == 0:
                 print("⚠️ Graph empty — nothing to render.")
             else:
                 net.write_html(output, open_browser=False)
@@ -226,12 +499,24 @@ class WillowGrowth:
             print("⚠️ pyvis not installed — skipping visualization.")
             Path(output).write_text("pyvis not installed")
 
-    def cluster_terms(self, max_clusters: int = 5) -> list[list[str]]:
-        """Return conceptual clusters of the current network."""
+    def cluster_terms(
+        self, max_clusters: int = 5, incremental: bool = False
+    ) -> list[list[str]]:
+        """Return conceptual clusters of the current network.
+
+        With ``incremental`` the clusters persist in a
+        :class:`~breathing_willow.term_clusters.TermClusters` file beside the
+        graph and only nodes added since the previous call are folded in, so
+        earlier clusters keep their order and terms.
+        """
+        if incremental:
+            return self._fold_clusters(max_clusters)
         texts = [" ".join(data.get("tokens", [])) for _, data in self.graph.nodes(data=True)]
         if not texts:
             return []
 
+        TfidfVectorizer = _lazy("TfidfVectorizer")
+        KMeans = _lazy("KMeans")
         if TfidfVectorizer is None or KMeans is None:
             from collections import Counter
             counts = Counter(t for text in texts for t in text.split())
@@ -257,12 +542,47 @@ class WillowGrowth:
             clusters.append([terms[idx] for idx in top_ids])
         return clusters
 
+    def _fold_clusters(self, max_clusters):
+        clusters = TermClusters.for_graph(self.graph_path, k=max_clusters)
+        if clusters.folded > self._node_count():
+            # the graph was replaced underneath the saved clusters
+            clusters.reset()
+        for _, data in self._nodes_since(clusters.folded):
+            clusters.fold(data.get("tokens", []), self.summarizer.idf)
+        clusters.save()
+        return clusters.top_terms()
+
     def expand_node(self, uid: str, similarity_threshold: float = 0.3) -> None:
-        """Add edges from ``uid`` to similar documents based on token overlap."""
-        if uid not in self.graph:
+        """Add edges from ``uid`` to similar documents based on token overlap.
+
+        With LSH enabled only the candidates sharing a bucket with ``uid`` are
+        compared, so documents below the LSH threshold are rarely reached
+        whatever ``similarity_threshold`` is. In vector mode the node is linked
+        to its ``vector_k`` nearest nodes with cosine similarity of at least
+        ``similarity_threshold``.
+        """
+        if not self._has_node(uid):
             print(f"⚠️ Node {uid} not found for expansion.")
             return
 
+        if self.vectors is not None:
+            row = self.vectors.rows[uid]
+            found = self.vectors.neighbours([row], self.vector_k, similarity_threshold)
+            for other, sim in found[row]:
+                nid = self.vectors.ids[other]
+                if not self._has_edge(uid, nid):
+                    self._add_edge(uid, nid, round(sim, 4))
+            self.save_graph()
+            return
+
+        if self.lsh is not None:
+            tokens = self._node_tokens([uid])[uid]
+            for nid, overlap in sorted(self._similar(uid, tokens, similarity_threshold).items()):
+                if not self._has_edge(uid, nid):
+                    self._add_edge(uid, nid, overlap)
+            self.save_graph()
+            return
+
         tokens = set(self.graph.nodes[uid].get("tokens", []))
         if not tokens:
             return
@@ -276,11 +596,10 @@ class WillowGrowth:
             overlap = len(tokens & other)
             sim = overlap / max(len(tokens), len(other))
             if sim >= similarity_threshold:
-                self.graph.add_edge(uid, nid, weight=overlap)
+                self._add_edge(uid, nid, overlap)
         self.save_graph()
 
     def submit_docs(self, files):
-        for fp in files:
-            self.submit_document(fp)
+        self.submit_batch(files)
         self.visualize('/l/tmp/willow-net.html')
 
@@ -0,0 +1,400 @@
+"""Handlers for the ``willow`` subcommands.
+
+Argument parsers are defined in :mod:`breathing_willow_cli.subcommands`,
+which only imports this module when a subcommand is dispatched. Handlers
+import what they need themselves, so running one subcommand never loads the
+dependencies of the others.
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+from pathlib import Path
+import json
+import shutil
+from uuid import uuid4
+from datetime import datetime, timezone
+
+from .utils import (
+    append_shaping_log,
+    log_prompt,
+    mark_vc_step,
+    save_snapshot,
+)
+
+
+def cmd_ccraft(args: argparse.Namespace) -> None:
+    from breathing_willow import context_slicer_openoption as cs
+
+    fp = args.file
+    print(f"for input file '{fp}'")
+    cs.endpoint(fp)
+    print("done. 是道")
+
+
+def cmd_sense(args: argparse.Namespace) -> None:
+    if args.diff:
+        from w_cli import diff
+
+        report = diff.export_diff("/field")
+        Path("/field/field-update.md").write_text(report)
+    else:
+        print("sense")
+
+
+def cmd_module_prompt133(args: argparse.Namespace) -> None:
+    from breathing_willow import module_prompt_setup as mps
+
+    fp_module = args.filepath_module
+    fp_output = args.dir_out
+    if not fp_module or not fp_output:
+        raise SystemExit("must have both -f and -o.")
+    mps.generate_codex_prompts(fp_module, fp_output)
+
+
+def cmd_log_prompt(args: argparse.Namespace) -> None:
+    log_prompt(args.title, args.link, args.commit)
+
+
+def cmd_history(args: argparse.Namespace) -> None:
+    from breathing_willow.export_kernel import ChatExportArchiver
+    from os.path import join
+    from datetime import datetime
+
+    if not args.file:
+        raise SystemExit("-f/--file is required")
+
+    fp = "/l/gds/chatgpt-exports"
+    print(f"will write to '{fp}'")
+    now = datetime.now()
+    if args.output_dir:
+        fpo = Path(args.output_dir)
+    elif args.incremental:
+        # incremental runs reuse one directory so the manifest persists
+        fpo = Path(join(fp, "archive"))
+    else:
+        fpo = Path(join(fp, now.strftime('%Y-%m-%d')))
+    fpi = Path(args.file)
+    try:
+        archiver = ChatExportArchiver(
+            fpi,
+            fpo,
+            stream=args.stream,
+            workers=args.workers,
+            incremental=args.incremental,
+            sharded_index=args.sharded_index,
+            annotate=args.annotate,
+            search_index=args.search_index,
+            message_store=args.message_store,
+            tz=args.tz,
+            show_times=args.turn_times,
+            attachments=args.attachments,
+            verbose=args.verbose,
+        )
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    archiver.run()
+    if args.search_index:
+        # search defaults to the incremental archive; point at this run's index
+        print(f"\nsearch with: willow history search -d '{fpo}' <query>")
+    print(f"\nwould have written to '{fp}'")
+
+
+def cmd_history_search(args: argparse.Namespace) -> None:
+    from breathing_willow.history_search import HistorySearchIndex
+
+    db_path = Path(args.archive_dir) / HistorySearchIndex.FILENAME
+    if not db_path.is_file():
+        raise SystemExit(
+            f"no search index at {db_path}; run 'willow history --search-index' "
+            "first, or pass -d with the export directory it wrote to"
+        )
+    with HistorySearchIndex(db_path) as index:
+        try:
+            hits = index.search(args.query, limit=args.limit)
+        except Exception as exc:
+            raise SystemExit(f"search failed: {exc}")
+
+    # group turn hits under their conversation, keeping best-first order
+    grouped: dict[str, list[dict]] = {}
+    for hit in hits:
+        grouped.setdefault(hit["filename"], []).append(hit)
+    for filename, turns in grouped.items():
+        print(f"{filename}  {turns[0]['date']}")
+        for hit in turns:
+            print(f"  turn {hit['turn']:03d} {hit['role']}: {hit['snippet']}")
+    if not hits:
+        print("no matches")
+
+
+def cmd_vc_step(args: argparse.Namespace) -> None:
+    mark_vc_step(args.note)
+
+
+def cmd_docs(args: argparse.Namespace) -> None:
+    host = args.host
+    port = args.port
+    url = f"http://{host}:{port}"
+    print(f"Serving docs at {url} (live reload). Press Ctrl+C to stop.")
+    cmd = ["mkdocs", "serve", "--dev-addr", f"{host}:{port}"]
+    subprocess.run(cmd, check=True)
+
+
+def cmd_update_net(args: argparse.Namespace) -> None:
+    from breathing_willow.willow_viz import WillowGrowth
+
+    snap_dir = Path(args.snapshot_dir) if args.snapshot_dir else None
+    wg = WillowGrowth(
+        graph_path=args.graph,
+        lsh_threshold=args.lsh_threshold,
+        lsh_recall=args.lsh_recall,
+        vector_dim=args.vector_dim,
+        vector_k=args.vector_k,
+    )
+    if args.batch:
+        sources = _batch_sources(args.batch)
+        if not sources:
+            raise SystemExit(f"no documents match '{args.batch}'")
+        # snapshots beside a batch directory would be ingested next run
+        if snap_dir:
+            for src in sources:
+                save_snapshot(src, snap_dir)
+        wg.submit_batch(sources, workers=args.workers)
+    else:
+        sources = [Path(args.file)]
+        save_snapshot(sources[0], snap_dir)
+        wg.submit_document(args.file)
+    wg.visualize(
+        args.visual_archive,
+        lod=args.lod,
+        top_k=args.lod_top_k,
+        max_nodes=args.lod_max_nodes,
+    )
+    clusters = wg.cluster_terms(incremental=args.incremental_clusters)
+    for src in sources:
+        append_shaping_log(src, clusters)
+
+
+def _batch_sources(pattern: str) -> list[Path]:
+    """Return the files in directory ``pattern``, or matching it as a glob."""
+    from glob import glob
+
+    base = Path(pattern)
+    if base.is_dir():
+        paths = [p for p in base.iterdir() if not p.name.startswith(".")]
+    else:
+        paths = [Path(p) for p in glob(pattern, recursive=True)]
+    return sorted(p for p in paths if p.is_file())
+
+
+def cmd_snip_file(args: argparse.Namespace) -> None:
+    from breathing_willow import snip_file as sf
+    import tiktoken
+
+    fp = Path(args.input_file)
+    enc = tiktoken.encoding_for_model("gpt-4")
+    try:
+        before_text = fp.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        print(f"file not found: {fp}")
+        return
+    except OSError as e:
+        print(f"error reading {fp}: {e}")
+        return
+
+    before_tokens = len(enc.encode(before_text))
+    print(f"file '{fp}' has {before_tokens} tokens before snipping.")
+
+    print("snipping file to last practical context...")
+    fpo = Path(args.output_file)
+    try:
+        after_text = sf.snip_file_to_last_tokens(
+            str(fp),
+            context_scope="practical",
+            aggressive=True,
+            n_tokens=args.n_tokens,
+            output_path=fpo,
+        )
+    except Exception as e:
+        print(e)
+        return
+
+    after_tokens = len(enc.encode(after_text))
+    print(f"file '{fpo}' now has {after_tokens} tokens after snipping.")
+    print(f"wrote '{fpo}'")
+
+
+def cmd_promptdev_bootstrap(args: argparse.Namespace) -> None:
+    from breathing_willow.watchful_fog_dev_kernel import infer_structure
+    from breathing_willow.watchful_fog_dev_kernel import generate_surfacing
+    from breathing_willow.watchful_fog_dev_kernel import render_compare_prompt
+    from breathing_willow.watchful_fog_dev_kernel import alert_if_prompt_too_large
+    from breathing_willow.helpers import strip_markdown_formatting
+    from breathing_willow.count_tokens import get_token_count_model
+    import random
+    from uuid import uuid4 as uuid
+    from codenamize import codenamize
+    from os.path import join
+
+    if args.step01_objvals_draft0:
+        fp = args.input_file
+        strip_markdown_formatting(fp)
+        text = Path(fp).read_text()
+        prompt_text = infer_structure(text)
+        fpo = args.output_file
+        Path(fpo).write_text(prompt_text)
+
+        print('\n'+'#'*80+'\n')
+        print(f"wrote '{fpo}', use that to get values, objective, prompt\n")
+        print("now update these files:")
+        for fn in ("values", "objective", "prompt", "excess"):
+            path = join("/field", f"{fn}.md")
+            print(f"* {path}")
+        print('\n'+'#'*80+'\n')
+        alert_if_prompt_too_large(prompt_text, fpo)
+
+        return
+
+    if args.step2_make_surfacing:
+        fp_values = args.values_file
+        fp_objective = args.objective_file
+        fp_prompt = args.input_file
+        fp_excess = args.excess_file
+        if fp_excess:
+            text_excess = Path(fp_excess).read_text()
+        else:
+            text_excess = "<none>"
+        i = str(uuid())
+        x = i.split("-")[0]
+        fp_output = join("/field", f"surfacing {codenamize(i)} {x}.md")
+        text = generate_surfacing(
+            fp_values=fp_values,
+            text_excess=text_excess,
+            fp_objective=fp_objective,
+            fp_prompt=fp_prompt,
+            i=i,
+        )
+        Path(fp_output).write_text(text)
+        print(f"wrote '{fp_output}'")
+        print("now you have a surfacing. if you have at least a few, onto next!")
+        return
+
+    if args.step3_package_compare:
+        substrings = [k for k in args.keys.split("|") if k]
+        if len(substrings) < 2:
+            raise SystemExit("need at least two keys")
+        root = Path("/field")
+        matches: dict[str, Path] = {}
+        for s in substrings:
+            files = [p for p in root.glob("*.md") if s in p.name]
+            if len(files) != 1:
+                raise SystemExit(f"uuid substring '{s}' matched {len(files)} files")
+            matches[s] = files[0]
+
+        selected_keys = random.sample(list(matches.keys()), 2)
+        compare_dir = root / "compare"
+        compare_dir.mkdir(exist_ok=True)
+
+        for key in selected_keys:
+            fp_surfacing = matches[key]
+            text_prompt = fp_surfacing.read_text()
+            out_text = render_compare_prompt(
+                text_prompt,
+                fp_values=args.values_file,
+                fp_objective=args.objective_file,
+            )
+            fp_out = compare_dir / f"{key} version.md"
+            fp_out.write_text(out_text)
+            print(f"wrote '{fp_out}'")
+
+
+def cmd_publish_field(args: argparse.Namespace) -> None:
+    from breathing_willow import field_publish
+
+    path = args.file
+    if args.publish:
+        field_publish.publish(path)
+    elif args.update:
+        if not args.url:
+            raise SystemExit("--url is required for update")
+        field_publish.update(args.url, path)
+    else:
+        raise SystemExit("specify --publish or --update")
+
+
+def cmd_agentic(args: argparse.Namespace) -> None:
+    """Instantiate or load a clipboard agent."""
+    from breathing_willow.clipboard_agent import ClipboardAgent
+
+    if args.instantiate_clipboard_agent:
+        context_path = Path(args.output).expanduser()
+        if not context_path.exists():
+            context_path.parent.mkdir(parents=True, exist_ok=True)
+            metadata = {
+                "id": str(uuid4()),
+                "name": context_path.stem,
+                "role": "clipboard",
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+            frontmatter = (
+                "---\n"
+                + "\n".join(f"{k}: {v}" for k, v in metadata.items())
+                + "\n---\n\n# Context\n"
+            )
+            context_path.write_text(frontmatter, encoding="utf-8")
+
+        agent = ClipboardAgent(context_path)
+
+        registry_dir = Path.home() / ".willow"
+        registry_dir.mkdir(parents=True, exist_ok=True)
+        registry_file = registry_dir / "agents.json"
+        data: dict[str, str] = {}
+        if registry_file.exists():
+            try:
+                data = json.loads(registry_file.read_text())
+            except json.JSONDecodeError:
+                data = {}
+        data[agent.name] = str(context_path)
+        registry_file.write_text(json.dumps(data, indent=2))
+
+        print(
+            f"Created Clipboard Agent '{agent.name}' at {context_path}\n"
+            "Edit this file to modify the agent's behavior."
+        )
+        return
+
+    if args.load_clipboard_agent:
+        registry_file = Path.home() / ".willow" / "agents.json"
+        try:
+            data = json.loads(registry_file.read_text())
+        except FileNotFoundError:
+            raise SystemExit(f"no agent registry found at {registry_file}")
+        except json.JSONDecodeError:
+            raise SystemExit(f"agent registry '{registry_file}' is invalid")
+
+        matches = [name for name in data if args.load_clipboard_agent in name]
+        if not matches:
+            raise SystemExit(
+                f"no agent id matching '{args.load_clipboard_agent}'"
+            )
+        if len(matches) > 1:
+            raise SystemExit(
+                f"multiple agents match '{args.load_clipboard_agent}'; use a longer identifier"
+            )
+
+        agent_name = matches[0]
+        src_path = Path(data[agent_name]).expanduser()
+        dest_path = Path(args.output).expanduser()
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(src_path, dest_path)
+
+        print(
+            f"Loaded Clipboard Agent '{agent_name}'\n"
+            f"Context written to {dest_path}"
+        )
+        return
+
+    raise SystemExit(
+        "--instantiate-clipboard-agent or --load-clipboard-agent flag is required"
+    )
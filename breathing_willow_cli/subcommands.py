@@ -1,229 +1,54 @@
+"""Argument parsers for the ``willow`` subcommands.
+
+Only :mod:`argparse` definitions live here. Each parser's ``func`` is a
+:func:`_command` stand-in that imports :mod:`breathing_willow_cli.commands`
+and the real handler when the subcommand is dispatched, so building the
+parser (``willow --version``, ``--help``) loads nothing else.
+"""
+
 from __future__ import annotations
 
 import argparse
-import subprocess
-from warnings import warn
-from pathlib import Path
-import json
-import shutil
-from uuid import uuid4
-from datetime import datetime, timezone
-
-from w_cli import diff
-from breathing_willow.willow_viz import WillowGrowth
-from breathing_willow.clipboard_agent import ClipboardAgent
-from .utils import (
-    append_shaping_log,
-    get_version,
-    log_prompt,
-    mark_vc_step,
-    save_snapshot,
+from typing import Callable
+
+_HANDLERS = (
+    "cmd_ccraft",
+    "cmd_sense",
+    "cmd_module_prompt133",
+    "cmd_log_prompt",
+    "cmd_history_search",
+    "cmd_history",
+    "cmd_vc_step",
+    "cmd_docs",
+    "cmd_update_net",
+    "cmd_snip_file",
+    "cmd_promptdev_bootstrap",
+    "cmd_publish_field",
+    "cmd_agentic",
 )
 
 
-def cmd_ccraft(args: argparse.Namespace) -> None:
-    from breathing_willow import context_slicer_openoption as cs
-
-    fp = args.file
-    print(f"for input file '{fp}'")
-    cs.endpoint(fp)
-    print("done. 是道")
-
-
-def cmd_sense(args: argparse.Namespace) -> None:
-    if args.diff:
-        report = diff.export_diff("/field")
-        Path("/field/field-update.md").write_text(report)
-    else:
-        print("sense")
-
-
-def cmd_module_prompt133(args: argparse.Namespace) -> None:
-    from breathing_willow import module_prompt_setup as mps
-
-    fp_module = args.filepath_module
-    fp_output = args.dir_out
-    if not fp_module or not fp_output:
-        raise SystemExit("must have both -f and -o.")
-    mps.generate_codex_prompts(fp_module, fp_output)
-
-
-def cmd_log_prompt(args: argparse.Namespace) -> None:
-    log_prompt(args.title, args.link, args.commit)
-
-
-def cmd_history(args: argparse.Namespace) -> None:
-    from breathing_willow.export_kernel import ChatExportArchiver
-    from os.path import join
-    from datetime import datetime
-
-    fp = "/l/gds/chatgpt-exports"
-    print(f"will write to '{fp}'")
-    now = datetime.now()
-    fpo = Path(join(fp, now.strftime('%Y-%m-%d')))
-    fpi = Path(args.file)
-    archiver = ChatExportArchiver(fpi, fpo)
-    archiver.run()
-    print(f"\nwould have written to '{fp}'")
-
-
-def cmd_vc_step(args: argparse.Namespace) -> None:
-    mark_vc_step(args.note)
-
-
-def cmd_docs(args: argparse.Namespace) -> None:
-    host = args.host
-    port = args.port
-    url = f"http://{host}:{port}"
-    print(f"Serving docs at {url} (live reload). Press Ctrl+C to stop.")
-    cmd = ["mkdocs", "serve", "--dev-addr", f"{host}:{port}"]
-    subprocess.run(cmd, check=True)
-
-
-def cmd_update_net(args: argparse.Namespace) -> None:
-    src = Path(args.file)
-    snap_dir = Path(args.snapshot_dir) if args.snapshot_dir else None
-    save_snapshot(src, snap_dir)
-    wg = WillowGrowth(graph_path=args.graph)
-    wg.submit_document(args.file)
-    wg.visualize(args.visual_archive)
-    clusters = wg.cluster_terms()
-    append_shaping_log(src, clusters)
-
-
-def cmd_snip_file(args: argparse.Namespace) -> None:
-    from breathing_willow import snip_file as sf
-    import tiktoken
-
-    fp = Path(args.input_file)
-    enc = tiktoken.encoding_for_model("gpt-4")
-    try:
-        before_text = fp.read_text(encoding="utf-8")
-    except FileNotFoundError:
-        print(f"file not found: {fp}")
-        return
-    except OSError as e:
-        print(f"error reading {fp}: {e}")
-        return
+def _command(name: str) -> Callable[[argparse.Namespace], None]:
+    """Return a handler that resolves ``commands.<name>`` when called."""
+    if name not in _HANDLERS:
+        raise ValueError(f"unregistered subcommand handler '{name}'")
 
-    before_tokens = len(enc.encode(before_text))
-    print(f"file '{fp}' has {before_tokens} tokens before snipping.")
+    def run(args: argparse.Namespace) -> None:
+        from . import commands
 
-    print("snipping file to last practical context...")
-    fpo = Path(args.output_file)
-    try:
-        after_text = sf.snip_file_to_last_tokens(
-            str(fp),
-            context_scope="practical",
-            aggressive=True,
-            n_tokens=args.n_tokens,
-            output_path=fpo,
-        )
-    except Exception as e:
-        print(e)
-        return
+        return getattr(commands, name)(args)
 
-    after_tokens = len(enc.encode(after_text))
-    print(f"file '{fpo}' now has {after_tokens} tokens after snipping.")
-    print(f"wrote '{fpo}'")
+    run.__name__ = run.__qualname__ = name
+    return run
 
 
-def cmd_promptdev_bootstrap(args: argparse.Namespace) -> None:
-    from breathing_willow.watchful_fog_dev_kernel import infer_structure
-    from breathing_willow.watchful_fog_dev_kernel import generate_surfacing
-    from breathing_willow.watchful_fog_dev_kernel import render_compare_prompt
-    from breathing_willow.watchful_fog_dev_kernel import alert_if_prompt_too_large
-    from breathing_willow.helpers import strip_markdown_formatting
-    from breathing_willow.count_tokens import get_token_count_model
-    import random
-    from uuid import uuid4 as uuid
-    from codenamize import codenamize
-    from os.path import join
+def __getattr__(name: str):
+    # handlers used to live here; keep ``subcommands.cmd_*`` importable
+    if name in _HANDLERS or name == "_batch_sources":
+        from . import commands
 
-    if args.step01_objvals_draft0:
-        fp = args.input_file
-        strip_markdown_formatting(fp)
-        text = Path(fp).read_text()
-        prompt_text = infer_structure(text)
-        fpo = args.output_file
-        Path(fpo).write_text(prompt_text)
-
-        print('\n'+'#'*80+'\n')
-        print(f"wrote '{fpo}', use that to get values, objective, prompt\n")
-        print("now update these files:")
-        for fn in ("values", "objective", "prompt", "excess"):
-            path = join("/field", f"{fn}.md")
-            print(f"* {path}")
-        print('\n'+'#'*80+'\n')
-        alert_if_prompt_too_large(prompt_text, fpo)
-
-        return
-
-    if args.step2_make_surfacing:
-        fp_values = args.values_file
-        fp_objective = args.objective_file
-        fp_prompt = args.input_file
-        fp_excess = args.excess_file
-        if fp_excess:
-            text_excess = Path(fp_excess).read_text()
-        else:
-            text_excess = "<none>"
-        i = str(uuid())
-        x = i.split("-")[0]
-        fp_output = join("/field", f"surfacing {codenamize(i)} {x}.md")
-        text = generate_surfacing(
-            fp_values=fp_values,
-            text_excess=text_excess,
-            fp_objective=fp_objective,
-            fp_prompt=fp_prompt,
-            i=i,
-        )
-        Path(fp_output).write_text(text)
-        print(f"wrote '{fp_output}'")
-        print("now you have a surfacing. if you have at least a few, onto next!")
-        return
-
-    if args.step3_package_compare:
-        substrings = [k for k in args.keys.split("|") if k]
-        if len(substrings) < 2:
-            raise SystemExit("need at least two keys")
-        root = Path("/field")
-        matches: dict[str, Path] = {}
-        for s in substrings:
-            files = [p for p in root.glob("*.md") if s in p.name]
-            if len(files) != 1:
-                raise SystemExit(f"uuid substring '{s}' matched {len(files)} files")
-            matches[s] = files[0]
-
-        selected_keys = random.sample(list(matches.keys()), 2)
-        compare_dir = root / "compare"
-        compare_dir.mkdir(exist_ok=True)
-
-        for key in selected_keys:
-            fp_surfacing = matches[key]
-            text_prompt = fp_surfacing.read_text()
-            out_text = render_compare_prompt(
-                text_prompt,
-                fp_values=args.values_file,
-                fp_objective=args.objective_file,
-            )
-            fp_out = compare_dir / f"{key} version.md"
-            fp_out.write_text(out_text)
-            print(f"wrote '{fp_out}'")
-
-
-def cmd_publish_field(args: argparse.Namespace) -> None:
-    from breathing_willow import field_publish
-
-    path = args.file
-    if args.publish:
-        field_publish.publish(path)
-    elif args.update:
-        if not args.url:
-            raise SystemExit("--url is required for update")
-        field_publish.update(args.url, path)
-    else:
-        raise SystemExit("specify --publish or --update")
+        return getattr(commands, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def add_subcommands(subparsers: argparse._SubParsersAction) -> None:
@@ -233,13 +58,13 @@ def add_subcommands(subparsers: argparse._SubParsersAction) -> None:
         "ccraft", help="tools for context crafting ccraft."
     )
     ccraft.add_argument("-f", "--file", required=True, help="input file")
-    ccraft.set_defaults(func=cmd_ccraft)
+    ccraft.set_defaults(func=_command("cmd_ccraft"))
 
     sense = subparsers.add_parser("sense", help="sense for pulse (diff)")
     sense.add_argument(
         "--diff", action="store_true", help="export conceptual diff report"
     )
-    sense.set_defaults(func=cmd_sense)
+    sense.set_defaults(func=_command("cmd_sense"))
 
     dev_man = subparsers.add_parser(
         "module-prompt133", help="setup prompt stubs for 133 process"
@@ -258,23 +83,101 @@ def add_subcommands(subparsers: argparse._SubParsersAction) -> None:
         help="output dir path. will write codex/prompts.",
         default="",
     )
-    dev_man.set_defaults(func=cmd_module_prompt133)
+    dev_man.set_defaults(func=_command("cmd_module_prompt133"))
 
     log_p = subparsers.add_parser("log-prompt", help="log a codex prompt")
     log_p.add_argument("--title", required=True, help="prompt title")
     log_p.add_argument("--link", required=True, help="codex task link")
     log_p.add_argument("--commit", help="commit or PR link")
-    log_p.set_defaults(func=cmd_log_prompt)
+    log_p.set_defaults(func=_command("cmd_log_prompt"))
 
     hist = subparsers.add_parser("history", help="parse chatgpt history")
-    hist.add_argument("-f", "--file", required=True, help="input file")
-    hist.set_defaults(func=cmd_history)
+    hist.add_argument("-f", "--file", help="input file")
+    hist.add_argument(
+        "--stream",
+        action="store_true",
+        help="decode conversations.json element by element instead of loading it whole",
+    )
+    hist.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of processes used to render scrolls (default: 1)",
+    )
+    hist.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only re-render new or changed conversations using the output manifest",
+    )
+    hist.add_argument(
+        "--sharded-index",
+        action="store_true",
+        help="write one index page per month plus a small root index",
+    )
+    hist.add_argument(
+        "-o",
+        "--output-dir",
+        default="",
+        help="output directory (default: dated dir, or 'archive' with --incremental)",
+    )
+    hist.add_argument(
+        "--annotate",
+        action="store_true",
+        help="add per-turn summary annotations while writing scrolls",
+    )
+    hist.add_argument(
+        "--search-index",
+        action="store_true",
+        help="update the full-text search index (search.sqlite) while exporting",
+    )
+    hist.add_argument(
+        "--message-store",
+        action="store_true",
+        help="also write messages.jsonl + messages.idx for analytics",
+    )
+    hist.add_argument(
+        "--tz",
+        default="America/Denver",
+        help="timezone for scroll dates and turn times (default: America/Denver)",
+    )
+    hist.add_argument(
+        "--turn-times",
+        action="store_true",
+        help="write each turn's local time into the scroll",
+    )
+    hist.add_argument(
+        "--attachments",
+        action="store_true",
+        help="copy referenced attachments out of the zip and link them",
+    )
+    hist.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="print per-conversation progress",
+    )
+    hist_sub = hist.add_subparsers(dest="history_command")
+    hist_search = hist_sub.add_parser(
+        "search", help="search exported conversations"
+    )
+    hist_search.add_argument("query", help="FTS5 query, e.g. 'willow AND graph'")
+    hist_search.add_argument(
+        "-d",
+        "--archive-dir",
+        default="/l/gds/chatgpt-exports/archive",
+        help="export directory holding search.sqlite",
+    )
+    hist_search.add_argument(
+        "-n", "--limit", type=int, default=20, help="maximum turn hits (default: 20)"
+    )
+    hist_search.set_defaults(func=_command("cmd_history_search"))
+    hist.set_defaults(func=_command("cmd_history"))
 
     step = subparsers.add_parser(
         "vc-step", help="record a quick vc loop step"
     )
     step.add_argument("note", help="short note for the step")
-    step.set_defaults(func=cmd_vc_step)
+    step.set_defaults(func=_command("cmd_vc_step"))
 
     docs = subparsers.add_parser(
         "docs", help="build and preview the documentation"
@@ -285,13 +188,66 @@ def add_subcommands(subparsers: argparse._SubParsersAction) -> None:
     docs.add_argument(
         "--port", default="8000", help="port to serve on (default: 8000)"
     )
-    docs.set_defaults(func=cmd_docs)
+    docs.set_defaults(func=_command("cmd_docs"))
 
     update = subparsers.add_parser(
         "update-net", help="add a document to the graph and render"
     )
+    update_src = update.add_mutually_exclusive_group(required=True)
+    update_src.add_argument("-f", "--file", help="path to the document to ingest")
+    update_src.add_argument(
+        "--batch",
+        help="directory or glob of documents to ingest with a single graph save",
+    )
     update.add_argument(
-        "-f", "--file", required=True, help="path to the document to ingest"
+        "--workers",
+        type=int,
+        default=1,
+        help="processes used to summarize documents in --batch mode",
+    )
+    update.add_argument(
+        "--incremental-clusters",
+        action="store_true",
+        help="fold only new nodes into clusters persisted beside the graph",
+    )
+    update.add_argument(
+        "--lsh-threshold",
+        type=float,
+        help="link new documents only to MinHash/LSH candidates at least this similar",
+    )
+    update.add_argument(
+        "--lsh-recall",
+        type=float,
+        default=0.9,
+        help="chance a document exactly at --lsh-threshold is found (default: 0.9)",
+    )
+    update.add_argument(
+        "--vector-dim",
+        type=int,
+        help="link by cosine similarity of hashed TF-IDF vectors of this length",
+    )
+    update.add_argument(
+        "--vector-k",
+        type=int,
+        default=10,
+        help="nearest earlier documents linked in --vector-dim mode (default: 10)",
+    )
+    update.add_argument(
+        "--lod",
+        action="store_true",
+        help="render a pruned, pre-laid-out view with physics disabled",
+    )
+    update.add_argument(
+        "--lod-top-k",
+        type=int,
+        default=5,
+        help="heaviest edges kept per node with --lod (default: 5)",
+    )
+    update.add_argument(
+        "--lod-max-nodes",
+        type=int,
+        default=500,
+        help="collapse communities into super-nodes above this many nodes (default: 500)",
     )
     update.add_argument(
         "--visual-archive", required=True, help="path to write the visualization HTML"
@@ -305,7 +261,7 @@ def add_subcommands(subparsers: argparse._SubParsersAction) -> None:
         "--snapshot-dir",
         help="directory to save version snapshots (default: alongside file)",
     )
-    update.set_defaults(func=cmd_update_net)
+    update.set_defaults(func=_command("cmd_update_net"))
 
     snip = subparsers.add_parser(
         "snip-file", help="truncate file to last practical tokens"
@@ -331,7 +287,7 @@ def add_subcommands(subparsers: argparse._SubParsersAction) -> None:
         required=False,
         help="output file",
     )
-    snip.set_defaults(func=cmd_snip_file)
+    snip.set_defaults(func=_command("cmd_snip_file"))
 
     shape = subparsers.add_parser(
         "promptdev-bootstrap", help="shape from a seed prompt."
@@ -387,7 +343,7 @@ def add_subcommands(subparsers: argparse._SubParsersAction) -> None:
         default="",
         help="any desired shaping context for step2. often /field/excess.md",
     )
-    shape.set_defaults(func=cmd_promptdev_bootstrap)
+    shape.set_defaults(func=_command("cmd_promptdev_bootstrap"))
 
     publish = subparsers.add_parser(
         "publish-field", help="publish or update a markdown file to Google Docs"
@@ -398,7 +354,7 @@ def add_subcommands(subparsers: argparse._SubParsersAction) -> None:
     publish.add_argument(
         "--update", action="store_true", help="update the document at --url"
     )
-    publish.set_defaults(func=cmd_publish_field)
+    publish.set_defaults(func=_command("cmd_publish_field"))
 
     agentic = subparsers.add_parser(
         "agentic", help="instantiate and manage Willow agents"
@@ -420,80 +376,4 @@ def add_subcommands(subparsers: argparse._SubParsersAction) -> None:
         required=True,
         help="path to agent context file",
     )
-    agentic.set_defaults(func=cmd_agentic)
-
-
-def cmd_agentic(args: argparse.Namespace) -> None:
-    """Instantiate or load a clipboard agent."""
-    if args.instantiate_clipboard_agent:
-        context_path = Path(args.output).expanduser()
-        if not context_path.exists():
-            context_path.parent.mkdir(parents=True, exist_ok=True)
-            metadata = {
-                "id": str(uuid4()),
-                "name": context_path.stem,
-                "role": "clipboard",
-                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
-            }
-            frontmatter = (
-                "---\n"
-                + "\n".join(f"{k}: {v}" for k, v in metadata.items())
-                + "\n---\n\n# Context\n"
-            )
-            context_path.write_text(frontmatter, encoding="utf-8")
-
-        agent = ClipboardAgent(context_path)
-
-        registry_dir = Path.home() / ".willow"
-        registry_dir.mkdir(parents=True, exist_ok=True)
-        registry_file = registry_dir / "agents.json"
-        data: dict[str, str] = {}
-        if registry_file.exists():
-            try:
-                data = json.loads(registry_file.read_text())
-            except json.JSONDecodeError:
-                data = {}
-        data[agent.name] = str(context_path)
-        registry_file.write_text(json.dumps(data, indent=2))
-
-        print(
-            f"Created Clipboard Agent '{agent.name}' at {context_path}\n"
-            "Edit this file to modify the agent's behavior."
-        )
-        return
-
-    if args.load_clipboard_agent:
-        registry_file = Path.home() / ".willow" / "agents.json"
-        try:
-            data = json.loads(registry_file.read_text())
-        except FileNotFoundError:
-            raise SystemExit(f"no agent registry found at {registry_file}")
-        except json.JSONDecodeError:
-            raise SystemExit(f"agent registry '{registry_file}' is invalid")
-
-        matches = [name for name in data if args.load_clipboard_agent in name]
-        if not matches:
-            raise SystemExit(
-                f"no agent id matching '{args.load_clipboard_agent}'"
-            )
-        if len(matches) > 1:
-            raise SystemExit(
-                f"multiple agents match '{args.load_clipboard_agent}'; use a longer identifier"
-            )
-
-        agent_name = matches[0]
-        src_path = Path(data[agent_name]).expanduser()
-        dest_path = Path(args.output).expanduser()
-        dest_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy(src_path, dest_path)
-
-        print(
-            f"Loaded Clipboard Agent '{agent_name}'\n"
-            f"Context written to {dest_path}"
-        )
-        return
-
-    raise SystemExit(
-        "--instantiate-clipboard-agent or --load-clipboard-agent flag is required"
-    )
-
+    agentic.set_defaults(func=_command("cmd_agentic"))
@@ -0,0 +1,63 @@
+"""Benchmark ``willow --version`` startup against its time budget.
+
+Runs the CLI in fresh interpreters and reports, best of ``--repeat``, the
+in-process time from importing the entry point to printing the version, the
+wall time of the whole process (interpreter startup included), and which
+heavy NLP or graph backends ended up in ``sys.modules``. Exits non-zero when
+the in-process time exceeds ``--budget`` or a backend was imported.
+
+    python scripts/bench_cli_startup.py --repeat 5 --budget 0.1
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY = ("gensim", "networkx", "sklearn", "nltk", "scipy", "numpy")
+
+PROBE = f"""
+import sys, time
+start = time.perf_counter()
+from breathing_willow_cli.breathing_willow import main
+main(["--version"])
+print(time.perf_counter() - start)
+print(",".join(m for m in {HEAVY!r} if m in sys.modules))
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters to run")
+    parser.add_argument(
+        "--budget", type=float, default=0.1, help="allowed in-process seconds (best run)"
+    )
+    return parser.parse_args()
+
+
+def probe():
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], capture_output=True, text=True, check=True, cwd=ROOT
+    ).stdout.splitlines()
+    wall = time.perf_counter() - start
+    return float(out[-2]), wall, out[-1]
+
+
+def main():
+    args = parse_args()
+    runs = [probe() for _ in range(args.repeat)]
+    in_process = min(r[0] for r in runs)
+    wall = min(r[1] for r in runs)
+    loaded = sorted({m for r in runs for m in r[2].split(",") if m})
+    print(f"{'in-process s':>13} {'wall s':>7} {'budget s':>9}  heavy imports")
+    print(f"{in_process:>13.3f} {wall:>7.3f} {args.budget:>9.3f}  {', '.join(loaded) or '-'}")
+    if in_process > args.budget or loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Benchmark the export kernel end to end on a synthetic ChatGPT export.
+
+Generates an export with :mod:`breathing_willow.synthetic_export`, then times
+each stage of the kernel in a fresh process so peak RSS is attributable to
+that stage alone:
+
+``load``           stream ``conversations.json`` out of the zip
+``parse``          normalize and render every thread in memory
+``export``         ``ChatExportArchiver.run`` (write scrolls and index)
+``index-scan``     ``KernelIndexPage.run`` re-reading every scroll
+``index-records``  ``KernelIndexPage.run`` from the export's records
+``annotate``       ``annotate_scrolls_in_dir`` on a copy of the export
+
+Pass ``--json`` to also write the results for comparison between runs.
+
+    python scripts/bench_export_kernel.py --threads 2000 --depth 40 --workers 4
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from breathing_willow.export_kernel import (  # noqa: E402
+    ChatExportArchiver,
+    ExportArchive,
+    KernelIndexPage,
+    ThreadParser,
+    annotate_scrolls_in_dir,
+    iter_json_array,
+)
+from breathing_willow.synthetic_export import write_synthetic_export  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=500, help="conversations in the export")
+    parser.add_argument("--depth", type=int, default=30, help="messages on each active branch")
+    parser.add_argument(
+        "--branchiness",
+        type=float,
+        default=0.1,
+        help="chance an assistant turn has an abandoned regeneration",
+    )
+    parser.add_argument("--message-words", type=int, default=80, help="mean words per message")
+    parser.add_argument("--workers", type=int, default=1, help="export render workers")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="also write results to this file")
+    return parser.parse_args()
+
+
+def _iter_threads(zip_path):
+    archive = ExportArchive(zip_path)
+    try:
+        with archive.open(archive.conversations_member()) as raw:
+            yield from iter_json_array(io.TextIOWrapper(raw, encoding="utf-8"))
+    finally:
+        archive.close()
+
+
+def stage_load(zip_path, work):
+    count = sum(1 for _ in _iter_threads(zip_path))
+    return {"threads": count}
+
+
+def stage_parse(zip_path, work):
+    threads = messages = chars = 0
+    for thread in _iter_threads(zip_path):
+        parser = ThreadParser(thread, "bench")
+        out = io.StringIO()
+        parser.parse_to(out)
+        threads += 1
+        messages += len(parser.messages)
+        chars += out.tell()
+    return {"threads": threads, "messages": messages, "chars": chars}
+
+
+def stage_export(zip_path, work, workers=1):
+    out = work / "export"
+    archiver = ChatExportArchiver(zip_path, out, stream=True, workers=workers)
+    archiver.run()
+    (work / "records.json").write_text(json.dumps(list(archiver.records.values())))
+    size = sum(p.stat().st_size for p in out.iterdir() if p.is_file())
+    return {"threads": len(archiver.records), "bytes": size}
+
+
+def stage_index_scan(zip_path, work):
+    KernelIndexPage().run(work / "export")
+    return {}
+
+
+def stage_index_records(zip_path, work):
+    records = json.loads((work / "records.json").read_text())
+    KernelIndexPage().run(work / "export", records=records)
+    return {}
+
+
+def stage_annotate(zip_path, work):
+    copy = work / "annotate"
+    shutil.rmtree(copy, ignore_errors=True)
+    shutil.copytree(work / "export", copy)
+    start = time.perf_counter()
+    annotate_scrolls_in_dir(copy)
+    # report only the annotation itself, not the copy
+    return {"seconds": time.perf_counter() - start}
+
+
+STAGES = {
+    "load": stage_load,
+    "parse": stage_parse,
+    "export": stage_export,
+    "index-scan": stage_index_scan,
+    "index-records": stage_index_records,
+    "annotate": stage_annotate,
+}
+
+
+def measure(stage, zip_path, work, kwargs):
+    """Run in a fresh process: return seconds, peak RSS in KiB and stage stats."""
+    fn = STAGES[stage]
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        stats = fn(zip_path, work, **kwargs)
+        seconds = time.perf_counter() - start
+    seconds = stats.pop("seconds", seconds)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return seconds, max(peak, children), stats
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        zip_path = work / "export.zip"
+        start = time.perf_counter()
+        write_synthetic_export(
+            zip_path,
+            threads=args.threads,
+            depth=args.depth,
+            branchiness=args.branchiness,
+            message_words=args.message_words,
+            seed=args.seed,
+        )
+        print(
+            f"generated {args.threads} threads x {args.depth} messages "
+            f"({zip_path.stat().st_size / 1e6:.1f} MB zip) "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+
+        results = {}
+        print(f"{'stage':<14} {'seconds':>9} {'threads/s':>10} {'peak RSS MiB':>13}")
+        for stage in STAGES:
+            kwargs = {"workers": args.workers} if stage == "export" else {}
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                seconds, peak_kib, stats = pool.submit(
+                    measure, stage, zip_path, work, kwargs
+                ).result()
+            rate = args.threads / seconds if seconds else float("inf")
+            results[stage] = {
+                "seconds": seconds,
+                "threads_per_second": rate,
+                "peak_rss_kib": peak_kib,
+                **stats,
+            }
+            print(f"{stage:<14} {seconds:>9.3f} {rate:>10.0f} {peak_kib / 1024:>13.1f}")
+
+    if args.json:
+        params = {k: str(v) for k, v in vars(args).items()}
+        args.json.write_text(json.dumps({"params": params, "stages": results}, indent=2))
+        print(f"wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark the ThreadParser mapping walker on synthetic conversation trees.
+
+Compares the explicit-stack walker in ``ThreadParser._normalize_messages``
+against the recursive closure it replaced, on a deep linear chain and on a
+branchy tree with regenerated siblings, reporting best wall time and the peak
+RSS growth of a fresh process running each walker.
+
+    python scripts/bench_thread_walk.py --nodes 50000
+"""
+
+import argparse
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from breathing_willow.export_kernel import ThreadParser  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=50_000, help="nodes per mapping")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case")
+    parser.add_argument(
+        "--branch-prob",
+        type=float,
+        default=0.2,
+        help="chance a turn was regenerated in the branchy case",
+    )
+    return parser.parse_args()
+
+
+def _node(parent, role, text):
+    return {
+        "parent": parent,
+        "children": [],
+        "message": {"author": {"role": role}, "content": {"parts": [text]}},
+    }
+
+
+def build_mapping(n_nodes: int, branch_prob: float = 0.0, seed: int = 7) -> dict:
+    """Return a thread with ``n_nodes`` messages; siblings hang off the chain."""
+    rng = random.Random(seed)
+    mapping = {"client-created-root": {"parent": None, "children": []}}
+    parent = "client-created-root"
+    i = 0
+    while i < n_nodes:
+        role = "user" if i % 2 == 0 else "assistant"
+        nid = f"n{i}"
+        mapping[nid] = _node(parent, role, f"message {i} " + "lorem ipsum " * 8)
+        mapping[parent]["children"].append(nid)
+        i += 1
+        if branch_prob and i < n_nodes and rng.random() < branch_prob:
+            # an abandoned regeneration: a sibling that is not on the active path
+            sib = f"n{i}"
+            mapping[sib] = _node(parent, role, f"regenerated {i}")
+            mapping[parent]["children"].insert(0, sib)
+            i += 1
+        parent = nid
+    return {"mapping": mapping, "current_node": parent}
+
+
+def recursive_walk(thread: dict) -> list[dict]:
+    """The pre-iterative walker, kept here as the baseline."""
+    mapping = thread["mapping"]
+    ordered: list[dict] = []
+
+    def walk(node_id):
+        node = mapping.get(node_id)
+        if not node:
+            return
+        entry = ThreadParser._message_entry(node.get("message"))
+        if entry:
+            ordered.append(entry)
+        for child_id in node.get("children", []):
+            walk(child_id)
+
+    walk("client-created-root")
+    return ordered
+
+
+WALKERS = {
+    "recursive": recursive_walk,
+    "iterative": ThreadParser({}, "bench", active_branch=False)._normalize_messages,
+    "active-branch": ThreadParser({}, "bench", active_branch=True)._normalize_messages,
+}
+
+
+def measure(walker, n_nodes, branch_prob, repeat):
+    """Run in a fresh process: return best seconds, RSS growth in KiB, messages."""
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), n_nodes * 2 + 100))
+    thread = build_mapping(n_nodes, branch_prob)
+    fn = WALKERS[walker]
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(thread)
+        best = min(best, time.perf_counter() - start)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return best, peak - base, len(out)
+
+
+def main():
+    args = parse_args()
+    cases = [("linear", 0.0), ("branchy", args.branch_prob)]
+
+    print(f"{'case':<9} {'walker':<14} {'msgs':>7} {'best ms':>9} {'+RSS KiB':>9}")
+    for case_name, branch_prob in cases:
+        for walker in WALKERS:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                best, rss, count = pool.submit(
+                    measure, walker, args.nodes, branch_prob, args.repeat
+                ).result()
+            print(
+                f"{case_name:<9} {walker:<14} {count:>7} "
+                f"{best * 1000:>9.1f} {rss:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Benchmark turn summary annotation throughput.
+
+Compares the original ``TurnSummaryAnnotator.run`` behaviour, which imported
+nltk, rebuilt the stopword set and used an uncompiled pattern on every call,
+against the current annotator backed by the module-level cache and the
+batched :func:`summarize_terms` pass. Reports messages per second.
+
+    python scripts/bench_turn_summary.py --scrolls 2000 --turns 12
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from breathing_willow.export_kernel import TurnSummaryAnnotator, summarize_terms  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scrolls", type=int, default=2000, help="scrolls to annotate")
+    parser.add_argument("--turns", type=int, default=12, help="messages per scroll")
+    parser.add_argument("--words", type=int, default=120, help="mean words per message")
+    return parser.parse_args()
+
+
+def build_scrolls(n_scrolls, n_turns, n_words, seed=11):
+    rng = random.Random(seed)
+    vocab = [
+        "".join(rng.choice("abcdefghijklmnoprstuw") for _ in range(rng.randint(2, 9)))
+        for _ in range(4000)
+    ] + ["the", "and", "to", "of", "a", "in", "that", "it", "is"] * 200
+    scrolls = []
+    for _ in range(n_scrolls):
+        msgs = []
+        for t in range(n_turns):
+            words = rng.choices(vocab, k=max(1, int(rng.gauss(n_words, n_words / 3))))
+            msgs.append({
+                "author": "user" if t % 2 == 0 else "assistant",
+                "content": " ".join(words).capitalize() + ".",
+            })
+        scrolls.append(msgs)
+    return scrolls
+
+
+def baseline_run(messages):
+    """The per-call setup ``TurnSummaryAnnotator.run`` used to perform."""
+    import html
+
+    try:
+        import nltk
+        stop_words = set(nltk.corpus.stopwords.words("english"))
+    except Exception:
+        stop_words = {
+            "the", "and", "to", "of", "a", "in", "that", "it", "is", "for",
+            "on", "with", "as", "this", "by", "an", "be",
+        }
+    blocks = []
+    for idx, msg in enumerate(messages, 1):
+        role = msg.get("author")
+        if role not in {"user", "assistant"}:
+            continue
+        prefix = "zero" if role == "user" else "tide"
+        content = msg.get("content", "")
+        esc_content = html.escape(content).replace("\n", "<br>\n")
+        blocks.append(f'<div class="{role}-turn" id="turn-{idx:03d}"><h2>{prefix}:</h2>{esc_content}</div>')
+        words = [w.lower() for w in re.findall(r"[A-Za-z']+", content)]
+        filtered = [w for w in words if w not in stop_words]
+        common = [w for w, _ in Counter(filtered).most_common(5)]
+        blocks.append(f'<div class="turn-summary">{html.escape(" ".join(common))}</div>')
+    return blocks
+
+
+def timed(label, fn, scrolls, n_messages):
+    start = time.perf_counter()
+    for msgs in scrolls:
+        fn(msgs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {elapsed:>8.2f} s {n_messages / elapsed:>12,.0f} msg/s")
+
+
+def main():
+    args = parse_args()
+    scrolls = build_scrolls(args.scrolls, args.turns, args.words)
+    n_messages = sum(len(s) for s in scrolls)
+    print(f"{args.scrolls} scrolls, {n_messages} messages")
+
+    timed("before: run() setup", baseline_run, scrolls, n_messages)
+    annotator = TurnSummaryAnnotator()
+    timed("after: run()", annotator.run, scrolls, n_messages)
+    timed(
+        "after: summarize_terms",
+        lambda msgs: summarize_terms(m["content"] for m in msgs),
+        scrolls,
+        n_messages,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark how linking a new document into the willow graph scales.
+
+Builds graphs of synthetic summary nodes and times finding the overlap
+neighbours of one more document, both with the full node scan that
+``WillowGrowth.submit_document`` used to do and with the posting-list lookup
+in :class:`~breathing_willow.token_index.TokenIndex`. Tokens are drawn from a
+Zipf-like vocabulary, so a few words are shared widely and most are rare.
+
+    python scripts/bench_willow_ingest.py --sizes 10 1000 10000 50000
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from breathing_willow.token_index import TokenIndex  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 1000, 10000], help="graph sizes"
+    )
+    parser.add_argument("--tokens", type=int, default=25, help="summary tokens per node")
+    parser.add_argument("--vocab", type=int, default=20000, help="vocabulary size")
+    parser.add_argument(
+        "--skew", type=float, default=0.8, help="Zipf exponent of token frequencies"
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="documents linked per size")
+    return parser.parse_args()
+
+
+def make_docs(n, n_tokens, vocab, skew, seed=3):
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(vocab)]
+    weights = [1 / (i + 1) ** skew for i in range(vocab)]
+    return [
+        (f"{i:08x}", rng.choices(words, weights, k=n_tokens)) for i in range(n)
+    ]
+
+
+def brute_force(nodes, tokens):
+    """The former ``submit_document`` loop: intersect with every node."""
+    edges = {}
+    for nid, other in nodes:
+        common = set(tokens) & set(other)
+        if common:
+            edges[nid] = len(common)
+    return edges
+
+
+def main():
+    args = parse_args()
+    probes = make_docs(args.repeat, args.tokens, args.vocab, args.skew, seed=11)
+    print(f"{'nodes':>7} {'scan us':>10} {'index us':>10} {'edges':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            nodes = make_docs(size, args.tokens, args.vocab, args.skew)
+            index = TokenIndex(Path(tmp) / f"bench-{size}.tokens.jsonl")
+            index.rebuild(nodes)
+
+            start = time.perf_counter()
+            for _, tokens in probes:
+                scanned = brute_force(nodes, tokens)
+            scan = (time.perf_counter() - start) / len(probes)
+
+            start = time.perf_counter()
+            for _, tokens in probes:
+                looked_up = index.overlaps(tokens)
+            lookup = (time.perf_counter() - start) / len(probes)
+
+            assert dict(looked_up) == scanned
+            print(f"{size:>7} {scan * 1e6:>10.0f} {lookup * 1e6:>10.0f} {len(scanned):>7}")
+
+
+if __name__ == "__main__":
+    main()
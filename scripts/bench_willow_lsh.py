@@ -0,0 +1,121 @@
+"""Benchmark MinHash/LSH neighbour search against the brute-force node scan.
+
+Builds graphs of synthetic summary nodes in topic families (each node is its
+topic's token set with some tokens swapped for random ones), then for a set
+of probe documents finds every node whose token similarity reaches the
+threshold, once with the full scan ``WillowGrowth.expand_node`` does and once
+through the candidates of :class:`~breathing_willow.minhash.MinHashLSH`.
+Reports time per probe, candidates checked and the recall of the LSH path.
+
+    python scripts/bench_willow_lsh.py --sizes 1000 10000 50000 --thresholds 0.3 0.5
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from breathing_willow.minhash import MinHashLSH  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000], help="graph sizes"
+    )
+    parser.add_argument(
+        "--thresholds", type=float, nargs="+", default=[0.3, 0.5], help="similarity thresholds"
+    )
+    parser.add_argument(
+        "--recall", type=float, default=0.9, help="LSH recall at the threshold"
+    )
+    parser.add_argument("--tokens", type=int, default=25, help="summary tokens per node")
+    parser.add_argument("--vocab", type=int, default=20000, help="vocabulary size")
+    parser.add_argument("--family", type=int, default=20, help="nodes per topic family")
+    parser.add_argument(
+        "--noise", type=float, default=0.4, help="share of each node's tokens replaced"
+    )
+    parser.add_argument("--repeat", type=int, default=50, help="probe documents per size")
+    return parser.parse_args()
+
+
+def make_docs(n, n_tokens, vocab, family, noise, seed=3):
+    rng = random.Random(seed)
+    docs, topic = [], []
+    for i in range(n):
+        if i % family == 0:
+            topic = rng.sample(range(vocab), n_tokens)
+        tokens = [
+            f"w{rng.randrange(vocab) if rng.random() < noise else t}" for t in topic
+        ]
+        docs.append((f"{i:08x}", tokens))
+    return docs
+
+
+def brute_force(nodes, tokens, threshold):
+    """The ``expand_node`` loop: compare against every node."""
+    tokens = set(tokens)
+    found = {}
+    for nid, other in nodes:
+        other = set(other)
+        overlap = len(tokens & other)
+        if overlap / max(len(tokens), len(other)) >= threshold:
+            found[nid] = overlap
+    return found
+
+
+def lsh_search(index, token_sets, tokens, threshold):
+    tokens = set(tokens)
+    candidates = index.candidates(tokens)
+    found = {}
+    for nid in candidates:
+        other = token_sets[nid]
+        overlap = len(tokens & other)
+        if overlap / max(len(tokens), len(other)) >= threshold:
+            found[nid] = overlap
+    return found, len(candidates)
+
+
+def main():
+    args = parse_args()
+    print(
+        f"{'nodes':>7} {'thresh':>6} {'bands':>6} {'scan us':>9} {'lsh us':>8} "
+        f"{'cands':>7} {'true':>6} {'recall':>7}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            nodes = make_docs(size, args.tokens, args.vocab, args.family, args.noise)
+            token_sets = {nid: set(t) for nid, t in nodes}
+            rng = random.Random(11)
+            probes = [nodes[rng.randrange(size)] for _ in range(args.repeat)]
+            for threshold in args.thresholds:
+                index = MinHashLSH(
+                    Path(tmp) / f"bench-{size}-{threshold}.jsonl", threshold, args.recall
+                )
+                index.rebuild(nodes)
+
+                start = time.perf_counter()
+                exact = [brute_force(nodes, tokens, threshold) for _, tokens in probes]
+                scan = (time.perf_counter() - start) / len(probes)
+
+                start = time.perf_counter()
+                approx = [lsh_search(index, token_sets, tokens, threshold) for _, tokens in probes]
+                lookup = (time.perf_counter() - start) / len(probes)
+
+                true = sum(len(e) for e in exact)
+                hits = sum(len(a.keys() & e.keys()) for (a, _), e in zip(approx, exact))
+                cands = sum(c for _, c in approx) / len(probes)
+                bands = f"{index.bands}x{index.rows}"
+                print(
+                    f"{size:>7} {threshold:>6.2f} {bands:>6} {scan * 1e6:>9.0f} "
+                    f"{lookup * 1e6:>8.0f} {cands:>7.0f} {true / len(probes):>6.1f} "
+                    f"{hits / true if true else 1:>7.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
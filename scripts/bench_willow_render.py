@@ -0,0 +1,82 @@
+"""Benchmark full vs level-of-detail rendering of the willow graph.
+
+Builds a synthetic graph of topic families (dense within a family, a few
+random edges between them), renders it with ``WillowGrowth.visualize`` as is
+and with ``lod=True``, and reports render time, the nodes and edges written
+and the size of the resulting HTML.
+
+    python scripts/bench_willow_render.py --sizes 1000 5000 20000
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import networkx as nx  # noqa: E402
+
+from breathing_willow.graph_lod import level_of_detail  # noqa: E402
+from breathing_willow.willow_viz import WillowGrowth  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 5000], help="graph sizes"
+    )
+    parser.add_argument("--family", type=int, default=20, help="nodes per topic family")
+    parser.add_argument("--degree", type=int, default=8, help="edges per node in its family")
+    parser.add_argument("--top-k", type=int, default=5, help="edges kept per node")
+    parser.add_argument("--max-nodes", type=int, default=500, help="collapse threshold")
+    return parser.parse_args()
+
+
+def make_graph(n, family, degree, seed=3):
+    rng = random.Random(seed)
+    graph = nx.Graph()
+    for i in range(n):
+        topic = i // family
+        graph.add_node(f"{i:08x}", summary=f"topic{topic} words", tokens=[f"t{topic}", f"w{i}"])
+    for i in range(n):
+        base = i // family * family
+        for _ in range(degree // 2):
+            j = base + rng.randrange(min(family, n - base))
+            if j != i:
+                graph.add_edge(f"{i:08x}", f"{j:08x}", weight=rng.randint(1, 5))
+        if rng.random() < 0.2:
+            graph.add_edge(f"{i:08x}", f"{rng.randrange(n):08x}", weight=1)
+    return graph
+
+
+def main():
+    args = parse_args()
+    print(
+        f"{'nodes':>7} {'mode':>5} {'render s':>9} {'drawn':>7} {'edges':>7} {'html MB':>8}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        wg = WillowGrowth(graph_path=Path(tmp) / "bench.json")
+        for size in args.sizes:
+            wg.graph = make_graph(size, args.family, args.degree)
+            for lod in (False, True):
+                out = Path(tmp) / f"bench-{size}-{lod}.html"
+                start = time.perf_counter()
+                wg.visualize(str(out), lod=lod, top_k=args.top_k, max_nodes=args.max_nodes)
+                elapsed = time.perf_counter() - start
+                drawn = (
+                    level_of_detail(wg.graph, args.top_k, args.max_nodes)[0]
+                    if lod
+                    else wg.graph
+                )
+                print(
+                    f"{size:>7} {'lod' if lod else 'full':>5} {elapsed:>9.2f} "
+                    f"{drawn.number_of_nodes():>7} {drawn.number_of_edges():>7} "
+                    f"{out.stat().st_size / 1e6:>8.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
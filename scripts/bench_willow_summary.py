@@ -0,0 +1,85 @@
+"""Benchmark per-document summarization for the willow graph.
+
+Compares fitting a fresh ``TfidfVectorizer`` and ``KMeans`` on the sentences
+of every document, as ``WillowGrowth._summary_from_text`` used to, with the
+running-statistics :class:`~breathing_willow.summary_engine.SummaryEngine`.
+
+    python scripts/bench_willow_summary.py --docs 200 --sentences 40
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from breathing_willow.summary_engine import SummaryEngine, analyze  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=200, help="documents to summarize")
+    parser.add_argument("--sentences", type=int, default=40, help="sentences per document")
+    parser.add_argument("--words", type=int, default=14, help="words per sentence")
+    parser.add_argument("--vocab", type=int, default=5000, help="vocabulary size")
+    return parser.parse_args()
+
+
+def make_docs(n_docs, n_sentences, n_words, vocab, seed=5):
+    rng = random.Random(seed)
+    words = [f"term{i}" for i in range(vocab)]
+    weights = [1 / (i + 1) ** 0.8 for i in range(vocab)]
+    return [
+        ". ".join(
+            " ".join(rng.choices(words, weights, k=n_words)) for _ in range(n_sentences)
+        )
+        + "."
+        for _ in range(n_docs)
+    ]
+
+
+def refit_summary(text):
+    """The former per-document path: fit a vectorizer and KMeans every time."""
+    from sklearn.cluster import KMeans
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    sentences = [s.strip() for s in re.split(r"[.!?]+", text) if s.strip()]
+    n_clusters = min(5, len(sentences))
+    vectorizer = TfidfVectorizer(stop_words="english")
+    X = vectorizer.fit_transform(sentences)
+    km = KMeans(n_clusters=n_clusters, n_init="auto", random_state=42)
+    km.fit(X)
+    terms = vectorizer.get_feature_names_out()
+    return [
+        [terms[i] for i in km.cluster_centers_[c].argsort()[-5:][::-1]]
+        for c in range(n_clusters)
+    ]
+
+
+def main():
+    args = parse_args()
+    docs = make_docs(args.docs, args.sentences, args.words, args.vocab)
+    refit_summary(docs[0])
+    analyze(docs[0])
+
+    start = time.perf_counter()
+    for text in docs:
+        refit_summary(text)
+    refit = (time.perf_counter() - start) / len(docs)
+
+    engine = SummaryEngine()
+    start = time.perf_counter()
+    for text in docs:
+        engine.summarize(analyze(text))
+    online = (time.perf_counter() - start) / len(docs)
+
+    print(f"{'path':<8} {'ms/doc':>8}")
+    print(f"{'refit':<8} {refit * 1000:>8.2f}")
+    print(f"{'engine':<8} {online * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
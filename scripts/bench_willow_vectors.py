@@ -0,0 +1,110 @@
+"""Benchmark all-pairs willow similarity: Python token loop vs vector matmul.
+
+Builds graphs of synthetic summary nodes in topic families and finds every
+node's nearest neighbours twice: with the nested Python loop of token-set
+intersections ``WillowGrowth`` uses (timed on ``--repeat`` nodes and scaled
+to the whole graph, since the full loop takes hours at 50k nodes) and with
+:meth:`~breathing_willow.vector_index.VectorIndex.neighbours`, a blocked
+matrix product over hashed TF-IDF vectors. Also reports how many of each
+node's top-``k`` token-overlap neighbours the vectors recover.
+
+    python scripts/bench_willow_vectors.py --sizes 10000 50000
+"""
+
+import argparse
+import math
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from breathing_willow.vector_index import VectorIndex, hashed_tfidf  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000], help="graph sizes"
+    )
+    parser.add_argument("--dim", type=int, default=256, help="vector length")
+    parser.add_argument("-k", type=int, default=10, help="neighbours per node")
+    parser.add_argument("--tokens", type=int, default=25, help="summary tokens per node")
+    parser.add_argument("--vocab", type=int, default=20000, help="vocabulary size")
+    parser.add_argument("--family", type=int, default=20, help="nodes per topic family")
+    parser.add_argument(
+        "--noise", type=float, default=0.4, help="share of each node's tokens replaced"
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="nodes timed in the loop")
+    return parser.parse_args()
+
+
+def make_docs(n, n_tokens, vocab, family, noise, seed=3):
+    rng = random.Random(seed)
+    docs, topic = [], []
+    for i in range(n):
+        if i % family == 0:
+            topic = rng.sample(range(vocab), n_tokens)
+        docs.append([f"w{rng.randrange(vocab) if rng.random() < noise else t}" for t in topic])
+    return docs
+
+
+def loop_top_k(token_sets, row, k):
+    """Nearest rows by ``overlap / max(len)``, one Python intersection each."""
+    tokens = token_sets[row]
+    sims = []
+    for other_row, other in enumerate(token_sets):
+        if other_row != row:
+            sims.append((len(tokens & other) / max(len(tokens), len(other)), other_row))
+    sims.sort(reverse=True)
+    return [r for s, r in sims[:k] if s > 0]
+
+
+def main():
+    args = parse_args()
+    print(
+        f"{'nodes':>7} {'loop s (est)':>13} {'vectorize s':>12} {'matmul s':>9} "
+        f"{'overlap@k':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            docs = make_docs(size, args.tokens, args.vocab, args.family, args.noise)
+            token_sets = [set(d) for d in docs]
+            df = Counter(t for s in token_sets for t in s)
+
+            def idf(term):
+                return math.log((1 + size) / (1 + df[term])) + 1
+
+            rng = random.Random(11)
+            probes = [rng.randrange(size) for _ in range(args.repeat)]
+            start = time.perf_counter()
+            exact = {row: loop_top_k(token_sets, row, args.k) for row in probes}
+            loop = (time.perf_counter() - start) / len(probes) * size
+
+            start = time.perf_counter()
+            index = VectorIndex(Path(tmp) / f"bench-{size}.vectors.f32", args.dim)
+            index.rebuild(
+                [f"{i:08x}" for i in range(size)],
+                [hashed_tfidf(d, idf, args.dim) for d in docs],
+            )
+            vectorize = time.perf_counter() - start
+
+            start = time.perf_counter()
+            found = index.neighbours(range(size), args.k)
+            matmul = time.perf_counter() - start
+
+            shared = sum(
+                len(set(exact[row]) & {r for r, _ in found[row]}) for row in probes
+            )
+            total = sum(len(exact[row]) for row in probes)
+            print(
+                f"{size:>7} {loop:>13.1f} {vectorize:>12.2f} {matmul:>9.2f} "
+                f"{shared / total if total else 1:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
+import io
 import json
 import zipfile
 from pathlib import Path
 
+import pytest
+
 import sys
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from breathing_willow.export_kernel import ChatExportArchiver
+from breathing_willow.export_kernel import ChatExportArchiver, iter_json_array
 # To use NLTK stopwords during tests, ensure corpora are installed:
 # from breathing_willow import setup_nltk
 # setup_nltk()
@@ -88,3 +91,354 @@ def test_archiver_index_page(tmp_path: Path):
     assert "hello" in index_text
     assert "second thread" in index_text
 
+
+
+def test_archiver_streaming_matches_extracted(tmp_path: Path):
+    convo1 = make_conversation()
+    convo2 = make_conversation()
+    convo2["mapping"]["abc"]["message"]["content"]["parts"] = ["second thread"]
+    convo_path = tmp_path / "conversations.json"
+    convo_path.write_text(json.dumps([convo1, convo2], indent=2))
+
+    zip_path = tmp_path / "exp.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.write(convo_path, arcname="conversations.json")
+
+    extracted = tmp_path / "extracted"
+    streamed = tmp_path / "streamed"
+    ChatExportArchiver(zip_path, extracted).run()
+    ChatExportArchiver(zip_path, streamed, stream=True).run()
+
+    names = sorted(p.name for p in extracted.glob("*.html"))
+    assert names == sorted(p.name for p in streamed.glob("*.html"))
+    for name in names:
+        assert (extracted / name).read_text() == (streamed / name).read_text()
+
+
+def test_iter_json_array_small_chunks():
+    data = [{"a": "x" * 50, "b": [1, 2, {"c": "]"}]}, 12345, "s,t", None, []]
+    fh = io.StringIO(json.dumps(data))
+    assert list(iter_json_array(fh, chunk_size=3)) == data
+    assert list(iter_json_array(io.StringIO(" [ ] "))) == []
+
+    # numbers cut after "." or "e" must not decode as a shorter number
+    for text in ("[0.1]", "[null, 0.1, []]", "[1.5e3, 2]", "[-12.75E-2,true]"):
+        for size in (1, 3):
+            assert list(iter_json_array(io.StringIO(text), chunk_size=size)) == json.loads(text)
+
+    # separators are as strict as json.load
+    for text in ("[1,,2]", "[,1]", "[1 2]", "[1,]", "[1", "1"):
+        for size in (1, 3, 64):
+            with pytest.raises(ValueError):
+                list(iter_json_array(io.StringIO(text), chunk_size=size))
+
+
+def test_archiver_parallel_workers(tmp_path: Path):
+    convos = []
+    for i in range(6):
+        convo = make_conversation()
+        convo["mapping"]["abc"]["message"]["content"]["parts"] = [f"thread {i}"]
+        convos.append(convo)
+    convos[3] = {"mapping": None}
+    convo_path = tmp_path / "conversations.json"
+    convo_path.write_text(json.dumps(convos))
+
+    zip_path = tmp_path / "exp.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.write(convo_path, arcname="conversations.json")
+
+    serial = ChatExportArchiver(zip_path, tmp_path / "serial")
+    serial.run()
+    parallel = ChatExportArchiver(zip_path, tmp_path / "parallel", workers=2)
+    parallel.run()
+
+    assert [idx for idx, _ in parallel.failures] == [4]
+    assert parallel.failures == serial.failures
+    names = sorted(p.name for p in (tmp_path / "serial").glob("*-conversation.html"))
+    assert "004-conversation.html" not in names
+    for name in names:
+        expected = (tmp_path / "serial" / name).read_text()
+        assert (tmp_path / "parallel" / name).read_text() == expected
+    assert "thread 5" in (tmp_path / "parallel" / "006-conversation.html").read_text()
+
+
+def write_export(tmp_path: Path, convos: list, name: str = "exp.zip") -> Path:
+    zip_path = tmp_path / name
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("conversations.json", json.dumps(convos))
+    return zip_path
+
+
+def test_archiver_incremental_manifest(tmp_path: Path):
+    convo1 = make_conversation()
+    convo1.update({"id": "c1", "update_time": 1})
+    convo2 = make_conversation()
+    convo2.update({"id": "c2", "update_time": 1})
+    convo2["mapping"]["abc"]["message"]["content"]["parts"] = ["second thread"]
+
+    out_dir = tmp_path / "out"
+    ChatExportArchiver(write_export(tmp_path, [convo1, convo2]), out_dir, incremental=True).run()
+    manifest = json.loads((out_dir / "manifest.json").read_text())["conversations"]
+    assert manifest["c1"]["filename"] == "001-conversation.html"
+    assert manifest["c2"]["filename"] == "002-conversation.html"
+
+    first = out_dir / "001-conversation.html"
+    first.write_text("untouched")
+
+    convo2["update_time"] = 2
+    convo2["mapping"]["abc"]["message"]["content"]["parts"] = ["edited thread"]
+    convo3 = make_conversation()
+    convo3.update({"id": "c3", "update_time": 1})
+    # a new conversation sorted first must not steal an existing filename
+    arch = ChatExportArchiver(
+        write_export(tmp_path, [convo3, convo1, convo2], "exp2.zip"),
+        out_dir,
+        incremental=True,
+    )
+    arch.run()
+
+    assert first.read_text() == "untouched"
+    assert "edited thread" in (out_dir / "002-conversation.html").read_text()
+    assert (out_dir / "003-conversation.html").exists()
+    manifest = json.loads((out_dir / "manifest.json").read_text())["conversations"]
+    assert manifest["c3"]["filename"] == "003-conversation.html"
+    assert manifest["c2"]["update_time"] == 2
+    # unchanged scrolls are indexed from their manifest metadata
+    assert manifest["c1"]["snippet"] == "hello"
+    assert "001-conversation.html" in (out_dir / "index.html").read_text()
+
+
+def test_incremental_rerenders_when_options_change(tmp_path: Path):
+    from breathing_willow.history_search import HistorySearchIndex
+    from breathing_willow.message_store import MessageStore
+
+    convo1 = make_conversation()
+    convo1.update({"id": "c1", "update_time": 1})
+    convo2 = make_conversation()
+    convo2.update({"id": "c2", "update_time": 1})
+    out_dir = tmp_path / "out"
+    ChatExportArchiver(write_export(tmp_path, [convo1, convo2]), out_dir, incremental=True).run()
+
+    convo3 = make_conversation()
+    convo3.update({"id": "c3", "update_time": 1})
+    arch = ChatExportArchiver(
+        write_export(tmp_path, [convo1, convo2, convo3], "exp2.zip"),
+        out_dir,
+        incremental=True,
+        annotate=True,
+        search_index=True,
+        message_store=True,
+    )
+    arch.run()
+    assert arch.metrics.counters.get("skipped", 0) == 0
+    for name in ("001", "002", "003"):
+        assert 'class="turn-summary"' in (out_dir / f"{name}-conversation.html").read_text()
+    with HistorySearchIndex(out_dir / HistorySearchIndex.FILENAME) as index:
+        assert {h["filename"] for h in index.search("hello")} == {
+            "001-conversation.html", "002-conversation.html", "003-conversation.html"
+        }
+    with MessageStore(out_dir) as store:
+        assert {row["conversation_id"] for row in store} == {"c1", "c2", "c3"}
+
+    # the same options again skip everything
+    arch.run()
+    assert arch.metrics.counters["skipped"] == 3
+
+
+def test_incremental_duplicate_ids_share_one_scroll(tmp_path: Path):
+    convo = make_conversation()
+    convo.update({"id": "c1", "update_time": 1})
+    copy = json.loads(json.dumps(convo))
+    copy["update_time"] = 2
+    out_dir = tmp_path / "out"
+    ChatExportArchiver(write_export(tmp_path, [convo, copy]), out_dir, incremental=True).run()
+
+    assert sorted(p.name for p in out_dir.glob("*-conversation.html")) == [
+        "001-conversation.html"
+    ]
+    manifest = json.loads((out_dir / "manifest.json").read_text())["conversations"]
+    assert manifest["c1"]["filename"] == "001-conversation.html"
+
+
+def test_index_uses_records_and_falls_back_to_scan(tmp_path: Path):
+    from breathing_willow.export_kernel import KernelIndexPage
+
+    (tmp_path / "001-conversation.html").write_text("not read")
+    (tmp_path / "002-conversation.html").write_text(
+        '<div class="date">2024-01-02</div>\n'
+        '<div class="user-turn"><h2>zero:</h2>fish &amp; chips</div>\n'
+    )
+    records = [{"filename": "001-conversation.html", "date": "2024-01-01", "snippet": "a < b"}]
+    KernelIndexPage().run(tmp_path, records=records)
+
+    index_text = (tmp_path / "index.html").read_text()
+    assert "a &lt; b" in index_text
+    assert "fish &amp; chips" in index_text
+    assert index_text.index("2024-01-01") < index_text.index("2024-01-02")
+
+
+def test_archiver_collects_scroll_records(tmp_path: Path):
+    zip_path = write_export(tmp_path, [make_conversation()])
+    arch = ChatExportArchiver(zip_path, tmp_path / "out", workers=2)
+    arch.run()
+    record = arch.records["001-conversation.html"]
+    assert record["snippet"] == "hello"
+    assert record["turns"] == 2
+    assert record["bytes"] == (tmp_path / "out" / "001-conversation.html").stat().st_size
+
+
+def test_sharded_index_rewrites_only_changed_months(tmp_path: Path):
+    from breathing_willow.export_kernel import KernelIndexPage
+
+    for name in ("001", "002", "003"):
+        (tmp_path / f"{name}-conversation.html").write_text("")
+    records = [
+        {"filename": "001-conversation.html", "date": "2024-01-05", "snippet": "jan"},
+        {"filename": "002-conversation.html", "date": "2024-02-01", "snippet": "feb"},
+        {"filename": "003-conversation.html", "date": "", "snippet": "none"},
+    ]
+    index = KernelIndexPage(sharded=True)
+    index.run(tmp_path, records=records)
+
+    root = (tmp_path / "index.html").read_text()
+    assert "index-2024-01.html" in root and "index-2024-02.html" in root
+    assert "index-undated.html" in root
+    assert "jan" in (tmp_path / "index-2024-01.html").read_text()
+
+    jan_page = tmp_path / "index-2024-01.html"
+    jan_page.write_text("stale")
+    records[1]["snippet"] = "february"
+    index.run(tmp_path, records=records)
+    assert jan_page.read_text() == "stale"
+    assert "february" in (tmp_path / "index-2024-02.html").read_text()
+
+    # switching back to one index page drops the month pages and their state
+    KernelIndexPage().run(tmp_path, records=records)
+    assert "february" in (tmp_path / "index.html").read_text()
+    assert not list(tmp_path.glob("index-*.html"))
+    assert not (tmp_path / KernelIndexPage.SHARD_STATE).exists()
+
+
+def test_archiver_annotates_during_export(tmp_path: Path):
+    from breathing_willow.export_kernel import annotate_scrolls_in_dir
+
+    convo = make_conversation()
+    convo["mapping"]["def"]["message"]["content"]["parts"] = ["a </div> inside text"]
+    zip_path = write_export(tmp_path, [convo])
+
+    annotated = tmp_path / "annotated"
+    ChatExportArchiver(zip_path, annotated, annotate=True).run()
+    text = (annotated / "001-conversation.html").read_text()
+    assert text.count('class="turn-summary"') == 2
+    assert '<div class="assistant-turn" id="turn-002">' in text
+    assert "a &lt;/div&gt; inside text" in text
+
+    plain = tmp_path / "plain"
+    ChatExportArchiver(zip_path, plain).run()
+    annotate_scrolls_in_dir(plain)
+    assert (plain / "001-conversation.html").read_text() == text
+    assert "hello" in (annotated / "index.html").read_text()
+
+
+def test_summarize_terms_matches_per_message_counting():
+    import re
+    from collections import Counter
+
+    from breathing_willow.export_kernel import summarize_terms, summary_stop_words
+
+    texts = [
+        "The willow and the river; the willow bends. River, river!",
+        "Don't stop: don't STOP the Ünïcode flow flow",
+        "",
+    ]
+    stop_words = summary_stop_words()
+    expected = []
+    for text in texts:
+        words = [w.lower() for w in re.findall(r"[A-Za-z']+", text)]
+        counts = Counter(w for w in words if w not in stop_words)
+        expected.append(" ".join(w for w, _ in counts.most_common(5)))
+    assert summarize_terms(texts) == expected
+
+
+def test_archiver_reads_zip_in_place_and_links_attachments(tmp_path: Path, monkeypatch):
+    convo = make_conversation()
+    convo["mapping"]["abc"]["message"]["content"] = {
+        "content_type": "multimodal_text",
+        "parts": [
+            {"content_type": "image_asset_pointer", "asset_pointer": "file-service://file-Img1"},
+            "look at this",
+        ],
+    }
+    zip_path = tmp_path / "exp.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("export/conversations.json", json.dumps([convo]))
+        zf.writestr("export/file-Img1-photo.png", b"png-bytes")
+        zf.writestr("export/file-Unused-big.bin", b"x" * 1000)
+
+    def no_extract(*args, **kwargs):
+        raise AssertionError("archive should not be extracted")
+
+    monkeypatch.setattr(zipfile.ZipFile, "extractall", no_extract)
+
+    out_dir = tmp_path / "out"
+    ChatExportArchiver(zip_path, out_dir, attachments=True, workers=2).run()
+
+    text = (out_dir / "001-conversation.html").read_text()
+    assert "look at this" in text and "asset_pointer" not in text
+    assert '<a href="attachments/file-Img1-photo.png">' in text
+    assert (out_dir / "attachments" / "file-Img1-photo.png").read_bytes() == b"png-bytes"
+    assert not (out_dir / "attachments" / "file-Unused-big.bin").exists()
+
+    # a serial run links attachments through its own archive and closes it
+    opened = []
+    real_init = zipfile.ZipFile.__init__
+
+    def tracking_init(self, *args, **kwargs):
+        real_init(self, *args, **kwargs)
+        opened.append(self)
+
+    monkeypatch.setattr(zipfile.ZipFile, "__init__", tracking_init)
+    ChatExportArchiver(zip_path, tmp_path / "serial", attachments=True).run()
+    assert (tmp_path / "serial" / "attachments" / "file-Img1-photo.png").is_file()
+    assert len(opened) == 1 and opened[0].fp is None
+
+
+def test_archiver_rejects_unknown_timezone(tmp_path: Path):
+    zip_path = write_export(tmp_path, [make_conversation()])
+    with pytest.raises(ValueError, match="Mars/Base"):
+        ChatExportArchiver(zip_path, tmp_path / "out", tz="Mars/Base")
+    assert not (tmp_path / "out").exists()
+
+
+def test_archiver_is_quiet_and_writes_metrics(tmp_path: Path, capsys):
+    convos = [make_conversation(), {"mapping": None}, make_conversation()]
+    zip_path = write_export(tmp_path, convos)
+    out_dir = tmp_path / "out"
+    ChatExportArchiver(zip_path, out_dir, stream=True).run()
+
+    out = capsys.readouterr().out
+    assert "Parsing" not in out and "ThreadParser" not in out
+    assert "Exported 2 scroll(s)" in out and "1 failed" in out
+
+    metrics = json.loads((out_dir / "export-metrics.json").read_text())
+    assert {"extract", "load", "normalize", "render", "write", "index"} <= set(
+        metrics["spans"]
+    )
+    assert metrics["spans"]["normalize"]["calls"] == 2
+    assert metrics["counters"]["scrolls"] == 2
+    assert metrics["counters"]["turns"] == 4
+    assert metrics["counters"]["bytes"] == sum(
+        p.stat().st_size for p in out_dir.glob("*-conversation.html")
+    )
+
+    ChatExportArchiver(zip_path, tmp_path / "loud", verbose=True).run()
+    assert "Parsing conversation 1..." in capsys.readouterr().out
+
+
+def test_archiver_quiet_on_unsupported_threads(tmp_path: Path, capsys):
+    zip_path = write_export(tmp_path, [{"title": "no messages"}, make_conversation()])
+    ChatExportArchiver(zip_path, tmp_path / "out").run()
+    assert "Unsupported" not in capsys.readouterr().out
+
+    ChatExportArchiver(zip_path, tmp_path / "loud", verbose=True).run()
+    assert "Unsupported or missing mapping structure." in capsys.readouterr().out
@@ -0,0 +1,55 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import networkx as nx
+
+import breathing_willow.willow_viz as willow_viz
+
+# Avoid NLTK downloads during tests
+willow_viz.word_tokenize = None
+
+from breathing_willow.graph_lod import collapse_communities, level_of_detail, prune_top_k
+from breathing_willow.willow_viz import WillowGrowth
+
+
+def two_cliques():
+    graph = nx.Graph()
+    for group, word in ((range(0, 5), "alpha"), (range(5, 10), "omega")):
+        for i in group:
+            graph.add_node(f"n{i}", summary=word, path=f"{i}.md", tokens=[word, f"w{i}"])
+        graph.add_edges_from(
+            (f"n{i}", f"n{j}", {"weight": 3}) for i in group for j in group if i < j
+        )
+    graph.add_edge("n0", "n5", weight=1)
+    graph.add_node("lone", summary="lone", tokens=["lone"])
+    return graph
+
+
+def test_prune_and_collapse():
+    graph = two_cliques()
+    pruned = prune_top_k(graph, k=1)
+    assert pruned.number_of_nodes() == graph.number_of_nodes()
+    assert all(pruned.degree(n) >= 1 for n in graph if graph.degree(n))
+    assert not pruned.has_edge("n0", "n5")
+
+    assert collapse_communities(graph, max_nodes=20) is graph
+    collapsed = collapse_communities(graph, max_nodes=3)
+    assert sorted(collapsed.nodes) == ["cluster-0", "cluster-1", "lone"]
+    assert collapsed.nodes["cluster-0"]["size"] == 5
+    assert collapsed.nodes["cluster-0"]["summary"].startswith("5 docs: ")
+    assert collapsed["cluster-0"]["cluster-1"]["weight"] == 1
+
+
+def test_visualize_lod_has_fixed_positions(tmp_path: Path):
+    wg = WillowGrowth(graph_path=tmp_path / "graph.json")
+    wg.graph = two_cliques()
+    reduced, positions = level_of_detail(wg.graph, top_k=2, max_nodes=3)
+    assert set(positions) == set(reduced.nodes)
+
+    out = tmp_path / "lod.html"
+    wg.visualize(str(out), lod=True, top_k=2, max_nodes=3)
+    html = out.read_text()
+    assert '"enabled": false' in html
+    assert "cluster-0" in html and '"x": ' in html
@@ -0,0 +1,67 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import breathing_willow.willow_viz as willow_viz
+
+# Avoid NLTK downloads during tests
+willow_viz.word_tokenize = None
+
+from breathing_willow.graph_store import GraphStore
+from breathing_willow.willow_viz import WillowGrowth
+
+DOCS = {
+    "d1.txt": "alpha beta gamma",
+    "d2.txt": "alpha delta",
+    "d3.txt": "beta gamma omega",
+}
+
+
+def write_docs(tmp_path: Path) -> list[Path]:
+    paths = []
+    for name, text in DOCS.items():
+        (tmp_path / name).write_text(text)
+        paths.append(tmp_path / name)
+    return paths
+
+
+def test_store_appends_without_materializing(tmp_path: Path):
+    paths = write_docs(tmp_path)
+    db = tmp_path / "graph.sqlite"
+    for path in paths:
+        wg = WillowGrowth(graph_path=db)
+        wg.submit_document(path)
+        assert wg._graph is None
+
+    reference = WillowGrowth(graph_path=tmp_path / "graph.json")
+    for path in paths:
+        reference.submit_document(path)
+
+    graph = WillowGrowth(graph_path=db).graph
+    assert list(graph.nodes) == list(reference.graph.nodes)
+    assert dict(graph.nodes(data=True)) == dict(reference.graph.nodes(data=True))
+    edges = {frozenset((a, b)): d["weight"] for a, b, d in graph.edges(data=True)}
+    expected = {
+        frozenset((a, b)): d["weight"] for a, b, d in reference.graph.edges(data=True)
+    }
+    assert edges == expected
+
+
+def test_store_shape_node_and_write_graph(tmp_path: Path):
+    paths = write_docs(tmp_path)
+    reference = WillowGrowth(graph_path=tmp_path / "graph.json")
+    reference.submit_batch(paths)
+    uid = next(iter(reference.graph.nodes))
+
+    with GraphStore(tmp_path / "graph.db") as store:
+        store.write_graph(reference.graph)
+        assert len(store) == len(DOCS)
+        assert uid in store
+
+    wg = WillowGrowth(graph_path=tmp_path / "graph.db")
+    wg.shape_node(uid, sentence="a line")
+    assert wg._graph is None
+    node = WillowGrowth(graph_path=tmp_path / "graph.db").graph.nodes[uid]
+    assert node["sentence"] == "a line" and node["shaped"] is True
+    assert node["tokens"] == reference.graph.nodes[uid]["tokens"]
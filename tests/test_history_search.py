@@ -0,0 +1,65 @@
+import json
+import zipfile
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from breathing_willow.export_kernel import ChatExportArchiver
+from breathing_willow.history_search import HistorySearchIndex
+from breathing_willow_cli.breathing_willow import main as cli_main
+
+
+def make_thread(user: str, assistant: str) -> dict:
+    return {
+        "messages": [
+            {"author": "user", "content": user},
+            {"author": "assistant", "content": assistant},
+        ]
+    }
+
+
+def test_search_index_built_during_export(tmp_path: Path, capsys):
+    convos = [
+        make_thread("how do willows breathe", "slowly, through the leaves"),
+        make_thread("tell me about rivers", "rivers carry willow seeds downstream"),
+    ]
+    zip_path = tmp_path / "exp.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("conversations.json", json.dumps(convos))
+
+    out_dir = tmp_path / "out"
+    ChatExportArchiver(zip_path, out_dir, search_index=True, workers=2).run()
+
+    with HistorySearchIndex(out_dir / HistorySearchIndex.FILENAME) as index:
+        hits = index.search("willow")
+        assert {(h["filename"], h["turn"]) for h in hits} == {
+            ("001-conversation.html", 1),
+            ("002-conversation.html", 2),
+        }
+        assert index.search("leaves")[0]["role"] == "assistant"
+
+        # re-indexing a scroll replaces its rows instead of duplicating them
+        index.replace_scroll("001-conversation.html", [{"author": "user", "content": "oak"}])
+        assert [h["filename"] for h in index.search("willow")] == ["002-conversation.html"]
+        assert len(index.search("oak")) == 1
+
+    capsys.readouterr()
+    cli_main(["history", "search", "rivers", "-d", str(out_dir)])
+    out = capsys.readouterr().out
+    assert "002-conversation.html" in out
+    assert "turn 001 user" in out
+
+
+def test_export_prints_where_to_search(tmp_path: Path, capsys):
+    zip_path = tmp_path / "exp.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("conversations.json", json.dumps([make_thread("hi", "hello")]))
+    out_dir = tmp_path / "dated"
+    cli_main(
+        ["history", "-f", str(zip_path), "--output-dir", str(out_dir), "--search-index"]
+    )
+    assert f"willow history search -d '{out_dir}'" in capsys.readouterr().out
+
+    cli_main(["history", "search", "hello", "-d", str(out_dir)])
+    assert "001-conversation.html" in capsys.readouterr().out
@@ -0,0 +1,48 @@
+from pathlib import Path
+import subprocess
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+HEAVY = ("gensim", "networkx", "sklearn", "nltk", "scipy", "numpy")
+
+PROBE = f"""
+import sys
+from breathing_willow_cli.breathing_willow import main
+main(["--version"])
+print(",".join(m for m in {HEAVY!r} if m in sys.modules))
+"""
+
+
+def test_willow_version_skips_heavy_imports():
+    # no NLP or graph backend is imported just to print the version;
+    # scripts/bench_cli_startup.py measures the wall-clock side
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], capture_output=True, text=True, check=True, cwd=ROOT
+    ).stdout.splitlines()
+    assert out[-1] == "", out
+
+
+def test_willow_viz_backends_load_on_first_use():
+    import breathing_willow.willow_viz as willow_viz
+
+    # attribute access still resolves the lazily imported names
+    assert willow_viz.STOP_WORDS
+    assert willow_viz.nx.Graph is not None
+
+
+def test_subcommand_modules_load_on_dispatch():
+    probe = """
+import sys
+from breathing_willow_cli.breathing_willow import build_parser, main
+build_parser()
+print(",".join(sorted(m for m in sys.modules if m.startswith(("breathing_willow.", "w_cli")))))
+print("breathing_willow_cli.commands" in sys.modules)
+main(["sense"])
+print("breathing_willow_cli.commands" in sys.modules, "w_cli.diff" in sys.modules)
+"""
+    out = subprocess.run(
+        [sys.executable, "-c", probe], capture_output=True, text=True, check=True, cwd=ROOT
+    ).stdout.splitlines()
+    assert out == ["", "False", "sense", "True False"]
@@ -0,0 +1,105 @@
+import json
+import zipfile
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from breathing_willow.export_kernel import ChatExportArchiver
+from breathing_willow.message_store import MessageStore
+
+
+def make_thread(conv_id: str, text: str, update_time: int = 1) -> dict:
+    return {
+        "id": conv_id,
+        "update_time": update_time,
+        "messages": [
+            {"author": "user", "content": text, "create_time": 1700000000.5},
+            {"author": "assistant", "content": f"re: {text} ✓"},
+        ],
+    }
+
+
+def write_export(tmp_path: Path, convos: list, name: str) -> Path:
+    zip_path = tmp_path / name
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("conversations.json", json.dumps(convos))
+    return zip_path
+
+
+def test_message_store_rows(tmp_path: Path):
+    out_dir = tmp_path / "out"
+    zip_path = write_export(tmp_path, [make_thread("a", "one"), make_thread("b", "two")], "e.zip")
+    ChatExportArchiver(zip_path, out_dir, message_store=True, workers=2).run()
+
+    with MessageStore(out_dir) as store:
+        assert len(store) == 4
+        rows = sorted(store, key=lambda r: (r["filename"], r["turn"]))
+        assert rows[0] == {
+            "conversation_id": "a",
+            "filename": "001-conversation.html",
+            "turn": 1,
+            "role": "user",
+            "timestamp": 1700000000.5,
+            "text": "one",
+        }
+        assert store[-1]["text"].endswith("✓")
+
+
+def test_message_store_incremental_keeps_unchanged_rows(tmp_path: Path):
+    out_dir = tmp_path / "out"
+    first = write_export(tmp_path, [make_thread("a", "one"), make_thread("b", "two")], "1.zip")
+    ChatExportArchiver(first, out_dir, message_store=True, incremental=True).run()
+
+    second = write_export(
+        tmp_path, [make_thread("a", "one"), make_thread("b", "changed", 2)], "2.zip"
+    )
+    ChatExportArchiver(second, out_dir, message_store=True, incremental=True).run()
+
+    with MessageStore(out_dir) as store:
+        texts = sorted(row["text"] for row in store if row["role"] == "user")
+    assert texts == ["changed", "one"]
+
+
+def test_message_store_reads_timestamp_key(tmp_path: Path):
+    thread = make_thread("a", "one")
+    thread["messages"][1]["timestamp"] = 1700000060
+    out_dir = tmp_path / "out"
+    ChatExportArchiver(write_export(tmp_path, [thread], "e.zip"), out_dir, message_store=True).run()
+
+    with MessageStore(out_dir) as store:
+        assert [row["timestamp"] for row in store] == [1700000000.5, 1700000060]
+
+
+def test_message_store_added_to_existing_archive(tmp_path: Path):
+    out_dir = tmp_path / "out"
+    zip_path = write_export(tmp_path, [make_thread("a", "one"), make_thread("b", "two")], "e.zip")
+    ChatExportArchiver(zip_path, out_dir, incremental=True).run()
+    ChatExportArchiver(zip_path, out_dir, message_store=True, incremental=True).run()
+
+    with MessageStore(out_dir) as store:
+        assert len(store) == 4
+
+
+def test_failed_export_keeps_previous_store(tmp_path: Path):
+    out_dir = tmp_path / "out"
+    good = write_export(tmp_path, [make_thread("a", "one")], "good.zip")
+    ChatExportArchiver(good, out_dir, message_store=True).run()
+
+    bad = tmp_path / "bad.zip"
+    with zipfile.ZipFile(bad, "w") as zf:
+        zf.writestr("conversations.json", "[{broken")
+    for stream in (False, True):
+        ChatExportArchiver(bad, out_dir, message_store=True, stream=stream).run()
+
+    missing = tmp_path / "missing.zip"
+    with zipfile.ZipFile(missing, "w") as zf:
+        zf.writestr("other.json", "[]")
+    with pytest.raises(Exception, match="conversations.json"):
+        ChatExportArchiver(missing, out_dir, message_store=True).run()
+
+    with MessageStore(out_dir) as store:
+        assert [row["text"] for row in store] == ["one", "re: one ✓"]
+    assert not list(out_dir.glob("*.tmp"))
@@ -0,0 +1,57 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import breathing_willow.willow_viz as willow_viz
+
+# Avoid NLTK downloads during tests
+willow_viz.word_tokenize = None
+
+from breathing_willow.minhash import MinHashLSH
+from breathing_willow.willow_viz import WillowGrowth
+
+
+def test_lsh_candidates_and_persistence(tmp_path: Path):
+    path = tmp_path / "g.minhash.jsonl"
+    lsh = MinHashLSH(path, threshold=0.5)
+    words = [f"w{i}" for i in range(40)]
+    lsh.add("a", words[:20])
+    lsh.add("b", words[:18] + ["x1", "x2"])
+    lsh.add("c", words[20:])
+    assert {"a", "b"} <= lsh.candidates(words[:20])
+    assert "c" not in lsh.candidates(words[:20])
+
+    # signatures persist; a different threshold only rebands them
+    reloaded = MinHashLSH(path, threshold=0.8)
+    assert reloaded.nodes == {"a", "b", "c"}
+    assert (reloaded.bands, reloaded.rows) != (lsh.bands, lsh.rows)
+    assert "a" in reloaded.candidates(words[:20])
+    # a lower recall never widens the candidate set
+    assert MinHashLSH(path, 0.5, recall=0.5).rows >= lsh.rows
+
+
+def test_lsh_linking_and_expand(tmp_path: Path):
+    docs = {
+        "d1.txt": "alpha beta gamma delta epsilon",
+        "d2.txt": "alpha beta gamma delta zeta",
+        "d3.txt": "alpha omega sigma tau upsilon",
+    }
+    for gpath in (tmp_path / "graph.json", tmp_path / "graph.sqlite"):
+        wg = WillowGrowth(graph_path=gpath, lsh_threshold=0.5)
+        uids = {}
+        for name, text in docs.items():
+            (tmp_path / name).write_text(text)
+            wg.submit_document(tmp_path / name)
+            uids[name] = wg._hash_content(text)[:8]
+
+        # only the similar pair is linked, not every pair sharing "alpha"
+        graph = WillowGrowth(graph_path=gpath).graph
+        assert graph.has_edge(uids["d1.txt"], uids["d2.txt"])
+        assert not list(graph.edges(uids["d3.txt"]))
+
+        wg = WillowGrowth(graph_path=gpath, lsh_threshold=0.5)
+        assert wg.lsh.nodes == set(uids.values())
+        wg.expand_node(uids["d1.txt"], similarity_threshold=0.5)
+        assert wg._graph is None or wg.store is None
+        assert not WillowGrowth(graph_path=gpath).graph.has_edge(uids["d1.txt"], uids["d3.txt"])
@@ -0,0 +1,37 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from breathing_willow.summary_engine import SummaryEngine, analyze
+
+
+def test_analyze_splits_sentences_and_drops_stop_words():
+    assert analyze("The river runs. And the willow bends!") == [
+        ["river", "runs"],
+        ["willow", "bends"],
+    ]
+
+
+def test_summarize_separates_topics_and_tracks_idf(tmp_path: Path):
+    engine = SummaryEngine(tmp_path / "g.idf.json")
+    text = (
+        "river water flows. water river current. "
+        "graph node edge. node edge graph."
+    )
+    summary, clusters, words = engine.summarize(analyze(text), max_clusters=2)
+    assert sorted(map(sorted, clusters)) == [
+        ["current", "flows", "river", "water"],
+        ["edge", "graph", "node"],
+    ]
+    assert summary.split() == words
+    assert engine.n_docs == 1 and engine.df["river"] == 1
+
+    engine.summarize(analyze("river stone."))
+    assert engine.idf("river") < engine.idf("stone")
+    engine.summarize(analyze("river again."), update=False)
+    assert engine.n_docs == 2
+
+    engine.save()
+    reloaded = SummaryEngine(tmp_path / "g.idf.json")
+    assert reloaded.n_docs == 2 and reloaded.df == engine.df
@@ -0,0 +1,65 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import breathing_willow.willow_viz as willow_viz
+
+# Avoid NLTK downloads during tests
+willow_viz.word_tokenize = None
+
+from breathing_willow.term_clusters import TermClusters
+from breathing_willow.willow_viz import WillowGrowth
+
+
+def flat_idf(term):
+    return 1.0
+
+
+def test_fold_seeds_then_assigns_nearest(tmp_path: Path):
+    clusters = TermClusters(tmp_path / "g.clusters.json", k=2)
+    assert clusters.fold(["river", "water"], flat_idf) == 0
+    assert clusters.fold(["graph", "node"], flat_idf) == 1
+    assert clusters.fold(["water", "tide"], flat_idf) == 0
+    assert clusters.fold([], flat_idf) is None
+    assert clusters.folded == 4
+    assert clusters.centroids[0]["count"] == 2
+    assert clusters.top_terms(1) == [["water"], ["graph"]]
+
+    clusters.save()
+    reloaded = TermClusters(tmp_path / "g.clusters.json", k=2)
+    assert reloaded.folded == 4 and reloaded.top_terms() == clusters.top_terms()
+    # a different k starts over
+    assert TermClusters(tmp_path / "g.clusters.json", k=3).folded == 0
+
+
+def test_incremental_cluster_terms_folds_only_new_nodes(tmp_path: Path, monkeypatch):
+    texts = [
+        "river water tide.",
+        "graph node edge.",
+        "water river stream.",
+        "node graph vertex.",
+    ]
+    paths = []
+    for i, text in enumerate(texts):
+        paths.append(tmp_path / f"d{i}.txt")
+        paths[-1].write_text(text)
+
+    wg = WillowGrowth(graph_path=tmp_path / "graph.sqlite")
+    wg.submit_batch(paths[:2])
+    first = wg.cluster_terms(max_clusters=2, incremental=True)
+    assert len(first) == 2
+
+    folds = []
+    original_fold = TermClusters.fold
+    monkeypatch.setattr(
+        TermClusters, "fold", lambda self, *a: folds.append(1) or original_fold(self, *a)
+    )
+    wg = WillowGrowth(graph_path=tmp_path / "graph.sqlite")
+    wg.submit_batch(paths[2:])
+    second = wg.cluster_terms(max_clusters=2, incremental=True)
+    assert len(folds) == 2
+    assert wg._graph is None
+    # new nodes joined the existing clusters without reordering them
+    for before, after in zip(first, second):
+        assert set(before) <= set(after)
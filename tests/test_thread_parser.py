@@ -41,3 +41,122 @@ def test_json_string_input():
     html = ThreadParser(data, export_id="exp").parse()
     assert "user-turn" in html and "assistant-turn" in html
 
+
+
+def make_chain(n: int) -> dict:
+    mapping = {"client-created-root": {"parent": None, "children": ["m0"]}}
+    for i in range(n):
+        mapping[f"m{i}"] = {
+            "parent": f"m{i - 1}" if i else "client-created-root",
+            "children": [f"m{i + 1}"] if i + 1 < n else [],
+            "message": {
+                "author": {"role": "user" if i % 2 == 0 else "assistant"},
+                "content": {"parts": [f"turn {i}"]},
+            },
+        }
+    return {"mapping": mapping}
+
+
+def test_deep_mapping_does_not_recurse():
+    n = sys.getrecursionlimit() * 3
+    html = ThreadParser(make_chain(n), export_id="exp").parse()
+    assert html.count("-turn\">") == n
+    assert html.index("turn 0<") < html.index(f"turn {n - 1}<")
+
+
+def test_active_branch_skips_regenerated_siblings():
+    thread = make_chain(2)
+    mapping = thread["mapping"]
+    mapping["m0"]["children"].append("regen")
+    mapping["regen"] = {
+        "parent": "m0",
+        "children": [],
+        "message": {"author": {"role": "assistant"}, "content": {"parts": ["retry"]}},
+    }
+    thread["current_node"] = "regen"
+
+    html = ThreadParser(thread, export_id="exp").parse()
+    assert "retry" in html and "turn 1" not in html
+
+    html_all = ThreadParser(thread, export_id="exp", active_branch=False).parse()
+    assert html_all.index("turn 1") < html_all.index("retry")
+
+
+def test_active_branch_without_parent_pointers():
+    thread = make_chain(3)
+    for node in thread["mapping"].values():
+        del node["parent"]
+    thread["current_node"] = "m2"
+    html = ThreadParser(thread, export_id="exp").parse()
+    assert html.count("-turn\">") == 3
+
+    # a chain that never reaches the root renders the whole tree
+    def node(parent, children, text):
+        return {
+            "parent": parent,
+            "children": children,
+            "message": {"author": {"role": "user"}, "content": {"parts": [text]}},
+        }
+
+    thread = {
+        "current_node": "c",
+        "mapping": {
+            "r": {"parent": None, "children": ["a"]},
+            "a": node("r", [], "first"),
+            "b": node("ghost", ["c"], "second"),
+            "c": node("b", [], "third"),
+        },
+    }
+    html = ThreadParser(thread, export_id="exp").parse()
+    assert html.count("-turn\">") == 3
+
+
+def test_parse_to_stream_matches_parse():
+    import io
+
+    thread = {
+        "create_time": 1700000000,
+        "arc": "rise",
+        "messages": [
+            {"author": "user", "content": "a <b>\nline two"},
+            {"author": "system", "content": "hidden"},
+            {"author": "assistant", "content": "ok & done"},
+        ],
+    }
+    buf = io.StringIO()
+    parser = ThreadParser(thread, export_id="exp")
+    parser.parse_to(buf)
+    assert buf.getvalue() == ThreadParser(thread, export_id="exp").parse()
+    assert buf.getvalue().endswith("</div>\n")
+    assert parser.metadata["turns"] == 2
+
+
+def test_time_engine_matches_pytz_across_dst():
+    import pytz
+    from breathing_willow.export_kernel import TimeEngine
+
+    engine = TimeEngine("America/Denver")
+    denver = pytz.timezone("America/Denver")
+    # 2024-03-10 spring-forward, sampled every 7 minutes across the night
+    base = 1710054000
+    stamps = [base + i * 420 for i in range(60)] + [None]
+    got = engine.localize(stamps)
+    assert got[-1] is None
+    for ts, dt in zip(stamps[:-1], got):
+        expected = datetime.fromtimestamp(ts, tz=pytz.utc).astimezone(denver)
+        assert dt.isoformat() == expected.isoformat()
+
+
+def test_turn_times_use_configured_timezone():
+    thread = {
+        "messages": [
+            {"author": "user", "content": "hi", "create_time": 1700000000},
+            {"author": "assistant", "content": "yo"},
+        ]
+    }
+    parser = ThreadParser(thread, export_id="exp", tz="UTC", show_times=True)
+    html = parser.parse()
+    assert '<div class="turn-time">2023-11-14T22:13:20+00:00</div>' in html
+    assert html.count("turn-time") == 1
+    assert parser.messages[0]["time"] == "2023-11-14T22:13:20+00:00"
+    assert '<div class="start">2023-11-14T22:13:20+00:00</div>' in html
@@ -0,0 +1,55 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import breathing_willow.willow_viz as willow_viz
+
+# Avoid NLTK downloads during tests
+willow_viz.word_tokenize = None
+
+from breathing_willow.token_index import TokenIndex
+from breathing_willow.willow_viz import WillowGrowth
+
+
+def test_token_index_overlaps_and_persists(tmp_path: Path):
+    path = tmp_path / "g.tokens.jsonl"
+    index = TokenIndex(path)
+    index.add("a", ["alpha", "beta", "beta"])
+    index.add("b", ["beta", "gamma"])
+    index.add("a", ["ignored"])
+    assert index.overlaps(["beta", "alpha", "delta"]) == {"a": 2, "b": 1}
+
+    # a torn final append is skipped on load
+    with path.open("a") as fh:
+        fh.write('{"id": "c", "tok')
+    reloaded = TokenIndex(path)
+    assert reloaded.nodes == {"a", "b"}
+    assert reloaded.overlaps(["gamma"]) == {"b": 1}
+
+
+def test_submit_document_links_through_index(tmp_path: Path):
+    gpath = tmp_path / "graph.json"
+    docs = {
+        "d1.txt": "alpha beta gamma",
+        "d2.txt": "alpha delta",
+        "d3.txt": "omega sigma",
+    }
+    wg = WillowGrowth(graph_path=gpath)
+    uids = {}
+    for name, text in docs.items():
+        (tmp_path / name).write_text(text)
+        wg.submit_document(tmp_path / name)
+        uids[name] = wg._hash_content(text)[:8]
+
+    sidecar = tmp_path / "graph.tokens.jsonl"
+    assert sidecar.exists()
+    assert wg.graph.has_edge(uids["d1.txt"], uids["d2.txt"])
+    assert wg.graph[uids["d1.txt"]][uids["d2.txt"]]["weight"] == 1
+    assert not list(wg.graph.edges(uids["d3.txt"]))
+
+    # a lost sidecar is rebuilt from the graph
+    sidecar.unlink()
+    wg = WillowGrowth(graph_path=gpath)
+    assert wg.token_index.nodes == set(uids.values())
+    assert sidecar.exists()
@@ -60,3 +60,42 @@ def test_update_net(tmp_path: Path):
 
     # visualization written
     assert output_html.exists()
+
+
+def test_update_net_batch_saves_once(tmp_path: Path, monkeypatch):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.md").write_text("alpha beta gamma")
+    (docs / "b.md").write_text("alpha delta")
+    (docs / "c.md").write_text("omega sigma")
+    graph_path = tmp_path / "graph.json"
+    monkeypatch.setenv("WILLOW_SHAPING_LOG", str(tmp_path / "shaping.md"))
+
+    saves = []
+    original_save = WillowGrowth.save_graph
+    monkeypatch.setattr(
+        WillowGrowth, "save_graph", lambda self: saves.append(1) or original_save(self)
+    )
+
+    from breathing_willow_cli.breathing_willow import main as cli_main
+
+    cli_main([
+        "update-net",
+        "--graph",
+        str(graph_path),
+        "--visual-archive",
+        str(tmp_path / "out.html"),
+        "--batch",
+        str(docs),
+        "--workers",
+        "2",
+    ])
+    assert len(saves) == 1
+
+    batch = WillowGrowth(graph_path=graph_path).graph
+    serial = WillowGrowth(graph_path=tmp_path / "serial.json")
+    for name in ("a.md", "b.md", "c.md"):
+        serial.submit_document(docs / name)
+    assert set(batch.nodes) == set(serial.graph.nodes)
+    assert set(map(frozenset, batch.edges)) == set(map(frozenset, serial.graph.edges))
+    assert (tmp_path / "shaping.md").read_text().count("## Shaping Log") == 3
@@ -0,0 +1,60 @@
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import breathing_willow.willow_viz as willow_viz
+
+# Avoid NLTK downloads during tests
+willow_viz.word_tokenize = None
+
+from breathing_willow.vector_index import VectorIndex, hashed_tfidf
+from breathing_willow.willow_viz import WillowGrowth
+
+
+def test_vector_index_neighbours_and_persists(tmp_path: Path):
+    path = tmp_path / "g.vectors.f32"
+    index = VectorIndex(path, dim=64)
+    docs = {
+        "a": ["alpha", "beta", "gamma"],
+        "b": ["alpha", "beta", "delta"],
+        "c": ["omega", "sigma"],
+        "d": ["alpha", "beta", "gamma", "gamma"],
+    }
+    for nid, tokens in docs.items():
+        index.add([nid], [hashed_tfidf(tokens, lambda t: 1.0, 64)])
+    index.add(["a"], [hashed_tfidf(["ignored"], lambda t: 1.0, 64)])
+
+    found = index.neighbours([0, 3], k=2)
+    assert [index.ids[r] for r, _ in found[0]] == ["d", "b"]
+    assert found[0][0][1] > found[0][1][1]
+    # earlier_only never looks forward
+    assert index.neighbours([0], k=2, earlier_only=True)[0] == []
+    assert [index.ids[r] for r, _ in index.neighbours([1], k=3, earlier_only=True)[1]] == ["a"]
+
+    reloaded = VectorIndex(path, dim=64)
+    assert reloaded.ids == ["a", "b", "c", "d"]
+    assert (reloaded.matrix == index.matrix).all()
+    # vectors of another length are not misread
+    assert VectorIndex(path, dim=32).ids == []
+
+
+def test_vector_mode_links_batch_and_single(tmp_path: Path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.md").write_text("alpha beta gamma")
+    (docs / "b.md").write_text("alpha beta delta")
+    (docs / "c.md").write_text("omega sigma")
+    for gpath in (tmp_path / "graph.json", tmp_path / "graph.sqlite"):
+        wg = WillowGrowth(graph_path=gpath, vector_dim=64, vector_min_similarity=0.3)
+        added = wg.submit_batch(sorted(docs.iterdir()))
+        (tmp_path / "e.md").write_text("omega sigma tau")
+        wg.submit_document(tmp_path / "e.md")
+
+        graph = WillowGrowth(graph_path=gpath).graph
+        a, b, c = added
+        e = wg._hash_content("omega sigma tau")[:8]
+        assert graph.has_edge(a, b) and 0 < graph[a][b]["weight"] < 1
+        assert graph.has_edge(c, e)
+        assert not graph.has_edge(a, c)
+        assert WillowGrowth(graph_path=gpath, vector_dim=64).vectors.ids == [a, b, c, e]